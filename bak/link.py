@@ -9,282 +9,3042 @@ Eğitim ve güvenlik araştırmaları için tasarlanmıştır.
 Kullanım:
     python urlscan_tool.py          # GUI modu
     python urlscan_tool.py --cli    # Terminal modu
+    python urlscan_tool.py --batch sorgular.txt --out klasor   # Toplu sorgu modu
+    python urlscan_tool.py search "sorgu" > sonuc.ndjson      # Etkileşimsiz mod
 """
 
-import requests
+import argparse
 import json
+import csv
+import gzip
+import hashlib
+import math
 import time
 import os
+import re
 import sys
+import queue
+import sqlite3
 import threading
-from datetime import datetime
-from urllib.parse import quote
+import warnings
+from collections import Counter, deque
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+from importlib.util import find_spec
+from urllib.parse import quote, urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 
-# GUI imports
-try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog, scrolledtext
-    import webbrowser
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
+
+# Ağır bağımlılıklar modül yüklenirken değil, kullanan yolda yüklenir (--help,
+# search, --batch gibi kısa çağrılar tkinter/PIL/pyarrow yüklemez). Kurulu olup
+# olmadıkları import etmeden find_spec ile anlaşılır.
+def _installed(*names):
+    try:
+        return all(find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+
+# requests: ilk URLScanAPI oluşturulurken
+requests = None
+
+# GUI imports: load_gui() ile, GUI açılırken
+GUI_AVAILABLE = _installed('tkinter', '_tkinter')
+tk = ttk = messagebox = filedialog = scrolledtext = webbrowser = None
+
+# Küçük resimler için (opsiyonel): küçük resim thread'inde
+PIL_AVAILABLE = _installed('PIL')
+
+# Parquet / Arrow çıktısı için (opsiyonel; yoksa gzip'li NDJSON yazılır): ilk sütunlu çıktıda
+PYARROW_AVAILABLE = _installed('pyarrow')
+pa = pq = None
+
+
+def load_requests():
+    """requests'i modül düzeyindeki isme bağla"""
+    global requests
+    if requests is None:
+        import requests
+    return requests
+
+
+def load_gui():
+    """tkinter modüllerini modül düzeyindeki isimlere bağla"""
+    global tk, ttk, messagebox, filedialog, scrolledtext, webbrowser
+    if tk is None:
+        import tkinter as tk
+        from tkinter import ttk, messagebox, filedialog, scrolledtext
+        import webbrowser
+
+
+def load_pyarrow():
+    """pyarrow ve pyarrow.parquet'i modül düzeyindeki isimlere bağla"""
+    global pa, pq
+    if pa is None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+
+class TokenBucket:
+    """Thread-safe token bucket hız sınırlayıcı (birden fazla arama paylaşabilir)"""
+    
+    def __init__(self, rate=1.0, capacity=None):
+        self.rate = float(rate)                      # saniyede eklenen token
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, stop_event=None):
+        """Bir token al; beklerken stop_event set edilirse False döner"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def _parse_reset(value, now_wall):
+    """Reset başlığını 'kaç saniye sonra' değerine çevir (ISO tarih, epoch veya saniye)"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+        # Büyük sayılar epoch zaman damgasıdır, küçükler kalan saniye
+        return max(0.0, number - now_wall) if number > 1e9 else max(0.0, number)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        # HTTP tarihi nadir gelir; email paketi sadece gerektiğinde yüklenir
+        from email.utils import parsedate_to_datetime
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, dt.timestamp() - now_wall)
+
+
+class RateLimitPacer:
+    """API rate-limit başlıklarına göre istekleri zamana yayar.
+    
+    X-Rate-Limit-Remaining / X-Rate-Limit-Reset(-After) ile kalan kotayı
+    sıfırlanma anına kadar eşit aralıklarla dağıtır; 429'da Retry-After (yoksa
+    reset, o da yoksa 30 sn) kadar bekletir. Başlık yoksa sabit aralık kullanır.
+    Thread-safe'tir, toplu modda tüm sorgular tek pacer'ı paylaşabilir. Beklemeler
+    stop_event ile anında kesilir.
+    """
+    
+    def __init__(self, default_interval=0.5, min_interval=0.0, retry_default=30.0):
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.retry_default = retry_default
+        self.remaining = None
+        self.limit = None
+        self.reset_at = None          # monotonic
+        self.blocked_until = 0.0      # monotonic
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def update(self, response):
+        """Yanıt başlıklarından kota bilgisini güncelle; 429 ise bekleme süresini döndür"""
+        h = response.headers
+        now, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            remaining = h.get('X-Rate-Limit-Remaining')
+            if remaining is not None and remaining.strip().lstrip('-').isdigit():
+                self.remaining = int(remaining)
+            limit = h.get('X-Rate-Limit-Limit')
+            if limit is not None and limit.strip().isdigit():
+                self.limit = int(limit)
+            reset_in = _parse_reset(h.get('X-Rate-Limit-Reset-After'), now_wall)
+            if reset_in is None:
+                reset_in = _parse_reset(h.get('X-Rate-Limit-Reset'), now_wall)
+            if reset_in is not None:
+                self.reset_at = now + reset_in
+            
+            if response.status_code != 429:
+                return None
+            wait = _parse_reset(h.get('Retry-After'), now_wall)
+            if wait is None:
+                wait = reset_in if reset_in is not None else self.retry_default
+            self.blocked_until = max(self.blocked_until, now + wait)
+            self.remaining = 0
+            return wait
+    
+    def _interval(self, now):
+        if self.remaining is None or self.reset_at is None:
+            return self.default_interval
+        window = max(0.0, self.reset_at - now)
+        if self.remaining <= 0:
+            return window
+        return max(self.min_interval, window / self.remaining)
+    
+    def wait(self, stop_event):
+        """Sıradaki istek zamanına kadar bekle; durdurulursa False döner"""
+        with self._lock:
+            now = time.monotonic()
+            if self.reset_at is not None and now >= self.reset_at:
+                # Pencere yenilendi; sıradaki yanıt kotayı tekrar bildirecek
+                self.remaining, self.reset_at = None, None
+            start = max(now, self._next_slot, self.blocked_until)
+            self._next_slot = start + self._interval(start)
+            delay = start - now
+        if delay > 0:
+            return not stop_event.wait(delay)
+        return not stop_event.is_set()
+    
+    def time_until_reset(self):
+        """Kota sıfırlanmasına (veya 429 beklemesinin bitmesine) kalan saniye"""
+        now = time.monotonic()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.reset_at is not None and self.reset_at > now:
+            return self.reset_at - now
+        return None
+    
+    def snapshot(self):
+        reset_in = self.time_until_reset()
+        return {
+            'remaining': self.remaining,
+            'limit': self.limit,
+            'reset_in': None if reset_in is None else round(reset_in, 1)
+        }
+
+
+def _percentile(sorted_values, pct):
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+class RequestMetrics:
+    """API çağrısı başına ölçümler ve çalıştırma özeti.
+    
+    Her HTTP denemesi (ve önbellekten okunan sayfa) için gecikme, yanıt boyutu,
+    durum, kaçıncı tekrar olduğu ve istekten önce rate limit / geri çekilme ile
+    beklenen süre tutulur. record() aynı bilgiyi callback'e verilecek dict olarak
+    döndürür, summary() türe göre toplamları ve gecikme yüzdeliklerini verir.
+    Thread-safe'tir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.kinds = {}
+    
+    def record(self, kind, status, latency=0.0, size=0, retry=0, wait=0.0):
+        """Tek çağrıyı kaydet; status HTTP kodu ya da 'cache' / 'timeout' / 'error'"""
+        entry = {
+            'kind': kind,
+            'status': status,
+            'latency': round(latency, 4),
+            'bytes': size,
+            'retry': retry,
+            'wait': round(wait, 4)
+        }
+        with self._lock:
+            k = self.kinds.get(kind)
+            if k is None:
+                k = self.kinds[kind] = {'statuses': Counter(), 'latencies': [], 'bytes': 0,
+                                        'retries': 0, 'wait': 0.0}
+            k['statuses'][str(status)] += 1
+            k['bytes'] += size
+            k['wait'] += wait
+            if retry:
+                k['retries'] += 1
+            if status != 'cache':
+                k['latencies'].append(latency)
+        return entry
+    
+    @property
+    def requests(self):
+        """Ağa giden çağrı sayısı (önbellek okumaları hariç)"""
+        with self._lock:
+            return sum(len(k['latencies']) for k in self.kinds.values())
+    
+    def summary(self, quota=None):
+        """Türe göre toplamlar, gecikme yüzdelikleri (ms) ve kota kullanımı"""
+        kinds = {}
+        with self._lock:
+            for kind, k in self.kinds.items():
+                lat = sorted(k['latencies'])
+                kinds[kind] = {
+                    'requests': len(lat),
+                    'cached': k['statuses'].get('cache', 0),
+                    'statuses': dict(k['statuses']),
+                    'retries': k['retries'],
+                    'bytes': k['bytes'],
+                    'rate_wait_seconds': round(k['wait'], 2),
+                    'network_seconds': round(sum(lat), 2),
+                    'latency_ms': {
+                        'p50': round(_percentile(lat, 50) * 1000, 1),
+                        'p90': round(_percentile(lat, 90) * 1000, 1),
+                        'p99': round(_percentile(lat, 99) * 1000, 1),
+                        'max': round(lat[-1] * 1000, 1) if lat else 0.0,
+                        'mean': round(sum(lat) / len(lat) * 1000, 1) if lat else 0.0
+                    }
+                }
+            started = self.started
+        
+        throttled = sum(k['statuses'].get('429', 0) for k in kinds.values())
+        return {
+            'started': datetime.fromtimestamp(started).isoformat(),
+            'seconds': round(time.time() - started, 2),
+            'requests': sum(k['requests'] for k in kinds.values()),
+            'cached': sum(k['cached'] for k in kinds.values()),
+            'bytes': sum(k['bytes'] for k in kinds.values()),
+            'retries': sum(k['retries'] for k in kinds.values()),
+            'rate_wait_seconds': round(sum(k['rate_wait_seconds'] for k in kinds.values()), 2),
+            'network_seconds': round(sum(k['network_seconds'] for k in kinds.values()), 2),
+            'quota': {
+                'used': sum(k['requests'] for k in kinds.values()),
+                'throttled': throttled,
+                **(quota or {})
+            },
+            'by_kind': kinds
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SAYFA ÖNBELLEĞİ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PageCache:
+    """Ham API sayfalarının disk önbelleği.
+    
+    Anahtar, isteğin parametreleridir (sorgu, sayfa boyutu, search_after) ve
+    sha1 ile dosya adına çevrilir; gövde gzip'li saklanır. ttl saniyeden eski
+    sayfalar bayat sayılır, toplam boyut max_bytes'ı aşarsa en uzun süredir
+    kullanılmayan sayfalar silinir. Thread-safe'tir, toplu modda paylaşılabilir.
+    """
+    
+    SUFFIX = '.json.gz'
+    
+    def __init__(self, directory, ttl=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def key(params):
+        raw = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def _path(self, params):
+        return os.path.join(self.directory, self.key(params) + self.SUFFIX)
+    
+    def get(self, params, ignore_ttl=False):
+        """Önbellekteki sayfayı dict olarak döndür; yoksa/bayatsa None"""
+        path = self._path(params)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if not ignore_ttl and self.ttl is not None and age > self.ttl:
+                self._count(hit=False)
+                return None
+            with gzip.open(path, 'rb') as f:
+                data = json.loads(f.read())
+            # Okuma erişim zamanını günceller (LRU tahliyesi için)
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+        except (OSError, EOFError, ValueError):
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return data
+    
+    def _count(self, hit):
+        # Sayaçlar worker thread'lerinden güncellenir
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def put(self, params, body):
+        """Ham yanıt gövdesini (bytes) yaz; yarım dosya kalmaması için önce geçici dosyaya"""
+        path = self._path(params)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp, 'wb', compresslevel=5) as f:
+                f.write(body)
+        except OSError:
+            return
+        with self._lock:
+            # Aynı anahtarın üzerine yazılıyorsa eski dosyanın boyutu düşülür
+            try:
+                old = os.path.getsize(path)
+            except OSError:
+                old = 0
+            try:
+                os.replace(tmp, path)
+                size = os.path.getsize(path)
+            except OSError:
+                return
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size - old
+            if self._size > self.max_bytes:
+                self._evict()
+    
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                yield entry
+    
+    def _scan_size(self):
+        return sum(e.stat().st_size for e in self._entries())
+    
+    def _evict(self):
+        # Hedef sınırın %90'ı; her yazmada tekrar taramamak için biraz boşluk bırakılır
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_atime)
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if self._size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except OSError:
+                pass
+    
+    def clear(self):
+        with self._lock:
+            for entry in list(self._entries()):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SONUÇ KAYDI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _intern(value):
+    """Tekrarlayan değerleri (ülke, sunucu, durum) tek nesnede paylaştır.
+    
+    sys.intern kullanılır; modül düzeyinde büyüyen bir tablo tutulmaz.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+class ScanRecord:
+    """Tek bir arama sonucu.
+    
+    Sadece API'den gelen ham alanlar saklanır (__slots__, dict yok); screenshot
+    ve result_url scan_id'den istendiğinde üretilir. Ülke, sunucu ve durum
+    gibi çok tekrar eden değerler paylaşılır. Eski dict arayüzü
+    (r['url'], r.get(...), keys()) korunur. extra, zenginleştirmeden gelen
+    alanları tutar (yoksa None, to_dict'e sadece doluysa girer).
+    """
+    __slots__ = ('url', 'domain', 'ip', 'country', 'server', 'status', 'title', 'scan_id', 'scan_time',
+                 'extra')
+    
+    FIELDS = ('url', 'domain', 'ip', 'country', 'server', 'status', 'title',
+              'scan_id', 'scan_time', 'screenshot', 'result_url')
+    # r[...] / get ile erişilen anahtarlar: FIELDS ve extra
+    KEYS = FIELDS + ('extra',)
+    
+    def __init__(self, url='', domain='', ip='', country='', server='', status='', title='',
+                 scan_id='', scan_time='', extra=None):
+        self.url = url
+        self.domain = domain
+        self.ip = ip
+        self.country = _intern(country)
+        self.server = _intern(server)
+        self.status = _intern(status)
+        self.title = title
+        self.scan_id = scan_id
+        self.scan_time = scan_time
+        self.extra = extra
+    
+    @classmethod
+    def from_api(cls, result):
+        """Arama API'sinin döndürdüğü tek sonuçtan kayıt oluştur"""
+        page = result.get('page') or {}
+        return cls(
+            page.get('url', '') or '',
+            page.get('domain', '') or '',
+            page.get('ip', '') or '',
+            page.get('country', '') or '',
+            page.get('server', '') or '',
+            page.get('status', '') or '',
+            page.get('title', '') or '',
+            result.get('_id', '') or '',
+            (result.get('task') or {}).get('time', '') or ''
+        )
+    
+    @property
+    def screenshot(self):
+        return f"https://urlscan.io/screenshots/{self.scan_id}.png"
+    
+    @property
+    def result_url(self):
+        return f"https://urlscan.io/result/{self.scan_id}/"
+    
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        # screenshot / result_url türetilmiştir; okunur ama yazılamaz
+        if key not in self.KEYS or key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+    
+    def keys(self):
+        return self.FIELDS
+    
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self.FIELDS}
+        if self.extra is not None:
+            d['extra'] = self.extra
+        return d
+    
+    def __repr__(self):
+        return f"ScanRecord({self.scan_id!r}, {self.url!r})"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# İSTATİSTİK MOTORU
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StatsEngine:
+    """Sonuçlar geldikçe artımlı güncellenen istatistikler.
+    
+    Her sayfada sadece yeni kayıtlar sayılır; snapshot() sabit zamanlı sayaçları
+    döndürür, sıralı dağılımlar sadece statistics() istendiğinde üretilir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.countries = Counter()
+            self.servers = Counter()
+            self.statuses = Counter()
+            self.domains = set()
+            self.success = 0
+            self.errors = 0
+    
+    def add_many(self, rows):
+        with self._lock:
+            for r in rows:
+                self.total += 1
+                self.countries[r['country'] or 'Bilinmiyor'] += 1
+                self.servers[(r['server'] or 'Bilinmiyor')[:20]] += 1
+                status = str(r['status']) or 'Bilinmiyor'
+                self.statuses[status] += 1
+                if status.startswith('2'):
+                    self.success += 1
+                elif status.startswith(('4', '5')):
+                    self.errors += 1
+                if r['domain']:
+                    self.domains.add(r['domain'])
+    
+    def rebuild(self, rows):
+        self.reset()
+        self.add_many(rows)
+    
+    def snapshot(self):
+        """GUI kartları için O(1) özet"""
+        return {
+            'total': self.total,
+            'unique_domains': len(self.domains),
+            'unique_countries': len(self.countries),
+            'success': self.success,
+            'error': self.errors
+        }
+    
+    def statistics(self):
+        """get_statistics ile aynı biçimde, dağılımlar çoktan aza sıralı"""
+        with self._lock:
+            if not self.total:
+                return {}
+            return {
+                'total': self.total,
+                'countries': dict(self.countries.most_common()),
+                'servers': dict(self.servers.most_common()),
+                'statuses': dict(self.statuses.most_common()),
+                'unique_domains': len(self.domains),
+                'unique_countries': len(self.countries)
+            }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TEKİLLEŞTİRME
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def normalize_url(url):
+    """Karşılaştırma için URL: küçük harf şema/host, varsayılan port ve fragment yok,
+    sorgu parametreleri sıralı, sondaki / atılmış"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)) else None
+    netloc = f"{host}:{port}" if port else host
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path.rstrip('/') or '/', query, ''))
+
+
+class BloomFilter:
+    """Sabit bellekli olasılıksal küme: yanlış negatif yok, ~error_rate yanlış pozitif"""
+    
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def add(self, key):
+        """Ekle; daha önce (muhtemelen) varsa False döndür"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        new = False
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                new = True
+        return new
+
+
+class DiskKeySet:
+    """SQLite üzerinde kalıcı anahtar kümesi (milyonlarca satır, çalıştırmalar arası)"""
+    
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (k TEXT PRIMARY KEY, owner TEXT) WITHOUT ROWID")
+    
+    def add(self, key, owner):
+        """Ekle; varsa False ve ilk sahibini döndür"""
+        cur = self.conn.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (key, owner))
+        if cur.rowcount:
+            return True, None
+        row = self.conn.execute("SELECT owner FROM seen WHERE k = ?", (key,)).fetchone()
+        return False, row[0] if row else None
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class Deduper:
+    """Sorgular arası tekilleştirme.
+    
+    Anahtar scan_id, normalleştirilmiş URL veya domain olabilir ve ham API
+    sonucundan, kayıt oluşturulmadan çıkarılır. 'set' kesin kümedir ve her
+    anahtarın ilk sorgusunu tutar; 'bloom' milyonlarca satır için sabit bellek
+    kullanır (sahip bilgisi yok, çok küçük yanlış pozitif oranı); 'disk' SQLite
+    dosyasında kalıcıdır. 'auto' beklenen satır sayısına göre set/bloom seçer.
+    """
+    
+    MODES = ('scan_id', 'url', 'domain')
+    BACKENDS = ('auto', 'set', 'bloom', 'disk')
+    
+    def __init__(self, mode='scan_id', backend='auto', expected=100000, path=None, error_rate=0.001):
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen tekilleştirme modu: {mode}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Bilinmeyen depolama: {backend}")
+        if backend == 'auto':
+            backend = 'bloom' if expected > 1000000 else 'set'
+        if backend == 'disk' and not path:
+            raise ValueError("disk depolama için dosya yolu gerekli")
+        self.mode = mode
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._owners = {} if backend == 'set' else None
+        self._bloom = BloomFilter(expected, error_rate) if backend == 'bloom' else None
+        self._disk = DiskKeySet(path) if backend == 'disk' else None
+        self.views = []
+    
+    def key(self, result):
+        """Ham API sonucundan tekilleştirme anahtarı"""
+        if self.mode == 'scan_id':
+            return result.get('_id') or ''
+        page = result.get('page') or {}
+        if self.mode == 'url':
+            return normalize_url(page.get('url') or '')
+        return (page.get('domain') or '').lower()
+    
+    def add(self, key, view):
+        """(yeni mi, ilk görüldüğü sorgu) — bloom'da sahip bilinmez"""
+        with self._lock:
+            if self._owners is not None:
+                first = self._owners.get(key)
+                if first is not None:
+                    return False, first.query
+                self._owners[key] = view
+                return True, None
+            if self._bloom is not None:
+                return self._bloom.add(key), None
+            return self._disk.add(key, view.query)
+    
+    def view(self, query):
+        """Bir sorgu için sayaçlı görünüm; search(dedup=...) buna verilir"""
+        v = DedupView(self, query)
+        self.views.append(v)
+        return v
+    
+    def report(self):
+        """Sorgu başına yeni/tekrar sayıları ve hangi sorguyla çakıştığı"""
+        return [v.summary() for v in self.views]
+    
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+
+class DedupView:
+    """Deduper'ın tek sorguya bağlı hali"""
+    
+    def __init__(self, deduper, query):
+        self.deduper = deduper
+        self.query = query
+        self.new = 0
+        self.duplicates = 0
+        self.overlap = Counter()
+    
+    def check(self, result):
+        """Sonuç ilk kez görülüyorsa True; anahtarsız sonuçlar her zaman geçer"""
+        key = self.deduper.key(result)
+        if not key:
+            self.new += 1
+            return True
+        new, owner = self.deduper.add(key, self)
+        if new:
+            self.new += 1
+            return True
+        self.duplicates += 1
+        self.overlap[owner if owner is not None else '?'] += 1
+        return False
+    
+    def summary(self):
+        return {
+            'query': self.query,
+            'new': self.new,
+            'duplicates': self.duplicates,
+            'overlap': dict(self.overlap.most_common())
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# YEREL VERİTABANI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ResultDB:
+    """Toplanan sonuçlar için SQLite veritabanı.
+    
+    url, domain, title ve server üzerinde FTS5 tam metin dizini (SQLite FTS5
+    olmadan derlenmişse LIKE ile aranır), country, status, scan_time ve domain
+    üzerinde normal dizinler vardır. Aynı scan_id ikinci kez eklenmez. Arama
+    thread'i yazarken GUI okuyabilsin diye tek bağlantı kilitle paylaşılır.
+    """
+    
+    COLUMNS = ('scan_id', 'url', 'domain', 'ip', 'country', 'server', 'status', 'title', 'scan_time')
+    SORTS = ('scan_time', 'domain', 'url', 'country', 'status', 'server', 'ip', 'title')
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS results (
+                    scan_id TEXT PRIMARY KEY, url TEXT, domain TEXT, ip TEXT, country TEXT,
+                    server TEXT, status TEXT, title TEXT, scan_time TEXT, query TEXT, extra TEXT);
+                CREATE INDEX IF NOT EXISTS idx_results_country ON results(country);
+                CREATE INDEX IF NOT EXISTS idx_results_status ON results(status);
+                CREATE INDEX IF NOT EXISTS idx_results_scan_time ON results(scan_time);
+                CREATE INDEX IF NOT EXISTS idx_results_domain ON results(domain);
+            """)
+        self.fts = self._create_fts()
+    
+    def _create_fts(self):
+        try:
+            with self.conn:
+                self.conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+                        url, domain, title, server, content='results', content_rowid='rowid');
+                    CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+                        INSERT INTO results_fts(rowid, url, domain, title, server)
+                        VALUES (new.rowid, new.url, new.domain, new.title, new.server);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+                        INSERT INTO results_fts(results_fts, rowid, url, domain, title, server)
+                        VALUES ('delete', old.rowid, old.url, old.domain, old.title, old.server);
+                    END;
+                """)
+            return True
+        except sqlite3.OperationalError:
+            return False
+    
+    def add_rows(self, rows, query=None):
+        """Kayıtları tek işlemde ekle; yeni eklenen sayısını döndür"""
+        data = [
+            (r['scan_id'] or r['url'], r['url'], r['domain'], r['ip'], r['country'], r['server'],
+             str(r['status']), r['title'], r['scan_time'], query,
+             json.dumps(r.extra, ensure_ascii=False) if getattr(r, 'extra', None) is not None else None)
+            for r in rows
+        ]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", data)
+            added = self.conn.total_changes - before
+            self._dirty = self._dirty or added > 0
+            return added
+    
+    @staticmethod
+    def _fts_query(text):
+        # Her kelime önek eşleşmeli tırnaklı ifade olur; FTS sözdizimi hatası olmaz
+        return ' '.join('"' + word.replace('"', '""') + '"*' for word in text.split())
+    
+    def _where(self, text, country, status, since, until):
+        clauses, params = [], []
+        if text and text.strip():
+            if self.fts:
+                clauses.append("rowid IN (SELECT rowid FROM results_fts WHERE results_fts MATCH ?)")
+                params.append(self._fts_query(text))
+            else:
+                for word in text.split():
+                    clauses.append("(url LIKE ? OR domain LIKE ? OR title LIKE ? OR server LIKE ?)")
+                    params.extend([f"%{word}%"] * 4)
+        if country:
+            clauses.append("country = ?")
+            params.append(country.upper())
+        if status:
+            clauses.append("status = ?")
+            params.append(str(status))
+        if since:
+            clauses.append("scan_time >= ?")
+            params.append(since)
+        if until:
+            clauses.append("scan_time < ?")
+            params.append(until)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+    
+    def search(self, text=None, country=None, status=None, since=None, until=None,
+               order='scan_time', desc=True, limit=1000, offset=0):
+        """Filtrele ve sırala, ScanRecord listesi döndür"""
+        if order not in self.SORTS:
+            raise ValueError(f"Bilinmeyen sıralama: {order}")
+        where, params = self._where(text, country, status, since, until)
+        sql = (f"SELECT {', '.join(self.COLUMNS)}, extra FROM results{where} "
+               f"ORDER BY {order} {'DESC' if desc else 'ASC'} LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self.conn.execute(sql, params + [limit, offset]).fetchall()
+        return [ScanRecord(url, domain, ip, country_, server, status_, title, scan_id, scan_time,
+                           json.loads(extra) if extra else None)
+                for scan_id, url, domain, ip, country_, server, status_, title, scan_time, extra in rows]
+    
+    def count(self, text=None, country=None, status=None, since=None, until=None):
+        where, params = self._where(text, country, status, since, until)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            # Güncel istatistikler ile planlayıcı ülke/durum filtrelerinde doğru dizini seçer
+            if self._dirty:
+                self.conn.execute("ANALYZE")
+                self.conn.commit()
+            self.conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SONUÇ YAZICILARI (SINK)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ResultSink:
+    """Sonuçları sayfa sayfa dosyaya ekleyen temel sınıf.
+    
+    Arama başlarken açılır, her sayfa geldiğinde write_rows ile eklenir ve
+    diske boşaltılır; arama biterken veya kesildiğinde close ile kapanır.
+    total biliniyorsa (sonradan kaydetme) başlığa, bilinmiyorsa sona yazılır.
+    append=True ile var olan dosyanın sonuna eklenir (satır tabanlı formatlar için).
+    """
+    suffix = '.txt'
+    
+    def __init__(self, filename, compress=False, total=None, append=False):
+        if compress and not filename.endswith('.gz'):
+            filename += '.gz'
+        self.filename = filename
+        self.total = total
+        self.count = 0
+        mode = 'a' if append else 'w'
+        if filename.endswith('.gz'):
+            self._f = gzip.open(filename, mode + 't', encoding='utf-8', newline='')
+        else:
+            self._f = open(filename, mode, encoding='utf-8', newline='')
+        self.write_header()
+    
+    @classmethod
+    def output_path(cls, base, compress=False):
+        """base için yazılacak dosya adı (açmadan; MultiSink aynı dosyayı iki kez açmasın)"""
+        filename = f"{base}{cls.suffix}"
+        if compress and not filename.endswith('.gz'):
+            filename += '.gz'
+        return filename
+    
+    def write_header(self):
+        pass
+    
+    def write_footer(self):
+        pass
+    
+    def write(self, r):
+        raise NotImplementedError
+    
+    def write_rows(self, rows):
+        for r in rows:
+            self.count += 1
+            self.write(r)
+        self.flush()
+    
+    def flush(self):
+        self._f.flush()
+    
+    def close(self):
+        if self._f is not None:
+            self.write_footer()
+            self._f.close()
+            self._f = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UrlListSink(ResultSink):
+    """Sadece URL'ler (TXT)"""
+    suffix = '_urls.txt'
+    
+    def write_header(self):
+        self._f.write(f"# URLScan.io Arama Sonuçları\n")
+        self._f.write(f"# Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if self.total is not None:
+            self._f.write(f"# Toplam: {self.total} URL\n")
+        self._f.write("#" + "=" * 60 + "\n\n")
+    
+    def write(self, r):
+        self._f.write(f"{r['url']}\n")
+    
+    def write_footer(self):
+        if self.total is None:
+            self._f.write(f"\n# Toplam: {self.count} URL\n")
+
+
+class DetailedTxtSink(ResultSink):
+    """Detaylı TXT raporu"""
+    suffix = '_detailed.txt'
+    
+    def write_header(self):
+        self._f.write("╔" + "═" * 78 + "╗\n")
+        self._f.write("║" + " URLScan.io Detaylı Arama Raporu".center(78) + "║\n")
+        self._f.write("╚" + "═" * 78 + "╝\n\n")
+        self._f.write(f"📅 Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if self.total is not None:
+            self._f.write(f"📊 Toplam Sonuç: {self.total}\n")
+        self._f.write("=" * 80 + "\n\n")
+    
+    def write(self, r):
+        f = self._f
+        f.write(f"{'─' * 80}\n")
+        f.write(f"📌 Sonuç #{self.count}\n")
+        f.write(f"{'─' * 80}\n")
+        f.write(f"🔗 URL      : {r['url']}\n")
+        f.write(f"🌐 Domain   : {r['domain']}\n")
+        f.write(f"📍 IP       : {r['ip']}\n")
+        f.write(f"🏳️ Ülke     : {r['country']}\n")
+        f.write(f"🖥️ Sunucu   : {r['server']}\n")
+        f.write(f"📊 Durum    : {r['status']}\n")
+        title = r['title'][:60] + '...' if len(r['title']) > 60 else r['title']
+        f.write(f"📝 Başlık   : {title}\n")
+        f.write(f"🕐 Tarama   : {r['scan_time']}\n")
+        f.write(f"🔍 Detay    : {r['result_url']}\n")
+        f.write(f"📸 Ekran    : {r['screenshot']}\n\n")
+    
+    def write_footer(self):
+        if self.total is None:
+            self._f.write("=" * 80 + "\n")
+            self._f.write(f"📊 Toplam Sonuç: {self.count}\n")
+
+
+class CsvSink(ResultSink):
+    """CSV (csv modülü ile doğru tırnaklama)"""
+    suffix = '.csv'
+    HEADER = ['No', 'URL', 'Domain', 'IP', 'Country', 'Server', 'Status', 'Title', 'Scan_Time', 'Result_URL']
+    
+    def write_header(self):
+        self._f.write(','.join(self.HEADER) + '\n')
+        self._csv = csv.writer(self._f, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+    
+    def write(self, r):
+        self._csv.writerow([
+            self.count, r['url'], r['domain'], r['ip'], r['country'], r['server'],
+            str(r['status']), r['title'].replace('\n', ' '), r['scan_time'], r['result_url']
+        ])
+
+
+class NdjsonSink(ResultSink):
+    """Satır başına bir JSON nesnesi"""
+    suffix = '.ndjson'
+    
+    def write(self, r):
+        self._f.write(json.dumps(r.to_dict(), ensure_ascii=False))
+        self._f.write('\n')
+
+
+class StreamSink(NdjsonSink):
+    """NDJSON'u açık bir akışa (stdout) yazar.
+    
+    Akışı kapatmaz; aynı lock'u kullanan örnekler thread'ler arasında satır
+    bölünmeden paylaşılabilir. query verilirse her satıra eklenir. Okuyan taraf
+    kapanırsa (| head) kalan çıktı /dev/null'a yönlenir ve on_broken çağrılır.
+    """
+    
+    def __init__(self, stream, query=None, lock=None, on_broken=None):
+        self.filename = '<stdout>'
+        self.total = None
+        self.count = 0
+        self._f = stream
+        self.query = query
+        self._lock = lock or threading.Lock()
+        self.on_broken = on_broken
+    
+    def write(self, r):
+        d = r.to_dict()
+        if self.query is not None:
+            d['query'] = self.query
+        line = json.dumps(d, ensure_ascii=False) + '\n'
+        try:
+            with self._lock:
+                self._f.write(line)
+        except BrokenPipeError:
+            self._broken()
+    
+    def flush(self):
+        try:
+            with self._lock:
+                self._f.flush()
+        except BrokenPipeError:
+            self._broken()
+    
+    def _broken(self):
+        os.dup2(os.open(os.devnull, os.O_WRONLY), self._f.fileno())
+        if self.on_broken:
+            self.on_broken()
+    
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            self._f = None
+
+
+class JsonSink(ResultSink):
+    """Tek JSON belgesi; sonuç dizisi bellekte toplanmadan akış halinde yazılır"""
+    suffix = '.json'
+    
+    def _meta(self, total):
+        return json.dumps({
+            'generated': datetime.now().isoformat(),
+            'total_results': total,
+            'tool': 'URLScan.io Search Tool - Educational Version'
+        }, ensure_ascii=False)
+    
+    def write_header(self):
+        if self.total is not None:
+            self._f.write('{"meta": ' + self._meta(self.total) + ', "results": [')
+        else:
+            self._f.write('{"results": [')
+    
+    def write(self, r):
+        if self.count > 1:
+            self._f.write(',')
+        self._f.write('\n  ')
+        self._f.write(json.dumps(r.to_dict(), ensure_ascii=False))
+    
+    def write_footer(self):
+        if self.total is not None:
+            self._f.write('\n]}\n')
+        else:
+            self._f.write('\n], "meta": ' + self._meta(self.count) + '}\n')
+
+
+class SqliteSink(ResultSink):
+    """Sonuçları ResultDB'ye ekler; sayfa sonunda tek işlemde yazar.
+    
+    db verilirse (toplu modda ortak veritabanı) kapatılırken db açık bırakılır.
+    """
+    suffix = '.sqlite'
+    
+    @classmethod
+    def output_path(cls, base, compress=False):
+        return f"{base}{cls.suffix}"
+    
+    def __init__(self, filename, compress=False, total=None, append=True, db=None, query=None):
+        self.filename = db.path if db else filename
+        self.total = total
+        self.count = 0
+        self.query = query
+        self._owns_db = db is None
+        self.db = db or ResultDB(filename)
+        self._pending = []
+        self._f = self.db
+    
+    def write(self, r):
+        self._pending.append(r)
+    
+    def flush(self):
+        if self._pending:
+            self.db.add_rows(self._pending, self.query)
+            self._pending = []
+    
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            if self._owns_db:
+                self.db.close()
+            self._f = None
+
+
+class ColumnarSink(ResultSink):
+    """Sütunlu çıktı (pyarrow): satırlar sütun listelerinde biriktirilir, her
+    ROW_GROUP satırda bir satır grubu / kayıt yığını olarak yazılır. Okuyan taraf
+    sadece ihtiyaç duyduğu sütunları okur. extra JSON metni olarak saklanır.
+    """
+    COLUMNS = ('url', 'domain', 'ip', 'country', 'server', 'status', 'title', 'scan_id', 'scan_time', 'extra')
+    ROW_GROUP = 10000
+    
+    @classmethod
+    def output_path(cls, base, compress=False):
+        # Sütunlu dosyalar kendi içinde sıkıştırılır, .gz eklenmez
+        return f"{base}{cls.suffix}"
+    
+    def __init__(self, filename, compress=False, total=None, append=False):
+        self.filename = filename
+        self.total = total
+        self.count = 0
+        load_pyarrow()
+        self.schema = pa.schema([(c, pa.string()) for c in self.COLUMNS])
+        self._columns = {c: [] for c in self.COLUMNS}
+        self._f = self._open_writer()
+    
+    def _open_writer(self):
+        raise NotImplementedError
+    
+    def _write_group(self, columns):
+        raise NotImplementedError
+    
+    def write(self, r):
+        cols = self._columns
+        for c in self.COLUMNS[:-1]:
+            cols[c].append(str(r[c]))
+        extra = getattr(r, 'extra', None)
+        cols['extra'].append(json.dumps(extra, ensure_ascii=False) if extra is not None else None)
+        if len(cols['url']) >= self.ROW_GROUP:
+            self._flush_group()
+    
+    def _flush_group(self):
+        if self._columns['url']:
+            self._write_group(self._columns)
+            self._columns = {c: [] for c in self.COLUMNS}
+    
+    def flush(self):
+        # Sayfa başına değil, ROW_GROUP dolunca yazılır (küçük satır grupları okumayı yavaşlatır)
+        pass
+    
+    def close(self):
+        if self._f is not None:
+            self._flush_group()
+            self._f.close()
+            self._f = None
+
+
+class ParquetSink(ColumnarSink):
+    """Parquet (zstd, sözlük kodlamalı sütunlar)"""
+    suffix = '.parquet'
+    
+    def _open_writer(self):
+        return pq.ParquetWriter(self.filename, self.schema, compression='zstd')
+    
+    def _write_group(self, columns):
+        self._f.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+
+class ArrowSink(ColumnarSink):
+    """Arrow IPC dosyası (Feather v2, zstd); pandas/polars doğrudan bellek eşler"""
+    suffix = '.arrow'
+    
+    def _open_writer(self):
+        self._sink = pa.OSFile(self.filename, 'wb')
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        return pa.ipc.new_file(self._sink, self.schema, options=options)
+    
+    def _write_group(self, columns):
+        self._f.write_batch(pa.RecordBatch.from_pydict(columns, schema=self.schema))
+    
+    def close(self):
+        super().close()
+        self._sink.close()
+
+
+class GzipNdjsonSink(NdjsonSink):
+    """pyarrow yoksa parquet/arrow yerine yazılan gzip'li NDJSON.
+    
+    Ayrı dosyaya yazılır (base.columnar.ndjson.gz); aynı çıktıda ndjson da
+    isteniyorsa MultiSink bu yedeği hiç açmaz, ndjson dosyası kullanılır.
+    """
+    suffix = '.columnar.ndjson'
+    
+    @classmethod
+    def output_path(cls, base, compress=True):
+        return super().output_path(base, True)
+    
+    def __init__(self, filename, compress=True, total=None, append=False):
+        super().__init__(filename, True, total, append)
+
+
+SINK_TYPES = {
+    'txt': UrlListSink,
+    'detailed': DetailedTxtSink,
+    'csv': CsvSink,
+    'ndjson': NdjsonSink,
+    'json': JsonSink,
+    'sqlite': SqliteSink,
+    'parquet': ParquetSink if PYARROW_AVAILABLE else GzipNdjsonSink,
+    'arrow': ArrowSink if PYARROW_AVAILABLE else GzipNdjsonSink,
+}
+
+
+class MultiSink:
+    """Seçili tüm formatları tek geçişte yazar"""
+    
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+    
+    @classmethod
+    def open(cls, base, formats, compress=False, total=None):
+        """base + format son eki ile dosyaları aç ('urlscan_x' -> 'urlscan_x.csv' ...)
+        
+        pyarrow yoksa parquet/arrow yerine yazılan dosya RuntimeWarning ile bildirilir.
+        """
+        if isinstance(formats, str):
+            formats = formats.split(',')
+        formats = [f.strip().lower() for f in formats if f.strip()]
+        sinks = []
+        paths = set()
+        try:
+            for fmt in formats:
+                if fmt not in SINK_TYPES:
+                    raise ValueError(f"Bilinmeyen format: {fmt}")
+                sink_cls = SINK_TYPES[fmt]
+                if sink_cls is GzipNdjsonSink and 'ndjson' in formats:
+                    ndjson = SINK_TYPES['ndjson'].output_path(base, compress)
+                    warnings.warn(f"pyarrow yok: {fmt} yerine {ndjson} kullanılıyor", RuntimeWarning,
+                                  stacklevel=2)
+                    continue
+                filename = sink_cls.output_path(base, compress)
+                if sink_cls is GzipNdjsonSink:
+                    warnings.warn(f"pyarrow yok: {fmt} yerine {filename} yazılıyor", RuntimeWarning,
+                                  stacklevel=2)
+                # Aynı dosyaya düşen formatlar (parquet+arrow yedeği gibi) bir kez açılır
+                path = os.path.abspath(filename)
+                if path in paths:
+                    continue
+                paths.add(path)
+                sinks.append(sink_cls(filename, compress, total))
+        except Exception:
+            for sink in sinks:
+                sink.close()
+            raise
+        return cls(sinks)
+    
+    @property
+    def filenames(self):
+        return [s.filename for s in self.sinks]
+    
+    def write_rows(self, rows):
+        for r in rows:
+            for sink in self.sinks:
+                sink.count += 1
+                sink.write(r)
+        for sink in self.sinks:
+            sink.flush()
+    
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+DEFAULT_BASE_URL = "https://urlscan.io/api/v1/search/"
+
+
+def _iso_utc(dt):
+    """datetime → URLScan tarih sorgusu için '2024-01-31T12:00:00Z'"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _result_time(result):
+    """Arama sonucunun tarama zamanı (UTC datetime); okunamazsa None"""
+    value = (result.get('task') or {}).get('time') or ''
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
 
 
 class URLScanAPI:
     """URLScan.io API işlemleri"""
     
-    def __init__(self):
-        self.base_url = "https://urlscan.io/api/v1/search/"
+    def __init__(self, rate_limiter=None, pacer=None, cache=None, offline=False, base_url=None):
+        # Yerel replay sunucusu / test için: URLSCAN_BASE_URL veya base_url
+        self.base_url = base_url or os.environ.get('URLSCAN_BASE_URL') or DEFAULT_BASE_URL
+        # Paylaşılan TokenBucket verilirse tüm aramalar için üst sınır olur
+        self.rate_limiter = rate_limiter
+        # Başlıklara göre sayfa aralığını ayarlayan pacer (toplu modda paylaşılır)
+        self.pacer = pacer or RateLimitPacer()
+        # PageCache verilirse sayfalar önce önbellekten okunur; offline'da ağa hiç çıkılmaz
+        self.cache = cache
+        self.offline = offline
+        self._stop_event = threading.Event()
+        load_requests()
         self.session = requests.Session()
+        # Paralel (dilimli) aramada thread'ler keep-alive bağlantıları paylaşır
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Educational Research Tool)',
             'Accept': 'application/json'
         })
         self.all_results = []
+        self.stats = StatsEngine()
+        # İstek başına gecikme / boyut / bekleme ölçümleri (arama başında sıfırlanır)
+        self.metrics = RequestMetrics()
+        self.last_query = None
+        self.is_searching = False
+        self.total_available = 0
+        self.reached_known = False
+        
+    def _get_page(self, params, page, callback=None):
+        """Tek sayfayı önbellekten ya da ağdan al.
+        
+        429 ve zaman aşımında (durdurulabilir bekleme ile) tekrar dener. Sayfa
+        dict'ini, durdurulursa / HTTP hatasında / çevrimdışı önbellek ıskasında None
+        döndürür. Birden fazla thread'den aynı anda çağrılabilir.
+        """
+        retry = 0
+        # Bekleme süresi = önceki denemenin bitişinden bu isteğin gönderilmesine kadar
+        idle_since = time.monotonic()
+        while not self._stop_event.is_set():
+            data = self.cache.get(params, ignore_ttl=self.offline) if self.cache else None
+            if data is not None:
+                self._record(callback, 'search', 'cache', page=page)
+                if callback:
+                    callback('cache', page)
+                return data
+            if self.offline:
+                # Çevrimdışı modda önbellekte olmayan sayfa = sonuçların sonu
+                return None
+            
+            if self.rate_limiter and not self.rate_limiter.acquire(self._stop_event):
+                return None
+            if not self.pacer.wait(self._stop_event):
+                return None
+            
+            sent = time.monotonic()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=30)
+            except requests.exceptions.Timeout:
+                self._record(callback, 'search', 'timeout', time.monotonic() - sent, 0, retry,
+                             sent - idle_since, page=page)
+                if callback:
+                    callback('timeout', None)
+                retry += 1
+                idle_since = time.monotonic()
+                if self._stop_event.wait(5):
+                    return None
+                continue
+            except requests.exceptions.RequestException as e:
+                self._record(callback, 'search', 'error', time.monotonic() - sent, 0, retry,
+                             sent - idle_since, page=page)
+                if callback:
+                    callback('error', str(e))
+                return None
+            
+            self._record(callback, 'search', response.status_code, time.monotonic() - sent,
+                         len(response.content), retry, sent - idle_since, page=page)
+            retry_wait = self.pacer.update(response)
+            if callback:
+                callback('quota', self.pacer.snapshot())
+            
+            if response.status_code == 429:
+                retry += 1
+                idle_since = time.monotonic()
+                # Bekleme bir sonraki pacer.wait içinde yapılır (durdurulabilir)
+                if callback:
+                    callback('rate_limit', retry_wait)
+                continue
+            
+            if response.status_code != 200:
+                if callback:
+                    callback('error', f"HTTP {response.status_code}")
+                return None
+            
+            try:
+                data = response.json()
+            except ValueError:
+                if callback:
+                    callback('error', 'JSON parse hatası')
+                return None
+            if self.cache:
+                self.cache.put(params, response.content)
+            return data
+        return None
+    
+    def _record(self, callback, kind, status, latency=0.0, size=0, retry=0, wait=0.0, **info):
+        """Çağrıyı metriklere yaz ve 'request' olayı olarak bildir"""
+        entry = self.metrics.record(kind, status, latency, size, retry, wait)
+        if callback:
+            entry.update(info)
+            callback('request', entry)
+    
+    @staticmethod
+    def _next_cursor(results):
+        """Son sonucun sort değerlerinden search_after; yoksa None"""
+        sort_values = results[-1].get('sort') if results else None
+        if sort_values:
+            return ','.join(str(v) for v in sort_values)
+        return None
+    
+    def search(self, query, max_results=500, callback=None, sinks=None, known_ids=None, dedup=None):
+        """
+        URLScan.io'da arama yap
+        
+        Args:
+            query: Arama sorgusu
+            max_results: Maksimum sonuç sayısı
+            callback: Her sayfa için çağrılacak fonksiyon (GUI için)
+            sinks: Sayfalar geldikçe yazılacak MultiSink (açma/kapama çağırana ait)
+            known_ids: Daha önce görülmüş scan_id'ler; ilkine rastlanınca durulur
+            dedup: Deduper.view(...); daha önce görülen sonuçlar atlanır
+        
+        Returns:
+            list: Bulunan sonuçlar
+        """
+        self.all_results = []
+        self.stats.reset()
+        self.metrics.reset()
+        self.last_query = query
+        self.is_searching = True
+        self._stop_event.clear()
+        search_after = None
+        page = 1
+        self.total_available = 0
+        self.reached_known = reached_known = False
+        
+        while self.is_searching and len(self.all_results) < max_results:
+            params = {
+                'q': query,
+                'size': 100
+            }
+            
+            if search_after:
+                params['search_after'] = search_after
+            
+            data = self._get_page(params, page, callback)
+            if data is None:
+                break
+            
+            results = data.get('results', [])
+            
+            # Toplam sonuç sayısı
+            if self.total_available == 0:
+                self.total_available = data.get('total', 0)
+                if callback:
+                    callback('total', self.total_available)
+            
+            if not results:
+                break
+            
+            # Sonuçları işle
+            page_start = len(self.all_results)
+            for result in results:
+                if len(self.all_results) >= max_results or not self.is_searching:
+                    break
+                
+                if known_ids and result.get('_id') in known_ids:
+                    # Sonuçlar yeniden eskiye sıralı: buradan sonrası zaten elimizde
+                    self.reached_known = reached_known = True
+                    break
+                # Tekrarlar kayda dönüştürülmeden atlanır
+                if dedup is not None and not dedup.check(result):
+                    continue
+                self.all_results.append(ScanRecord.from_api(result))
+            
+            new_rows = self.all_results[page_start:]
+            self.stats.add_many(new_rows)
+            if sinks is not None:
+                sinks.write_rows(new_rows)
+            
+            if callback:
+                callback('progress', {
+                    'page': page,
+                    'count': len(self.all_results),
+                    'total': self.total_available,
+                    'start': page_start,
+                    'quota': self.pacer.snapshot()
+                })
+            
+            if reached_known:
+                break
+            
+            # Sonraki sayfa için cursor
+            search_after = self._next_cursor(results)
+            if not search_after or not data.get('has_more', False):
+                break
+            
+            page += 1
+        
         self.is_searching = False
-        self.total_available = 0
+        if callback:
+            callback('complete', len(self.all_results))
         
-    def search(self, query, max_results=500, callback=None):
+        return self.all_results
+    
+    def search_sliced(self, query, max_results=500, callback=None, sinks=None,
+                      start=None, end=None, slices=8, workers=4,
+                      max_slice_total=10000, min_slice=timedelta(hours=1), dedup=None):
         """
-        URLScan.io'da arama yap
+        Sorguyu ayrık tarih aralıklarına bölüp aralıkları paralel sayfala
+        
+        Her aralık kendi search_after cursor'ını izler; istekler ortak limiter
+        ve pacer'dan geçer, bağlantılar session havuzundan paylaşılır. İlk
+        sayfadaki toplam max_slice_total'ı aşan aralık ikiye bölünür (min_slice'a
+        kadar); o sayfa atılmaz, alt aralıklar kaldığı cursor'dan devam eder.
+        Gözlenen yoğunluğa göre tek sayfaya sığacak ardışık seyrek aralıklar
+        birleştirilip tek istekle alınır. Sonuçlar scan_id'ye göre
+        tekilleştirilir; sıra global değildir.
         
         Args:
-            query: Arama sorgusu
-            max_results: Maksimum sonuç sayısı
-            callback: Her sayfa için çağrılacak fonksiyon (GUI için)
+            start, end: Tarama zamanı aralığı (UTC datetime), varsayılan son 365 gün
+            slices: Başlangıçtaki aralık sayısı
+            workers: Aynı anda sayfalanan aralık sayısı
         
         Returns:
             list: Bulunan sonuçlar
         """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=365)
+        slices = max(1, slices)
+        workers = max(1, workers)
+        page_size = 100
+        step = (end - start) / slices
+        # (başlangıç, bitiş, cursor, tahmini toplam); tahmin yoksa yoğunluktan hesaplanır
+        pending = deque((start + step * i, start + step * (i + 1), None, None) for i in range(slices))
+        
         self.all_results = []
+        self.stats.reset()
+        self.metrics.reset()
+        self.last_query = query
         self.is_searching = True
-        search_after = None
-        page = 1
+        self._stop_event.clear()
         self.total_available = 0
+        self.reached_known = False
+        seen = set()
+        done = threading.Event()
+        lock = threading.Lock()
+        pages = 0
+        # Bölünmeden sayfalanan aralıkların toplam sonuç sayısı ve süresi (sn)
+        observed_total = 0
+        observed_span = 0.0
         
-        while self.is_searching and len(self.all_results) < max_results:
-            try:
-                params = {
-                    'q': query,
-                    'size': 100
-                }
-                
-                if search_after:
-                    params['search_after'] = search_after
-                
-                response = self.session.get(self.base_url, params=params, timeout=30)
-                
-                if response.status_code == 429:
-                    if callback:
-                        callback('rate_limit', None)
-                    time.sleep(30)
-                    continue
-                
-                if response.status_code != 200:
-                    if callback:
-                        callback('error', f"HTTP {response.status_code}")
-                    break
-                
-                data = response.json()
-                results = data.get('results', [])
-                
-                # Toplam sonuç sayısı
-                if self.total_available == 0:
-                    self.total_available = data.get('total', 0)
-                    if callback:
-                        callback('total', self.total_available)
-                
-                if not results:
-                    break
-                
-                # Sonuçları işle
+        def merge(results):
+            nonlocal pages
+            with lock:
+                pages += 1
+                page_start = len(self.all_results)
                 for result in results:
-                    if len(self.all_results) >= max_results or not self.is_searching:
+                    if len(self.all_results) >= max_results:
                         break
-                    
-                    result_data = {
-                        'url': result.get('page', {}).get('url', ''),
-                        'domain': result.get('page', {}).get('domain', ''),
-                        'ip': result.get('page', {}).get('ip', ''),
-                        'country': result.get('page', {}).get('country', ''),
-                        'server': result.get('page', {}).get('server', ''),
-                        'status': result.get('page', {}).get('status', ''),
-                        'title': result.get('page', {}).get('title', ''),
-                        'scan_id': result.get('_id', ''),
-                        'scan_time': result.get('task', {}).get('time', ''),
-                        'screenshot': f"https://urlscan.io/screenshots/{result.get('_id', '')}.png",
-                        'result_url': f"https://urlscan.io/result/{result.get('_id', '')}/"
-                    }
-                    self.all_results.append(result_data)
+                    scan_id = result.get('_id')
+                    if scan_id:
+                        if scan_id in seen:
+                            continue
+                        seen.add(scan_id)
+                    if dedup is not None and not dedup.check(result):
+                        continue
+                    self.all_results.append(ScanRecord.from_api(result))
                 
+                new_rows = self.all_results[page_start:]
+                self.stats.add_many(new_rows)
+                if sinks is not None:
+                    sinks.write_rows(new_rows)
+                if len(self.all_results) >= max_results:
+                    done.set()
                 if callback:
                     callback('progress', {
-                        'page': page,
+                        'page': pages,
                         'count': len(self.all_results),
                         'total': self.total_available,
-                        'results': results
+                        'start': page_start,
+                        'quota': self.pacer.snapshot()
                     })
+        
+        def split(a, b, total, results, has_more):
+            """Sayfası yazılmış aralığın kalanını iki yarıya dağıt"""
+            mid = a + (b - a) / 2
+            half = total / 2
+            cursor = self._next_cursor(results) if has_more else None
+            if not cursor:
+                return []
+            last = _result_time(results[-1])
+            if last is None:
+                # Zaman okunamadı: yarılar baştan alınır, ilk sayfa tekilleştirmede düşer
+                return [(a, mid, None, half), (mid, b, None, half)]
+            if last >= mid:
+                return [(a, mid, None, half), (mid, b, cursor, half)]
+            # Üst yarı ilk sayfada bitti; kalan her şey alt yarıda
+            return [(a, mid, cursor, half)]
+        
+        def run_slice(a, b, cursor):
+            """Aralığı sonuna kadar sayfala; bölünmesi gerekiyorsa alt aralıkları döndür"""
+            nonlocal observed_total, observed_span
+            clause = f'({query}) AND date:["{_iso_utc(a)}" TO "{_iso_utc(b)}"}}'
+            params = {'q': clause, 'size': page_size}
+            if cursor:
+                params['search_after'] = cursor
+            first = True
+            while not done.is_set() and self.is_searching:
+                with lock:
+                    page = pages + 1
+                data = self._get_page(params, page, callback)
+                if data is None:
+                    return []
+                results = data.get('results', [])
+                if first:
+                    first = False
+                    total = data.get('total', 0)
+                    if total >= max_slice_total and b - a > min_slice:
+                        if callback:
+                            callback('slice', {'start': a, 'end': b, 'total': total, 'split': True})
+                        if not results:
+                            return []
+                        merge(results)
+                        return split(a, b, total, results, data.get('has_more', False))
+                    with lock:
+                        self.total_available += total
+                        observed_total += total
+                        observed_span += (b - a).total_seconds()
+                    if callback:
+                        callback('slice', {'start': a, 'end': b, 'total': total, 'split': False})
+                        callback('total', self.total_available)
+                if not results:
+                    return []
+                merge(results)
                 
-                # Sonraki sayfa için cursor
-                if results:
-                    last_result = results[-1]
-                    sort_values = last_result.get('sort')
-                    
-                    if sort_values and len(sort_values) > 0:
-                        search_after = ','.join(str(v) for v in sort_values)
-                    else:
+                cursor = self._next_cursor(results)
+                if not cursor or not data.get('has_more', False):
+                    return []
+                params = dict(params, search_after=cursor)
+            return []
+        
+        def estimate(entry):
+            a, b, _, est = entry
+            if est is not None:
+                return est
+            return observed_total / observed_span * (b - a).total_seconds()
+        
+        def take():
+            """Sıradaki aralık; tek sayfaya sığacak seyrek komşular birleştirilir"""
+            a, b, cursor, est = pending.popleft()
+            if cursor is None and observed_span:
+                count = estimate((a, b, cursor, est))
+                while pending and pending[0][0] == b and pending[0][2] is None:
+                    count += estimate(pending[0])
+                    if count > page_size:
                         break
-                else:
-                    break
-                
-                if not data.get('has_more', False):
+                    b = pending.popleft()[1]
+            return a, b, cursor
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = set()
+            while True:
+                while pending and len(futures) < workers and not done.is_set() and self.is_searching:
+                    with lock:
+                        task = take()
+                    futures.add(pool.submit(run_slice, *task))
+                if not futures:
                     break
-                
-                page += 1
-                time.sleep(0.5)
-                
-            except requests.exceptions.Timeout:
-                if callback:
-                    callback('timeout', None)
-                time.sleep(5)
+                finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for f in finished:
+                    pending.extend(f.result())
+        
+        self.is_searching = False
+        if callback:
+            callback('complete', len(self.all_results))
+        
+        return self.all_results
+    
+    def screenshot_url(self, scan_id):
+        """Taramanın ekran görüntüsü (arama adresiyle aynı sunucuda /screenshots/ID.png)"""
+        return urljoin(self.base_url, f"/screenshots/{scan_id}.png")
+    
+    def result_api_url(self, scan_id):
+        """Taramanın tam sonuç JSON'u (arama adresine göre: .../api/v1/result/ID/)"""
+        return urljoin(self.base_url, f"../result/{scan_id}/")
+    
+    @property
+    def stopped(self):
+        """Son arama stop() ile kesildi mi"""
+        return self._stop_event.is_set()
+    
+    def stop(self):
+        """Aramayı durdur (bekleyen uykular hemen uyanır)"""
+        self.is_searching = False
+        self._stop_event.set()
+    
+    def _save(self, fmt, filename):
+        if not self.all_results:
+            return False
+        
+        with MultiSink([SINK_TYPES[fmt](filename, total=len(self.all_results))]) as sink:
+            sink.write_rows(self.all_results)
+        
+        return True
+    
+    def save_txt(self, filename):
+        """Sadece URL'leri TXT olarak kaydet"""
+        return self._save('txt', filename)
+    
+    def save_detailed_txt(self, filename):
+        """Detaylı TXT raporu kaydet"""
+        return self._save('detailed', filename)
+    
+    def save_csv(self, filename):
+        """CSV olarak kaydet"""
+        return self._save('csv', filename)
+    
+    def save_json(self, filename):
+        """JSON olarak kaydet"""
+        return self._save('json', filename)
+    
+    def save_ndjson(self, filename):
+        """NDJSON olarak kaydet"""
+        return self._save('ndjson', filename)
+    
+    def save_parquet(self, filename):
+        """Parquet olarak kaydet (pyarrow yoksa gzip'li NDJSON)"""
+        return self._save('parquet', filename)
+    
+    def export(self, base, formats, compress=False):
+        """Birden fazla formatı sonuçlar üzerinde tek geçişte yaz, dosya adlarını döndür"""
+        if not self.all_results:
+            return []
+        
+        with MultiSink.open(base, formats, compress, total=len(self.all_results)) as sinks:
+            sinks.write_rows(self.all_results)
+        
+        files = sinks.filenames
+        if self.metrics.kinds:
+            files.append(self.write_report(f"{base}_report.json"))
+        return files
+    
+    def report(self):
+        """Son çalıştırmanın istek özeti (toplamlar, yüzdelikler, kota)"""
+        return {
+            'generated': datetime.now().isoformat(),
+            'query': self.last_query,
+            'results': len(self.all_results),
+            'total_available': self.total_available,
+            'stopped': self.stopped,
+            **self.metrics.summary(self.pacer.snapshot())
+        }
+    
+    def write_report(self, filename):
+        """İstek özetini JSON olarak yaz, dosya adını döndür"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return filename
+    
+    def get_statistics(self):
+        """İstatistikleri döndür (artımlı motordan)"""
+        if not self.all_results:
+            return {}
+        # all_results dışarıdan değiştirildiyse motoru bir kez yeniden kur
+        if self.stats.total != len(self.all_results):
+            self.stats.rebuild(self.all_results)
+        return self.stats.statistics()
+
+
+def format_quota(quota):
+    """Kota bilgisini kısa metne çevir: ' | kota 95/100, sıfırlama 42 sn'"""
+    if not quota or quota.get('remaining') is None:
+        return ''
+    text = f" | kota {quota['remaining']}"
+    if quota.get('limit'):
+        text += f"/{quota['limit']}"
+    if quota.get('reset_in') is not None:
+        text += f", sıfırlama {quota['reset_in']:.0f} sn"
+    return text
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SONUÇ ZENGİNLEŞTİRME
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.urlscan_cache')
+
+# alan adı → sonuç JSON'undaki noktalı yol
+ENRICH_FIELDS = {
+    'asn': 'page.asn',
+    'asnname': 'page.asnname',
+    'domains': 'lists.domains',
+    'ips': 'lists.ips',
+    'certificates': 'lists.certificates',
+    'malicious': 'verdicts.overall.malicious',
+}
+
+
+def parse_enrich_fields(spec):
+    """'asn,domains,tls=lists.certificates' → {ad: yol}; boşsa varsayılan alanlar"""
+    if not spec:
+        return dict(ENRICH_FIELDS)
+    fields = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, path = item.partition('=')
+        path = path or ENRICH_FIELDS.get(name)
+        if not path:
+            raise ValueError(f"Bilinmeyen alan: {name}")
+        fields[name] = path
+    return fields
+
+
+def extract_path(data, path):
+    """Noktalı yol ile iç içe dict/list'ten değer al; bulunamazsa None"""
+    for part in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+    return data
+
+
+class ResultEnricher:
+    """Taramaların tam sonuç JSON'unu paralel çekip kayıtlara alan ekler.
+    
+    Aynı scan_id'ye sahip kayıtlar tek istekle doldurulur; yanıtlar diskte
+    scan_id ile (gzip) saklanır, bellekte de çıkarılan alanlar tutulur; böylece
+    hiçbir tarama iki kez çekilmez. İstekler aramanın session havuzunu kullanır,
+    workers ile sınırlanır ve TokenBucket / pacer'dan geçer; toplu modda bunlar
+    tüm sorguların zenginleştiricileri arasında paylaşılır.
+    """
+    
+    def __init__(self, api, cache_dir=None, fields=None, workers=4, rate=2.0, callback=None,
+                 rate_limiter=None, pacer=None):
+        self.api = api
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, 'results')
+        self.fields = dict(fields or ENRICH_FIELDS)
+        self.workers = max(1, workers)
+        # Verilmezse kendi limiter / pacer'ı olur (tek arama, GUI)
+        self.limiter = rate_limiter or TokenBucket(rate)
+        self.pacer = pacer or RateLimitPacer()
+        self.callback = callback
+        self.fetched = 0
+        self.cached = 0
+        self.failed = 0
+        self._extracted = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    def _cache_path(self, scan_id):
+        safe = re.sub(r'[^0-9A-Za-z-]', '', scan_id)
+        return os.path.join(self.cache_dir, safe[:2], safe + '.json.gz')
+    
+    def _read_cache(self, scan_id):
+        try:
+            with gzip.open(self._cache_path(scan_id), 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, EOFError, ValueError):
+            return None
+    
+    def _write_cache(self, scan_id, body):
+        path = self._cache_path(scan_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp, 'wb', compresslevel=5) as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    
+    def _fetch(self, scan_id):
+        """Sonuç JSON'u (önce disk); 404/hata/durdurma durumunda None"""
+        data = self._read_cache(scan_id)
+        if data is not None:
+            with self._lock:
+                self.cached += 1
+            return data
+        
+        url = self.api.result_api_url(scan_id)
+        retry, idle_since = 0, time.monotonic()
+        while not self._stop_event.is_set():
+            if not self.limiter.acquire(self._stop_event) or not self.pacer.wait(self._stop_event):
+                return None
+            sent = time.monotonic()
+            try:
+                response = self.api.session.get(url, timeout=30)
+            except requests.exceptions.RequestException:
+                self.api._record(self.callback, 'result', 'error', time.monotonic() - sent, 0,
+                                 retry, sent - idle_since, scan_id=scan_id)
+                break
+            self.api._record(self.callback, 'result', response.status_code, time.monotonic() - sent,
+                             len(response.content), retry, sent - idle_since, scan_id=scan_id)
+            if self.pacer.update(response) is not None:
+                retry, idle_since = retry + 1, time.monotonic()
                 continue
-            except requests.exceptions.RequestException as e:
-                if callback:
-                    callback('error', str(e))
+            if response.status_code != 200:
                 break
-            except json.JSONDecodeError:
-                if callback:
-                    callback('error', 'JSON parse hatası')
+            try:
+                data = response.json()
+            except ValueError:
                 break
+            self._write_cache(scan_id, response.content)
+            with self._lock:
+                self.fetched += 1
+            return data
+        
+        with self._lock:
+            self.failed += 1
+        return None
+    
+    def _extract(self, data):
+        return {name: extract_path(data, path) for name, path in self.fields.items()}
+    
+    def enrich(self, records):
+        """Kayıtların extra alanını doldur; zenginleşen kayıt sayısını döndür"""
+        groups = {}
+        for r in records:
+            if r['scan_id']:
+                groups.setdefault(r['scan_id'], []).append(r)
+        
+        todo = [sid for sid in groups if sid not in self._extracted]
+        self._stop_event.clear()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch, sid): sid for sid in todo}
+            for f in as_completed(futures):
+                data = f.result()
+                if data is not None:
+                    self._extracted[futures[f]] = self._extract(data)
+                done += 1
+                if self.callback:
+                    self.callback('enrich', {'done': done, 'total': len(todo)})
+        
+        count = 0
+        for sid, rows in groups.items():
+            extra = self._extracted.get(sid)
+            if extra is not None:
+                for r in rows:
+                    r.extra = extra
+                count += len(rows)
+        return count
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EKRAN GÖRÜNTÜLERİ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ScreenshotStore:
+    """Ekran görüntülerini toplu indiren, içerik adresli disk deposu.
+    
+    Dosyalar objects/ altında sha256 ile saklanır; aynı görüntü bir kez durur.
+    index.json scan_id → sha256 eşlemesini tutar (404 ise None), böylece yarıda
+    kalan indirme kaldığı yerden devam eder. İndirilen her görüntü arka plandaki
+    tek bir thread'de küçük resme çevrilir (PIL varsa; yoksa galeri orijinali
+    küçültür). Toplu modda TokenBucket / pacer tüm sorguların depoları arasında
+    paylaşılır; 429 alan istek pacer beklemesinden sonra tekrarlanır.
+    """
+    
+    THUMB_SIZE = (240, 180)
+    
+    def __init__(self, api, directory=None, workers=4, rate=4.0, callback=None,
+                 rate_limiter=None, pacer=None):
+        self.api = api
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIR, 'screenshots')
+        self.workers = max(1, workers)
+        # Verilmezse kendi limiter / pacer'ı olur (tek arama, GUI)
+        self.limiter = rate_limiter or TokenBucket(rate)
+        # Görüntü yanıtlarında kota başlığı yok; hızı bucket belirler, pacer 429'u uygular
+        self.pacer = pacer or RateLimitPacer(default_interval=0.0)
+        self.callback = callback
+        self.index_file = os.path.join(self.directory, 'index.json')
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thumbs = queue.Queue()
+        self._thumb_thread = None
+        self.downloaded = 0
+        self.duplicates = 0
+        self.failed = 0
+        os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'thumbs'), exist_ok=True)
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest + '.png')
+    
+    def thumb_path(self, digest):
+        return os.path.join(self.directory, 'thumbs', digest + '.png')
+    
+    def image_for(self, scan_id):
+        """(küçük resim yolu, küçük mü) — henüz yoksa (None, False)"""
+        digest = self.index.get(scan_id)
+        if not digest:
+            return None, False
+        thumb = self.thumb_path(digest)
+        if os.path.exists(thumb):
+            return thumb, True
+        if not PIL_AVAILABLE:
+            return self.object_path(digest), False
+        return None, False
+    
+    def _save_index(self):
+        tmp = self.index_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_file)
+    
+    def _fetch(self, scan_id):
+        """Tek görüntüyü indir; sha256 (404'te None) veya hata durumunda False döndür"""
+        retry, idle_since = 0, time.monotonic()
+        tmp = os.path.join(self.directory, f"dl_{threading.get_ident()}.tmp")
+        while True:
+            if not self.limiter.acquire(self._stop_event) or not self.pacer.wait(self._stop_event):
+                return False
+            h = hashlib.sha256()
+            sent = time.monotonic()
+            attempt, waited = retry, sent - idle_since
+            status, size = 'error', 0
+            try:
+                with self.api.session.get(self.api.screenshot_url(scan_id), timeout=30, stream=True) as response:
+                    status = response.status_code
+                    if self.pacer.update(response) is not None:
+                        retry, idle_since = retry + 1, time.monotonic()
+                        continue
+                    if status == 404:
+                        return None
+                    if status != 200:
+                        return False
+                    with open(tmp, 'wb') as f:
+                        for chunk in response.iter_content(64 * 1024):
+                            h.update(chunk)
+                            f.write(chunk)
+                            size += len(chunk)
+            except (requests.exceptions.RequestException, OSError):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                return False
+            finally:
+                self.api._record(self.callback, 'screenshot', status, time.monotonic() - sent, size,
+                                 attempt, waited, scan_id=scan_id)
+            break
+        
+        digest = h.hexdigest()
+        path = self.object_path(digest)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(tmp)
+                self.duplicates += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+                self.downloaded += 1
+        return digest
+    
+    def _thumb_loop(self):
+        from PIL import Image
+        while True:
+            digest = self._thumbs.get()
+            try:
+                if digest is None:
+                    return
+                thumb = self.thumb_path(digest)
+                if not os.path.exists(thumb):
+                    with Image.open(self.object_path(digest)) as img:
+                        img.thumbnail(self.THUMB_SIZE)
+                        img.save(thumb + '.tmp', 'PNG')
+                    os.replace(thumb + '.tmp', thumb)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._thumbs.task_done()
+    
+    def _queue_thumb(self, digest):
+        if not PIL_AVAILABLE or os.path.exists(self.thumb_path(digest)):
+            return
+        if self._thumb_thread is None or not self._thumb_thread.is_alive():
+            self._thumb_thread = threading.Thread(target=self._thumb_loop, daemon=True)
+            self._thumb_thread.start()
+        self._thumbs.put(digest)
+    
+    def download(self, records):
+        """Kayıtların ekran görüntülerini indir; diskte olanları atla. Yeni indirilen sayısını döndür"""
+        todo, seen = [], set()
+        for r in records:
+            sid = r['scan_id']
+            if not sid or sid in seen:
+                continue
+            seen.add(sid)
+            if sid in self.index:
+                digest = self.index[sid]
+                if digest and os.path.exists(self.object_path(digest)):
+                    self._queue_thumb(digest)
+                    continue
+                if digest is None:
+                    continue
+            todo.append(sid)
+        
+        self._stop_event.clear()
+        done = 0
+        before = self.downloaded
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch, sid): sid for sid in todo}
+            for f in as_completed(futures):
+                digest = f.result()
+                done += 1
+                if digest is False:
+                    self.failed += 1
+                else:
+                    with self._lock:
+                        self.index[futures[f]] = digest
+                    if digest:
+                        self._queue_thumb(digest)
+                # Ara kayıt: kesilirse buraya kadar indirilenler tekrar indirilmez
+                if done % 25 == 0:
+                    with self._lock:
+                        self._save_index()
+                if self.callback:
+                    self.callback('screenshot', {'done': done, 'total': len(todo)})
+        
+        with self._lock:
+            self._save_index()
+        return self.downloaded - before
+    
+    def wait_thumbnails(self):
+        """Kuyruktaki küçük resimler bitene kadar bekle"""
+        if self._thumb_thread is not None:
+            self._thumbs.join()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ARTIMLI (DELTA) TOPLAMA
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class DeltaStore:
+    """Sorgu başına "son çalıştırmadan beri" toplama durumu.
+    
+    state.json her sorgu için görülen en yeni scan_time'ı ve en yeni scan_id'leri
+    tutar. prepare() sorguya tarih alt sınırı ekler ve bilinen id'leri verir;
+    arama ilk bilinen id'de durur. commit() yeni satırları sorgunun NDJSON
+    veri setine ekler ve durumu günceller.
+    """
+    
+    def __init__(self, directory, keep_ids=1000, compress=False):
+        self.directory = directory
+        self.keep_ids = keep_ids
+        self.compress = compress
+        self.state_file = os.path.join(directory, 'state.json')
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.state_file, encoding='utf-8') as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+    
+    def dataset_path(self, query):
+        name = f"{query_slug(query)}_{PageCache.key(query)[:8]}.ndjson"
+        return os.path.join(self.directory, name + ('.gz' if self.compress else ''))
+    
+    def prepare(self, query):
+        """(aranacak sorgu, bilinen id kümesi); ilk çalıştırmada sorgu aynen döner"""
+        with self._lock:
+            entry = self.state.get(query)
+        if not entry or not entry.get('newest_time'):
+            return query, None
+        # >= sınırdaki taramaları da getirir; onları bilinen id'ler eler
+        since = entry['newest_time']
+        return f'({query}) AND date:>="{since}"', set(entry.get('ids', []))
+    
+    def commit(self, query, rows, complete=True):
+        """Yeni satırları veri setine ekle, durumu kaydet; veri seti yolunu döndür.
+        
+        complete=False: bilinen id'lere ulaşılamadan max_results doldu, önceki
+        çalıştırmayla arada kaçan sonuçlar olabilir (durumda 'gap' olarak işaretlenir).
+        """
+        path = self.dataset_path(query)
+        if rows:
+            sink = NdjsonSink(path, append=True)
+            sink.write_rows(rows)
+            sink.close()
+        
+        with self._lock:
+            entry = self.state.get(query) or {'newest_time': '', 'ids': [], 'total': 0}
+            ids = [r['scan_id'] for r in rows if r['scan_id']]
+            new_ids = set(ids)
+            times = [r['scan_time'] for r in rows if r['scan_time']]
+            entry['newest_time'] = max(times + [entry['newest_time']])
+            entry['ids'] = (ids + [i for i in entry['ids'] if i not in new_ids])[:self.keep_ids]
+            entry['total'] = entry.get('total', 0) + len(rows)
+            entry['last_run'] = datetime.now().isoformat()
+            entry['last_new'] = len(rows)
+            entry['gap'] = not complete
+            self.state[query] = entry
+            self._save()
+        return path
+    
+    def _save(self):
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_file)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOPLU SORGU MODU
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def load_queries(filename):
+    """Sorgu dosyasını oku (satır başına bir sorgu, # ile başlayanlar yorum)"""
+    queries = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                queries.append(line)
+    return queries
+
+
+def query_slug(query, limit=60):
+    """Sorgudan dosya adına uygun kısa isim üret"""
+    slug = re.sub(r'[^\w.-]+', '_', query).strip('_')
+    return slug[:limit] or 'query'
+
+
+class BatchRunner:
+    """Kayıtlı sorguları eşzamanlı çalıştırır.
+    
+    Tüm sorgular tek bir TokenBucket'ı paylaşır; toplam süreyi sorgu sayısı
+    değil API kotası belirler. Her sorgunun sonuçları ayrı dosyalara yazılır.
+    """
+    
+    def __init__(self, queries, out_dir, max_results=500, workers=4, rate=1.0, burst=None,
+                 formats=('txt', 'csv', 'json'), compress=False, callback=None,
+                 cache=None, offline=False, delta=None, slices=0, since_days=365,
+                 enrich_fields=None, enrich_cache=None, screenshots=None, db=None, dedup=None,
+                 base_url=None, stream=None):
+        if slices and delta:
+            # Delta sınırı en yeni sonuçtan geriye ilerler; tarih dilimleriyle birleştirilemez
+            raise ValueError("--slices ve --delta birlikte kullanılamaz")
+        self.queries = list(queries)
+        self.out_dir = out_dir
+        self.max_results = max_results
+        self.workers = max(1, workers)
+        self.limiter = TokenBucket(rate, burst)
+        self.pacer = RateLimitPacer()
+        # Sonuç API'sinin kotası aramadan ayrıdır; tüm sorguların zenginleştiricileri paylaşır
+        self.enrich_limiter = TokenBucket(rate)
+        self.enrich_pacer = RateLimitPacer()
+        # Ekran görüntüsü indirmeleri de tüm sorgularda tek bucket / pacer'dan geçer
+        self.screenshot_limiter = TokenBucket(rate)
+        self.screenshot_pacer = RateLimitPacer(default_interval=0.0)
+        self.formats = [f for f in formats if f in SINK_TYPES]
+        self.compress = compress
+        self.callback = callback
+        self.cache = cache
+        self.offline = offline
+        # DeltaStore verilirse her sorgu sadece son çalıştırmadan yeni sonuçları çeker
+        self.delta = delta
+        # slices > 0: her sorgu tarih dilimlerine bölünüp paralel sayfalanır
+        self.slices = slices
+        self.since_days = since_days
+        # enrich_fields verilirse sonuçlar arama sonrası zenginleştirilip ayrı NDJSON'a yazılır
+        self.enrich_fields = enrich_fields
+        self.enrich_cache = enrich_cache
+        # Ekran görüntüsü deposu klasörü (tüm sorgular paylaşır)
+        self.screenshots = screenshots
+        # Tüm sorguların yazıldığı ortak ResultDB
+        self.db = db
+        # Deduper verilirse başka sorgularda görülen sonuçlar atlanır
+        self.dedup = dedup
+        self.base_url = base_url
+        # stream verilirse (stdout) sonuçlar ayrıca NDJSON olarak akıtılır; out_dir None
+        # ise diske hiçbir şey yazılmaz
+        self.stream = stream
+        self._stream_lock = threading.Lock()
+        self.apis = []
+        self._lock = threading.Lock()
+    
+    def stop(self):
+        """Çalışan tüm aramaları durdur"""
+        with self._lock:
+            for api in self.apis:
+                api.stop()
+    
+    def _run_one(self, index, query):
+        api = URLScanAPI(rate_limiter=self.limiter, pacer=self.pacer,
+                         cache=self.cache, offline=self.offline, base_url=self.base_url)
+        with self._lock:
+            self.apis.append(api)
+        
+        started = time.time()
+        error = None
+        
+        def cb(event, data):
+            nonlocal error
+            if event == 'error':
+                error = data
+            if self.callback:
+                self.callback(index, query, event, data)
+        
+        search_query, known_ids = query, None
+        view = self.dedup.view(query) if self.dedup else None
+        if self.delta:
+            search_query, known_ids = self.delta.prepare(query)
+        
+        # Sonuçlar sayfa sayfa diske yazılır
+        base = os.path.join(self.out_dir, f"{index:03d}_{query_slug(query)}") if self.out_dir else None
+        stream = None
+        if self.stream is not None:
+            stream = StreamSink(self.stream, query if len(self.queries) > 1 else None,
+                                self._stream_lock, on_broken=self.stop)
+        with MultiSink.open(base, self.formats if base else [], self.compress) as sinks:
+            # Zenginleştirilecek sonuçlar akışa alanlar eklendikten sonra yazılır
+            if stream and not self.enrich_fields:
+                sinks.sinks.append(stream)
+            if self.db:
+                sinks.sinks.append(SqliteSink(None, db=self.db, query=query))
+            if self.slices:
+                api.search_sliced(query, self.max_results, cb, sinks=sinks,
+                    start=datetime.now(timezone.utc) - timedelta(days=self.since_days),
+                    slices=self.slices, workers=min(self.slices, 8), dedup=view)
+            else:
+                api.search(search_query, self.max_results, cb, sinks=sinks, known_ids=known_ids,
+                           dedup=view)
+        files = sinks.filenames
+        if self.enrich_fields and api.all_results and not api.stopped:
+            enricher = ResultEnricher(api, self.enrich_cache, self.enrich_fields, callback=cb,
+                rate_limiter=self.enrich_limiter, pacer=self.enrich_pacer)
+            enricher.enrich(api.all_results)
+            if base:
+                with NdjsonSink(f"{base}_enriched.ndjson", self.compress) as sink:
+                    sink.write_rows(api.all_results)
+                files.append(sink.filename)
+        if stream and self.enrich_fields:
+            with stream:
+                stream.write_rows(api.all_results)
+        
+        if self.screenshots and api.all_results and not api.stopped:
+            store = ScreenshotStore(api, self.screenshots, callback=cb,
+                rate_limiter=self.screenshot_limiter, pacer=self.screenshot_pacer)
+            store.download(api.all_results)
+            store.wait_thumbnails()
+        
+        # Yarıda kesilen çalıştırma durumu ilerletmez; sonraki çalıştırma aynı aralığı tekrar çeker
+        if self.delta and error is None and not api.stopped:
+            complete = known_ids is None or api.reached_known or len(api.all_results) < self.max_results
+            files.append(self.delta.commit(query, api.all_results, complete))
+        
+        if base:
+            files.append(api.write_report(f"{base}_report.json"))
+        metrics = api.metrics.summary()
+        
+        with self._lock:
+            self.apis.remove(api)
+        
+        return {
+            'query': query,
+            'count': len(api.all_results),
+            'total_available': api.total_available,
+            'seconds': round(time.time() - started, 2),
+            'error': error,
+            'files': files,
+            'dedup': view.summary() if view else None,
+            'requests': {k: metrics[k] for k in ('requests', 'cached', 'retries', 'bytes',
+                                                 'rate_wait_seconds', 'network_seconds')}
+        }
+    
+    def run(self):
+        """Tüm sorguları çalıştır, sorgu başına özet listesi döndür"""
+        if self.out_dir:
+            os.makedirs(self.out_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_one, i, q) for i, q in enumerate(self.queries, 1)]
+            try:
+                summary = [f.result() for f in futures]
+            except KeyboardInterrupt:
+                for f in futures:
+                    f.cancel()
+                self.stop()
+                raise
+        
+        if self.out_dir:
+            with open(os.path.join(self.out_dir, 'batch_summary.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'generated': datetime.now().isoformat(),
+                    'queries': summary
+                }, f, ensure_ascii=False, indent=2)
+        
+        return summary
+
+
+def batch_cli_callback(index, query, event, data):
+    """Toplu mod için kısa terminal çıktısı"""
+    tag = f"[{index:03d}] {query[:40]}"
+    if event == 'total':
+        print(f"{tag} 📊 Toplam {data} sonuç mevcut")
+    elif event == 'progress':
+        print(f"{tag} 📥 Sayfa {data['page']}: {data['count']}/{data['total']}")
+    elif event == 'slice' and data['split']:
+        print(f"{tag} ✂️ {_iso_utc(data['start'])} - {_iso_utc(data['end'])}: "
+              f"{data['total']} sonuç, aralık bölünüyor")
+    elif event == 'enrich' and (data['done'] % 50 == 0 or data['done'] == data['total']):
+        print(f"{tag} 🔬 Detay {data['done']}/{data['total']}")
+    elif event == 'screenshot' and (data['done'] % 50 == 0 or data['done'] == data['total']):
+        print(f"{tag} 🖼 Ekran görüntüsü {data['done']}/{data['total']}")
+    elif event == 'rate_limit':
+        print(f"{tag} ⏳ Rate limit, {data:.0f} sn bekleniyor...")
+    elif event == 'timeout':
+        print(f"{tag} ⚠️ Zaman aşımı, tekrar deneniyor...")
+    elif event == 'error':
+        print(f"{tag} ❌ Hata: {data}")
+    elif event == 'complete':
+        print(f"{tag} ✅ {data} sonuç")
+
+
+def argv_value(argv, name, default=None):
+    """'--isim DEĞER' biçimindeki seçeneğin değeri"""
+    if name in argv:
+        i = argv.index(name)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+
+def cache_from_argv(argv):
+    """--cache KLASÖR [--cache-ttl SN] [--cache-mb MB] [--offline] → (PageCache|None, offline)"""
+    cache = None
+    directory = argv_value(argv, '--cache')
+    if directory:
+        cache = PageCache(directory,
+            ttl=float(argv_value(argv, '--cache-ttl', 24 * 3600)),
+            max_bytes=int(float(argv_value(argv, '--cache-mb', 200)) * 1024 * 1024))
+    offline = '--offline' in argv
+    if offline and cache is None:
+        print("⚠️ --offline için --cache KLASÖR gerekli")
+        sys.exit(2)
+    return cache, offline
+
+
+def api_from_argv(argv):
+    cache, offline = cache_from_argv(argv)
+    return URLScanAPI(cache=cache, offline=offline, base_url=argv_value(argv, '--base-url'))
+
+
+def run_batch(argv):
+    """--batch DOSYA [--out KLASÖR] [--max N] [--workers N] [--rate R] [--formats txt,csv,json] [--gzip]
+    [--delta KLASÖR] [--slices N] [--since GÜN] [--enrich [ALANLAR]] [--screenshots KLASÖR]
+    [--db DOSYA] [--dedup scan_id|url|domain] [--dedup-store auto|set|bloom|disk]
+    [--cache KLASÖR] [--offline]"""
+    def arg(name, default=None):
+        return argv_value(argv, name, default)
+    
+    queries = load_queries(arg('--batch'))
+    if not queries:
+        print("⚠️ Sorgu dosyası boş!")
+        return
+    
+    cache, offline = cache_from_argv(argv)
+    if int(arg('--slices', 0)) and arg('--delta'):
+        print("⚠️ --slices ve --delta birlikte kullanılamaz")
+        sys.exit(2)
+    enrich_fields = None
+    if '--enrich' in argv:
+        spec = arg('--enrich', '')
+        try:
+            enrich_fields = parse_enrich_fields('' if spec.startswith('--') else spec)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+    delta = DeltaStore(arg('--delta'), compress='--gzip' in argv) if arg('--delta') else None
+    out_dir = arg('--out', f"urlscan_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    max_results = min(int(arg('--max', 500)), 50000)
+    dedup = None
+    if arg('--dedup'):
+        try:
+            dedup = Deduper(arg('--dedup'), arg('--dedup-store', 'auto'),
+                expected=max_results * len(queries), path=os.path.join(out_dir, 'dedup.sqlite'))
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+    runner = BatchRunner(
+        queries, out_dir,
+        max_results=max_results,
+        workers=int(arg('--workers', 4)),
+        rate=float(arg('--rate', 1.0)),
+        formats=arg('--formats', 'txt,csv,json').split(','),
+        compress='--gzip' in argv,
+        callback=batch_cli_callback,
+        cache=cache,
+        offline=offline,
+        delta=delta,
+        slices=int(arg('--slices', 0)),
+        since_days=float(arg('--since', 365)),
+        enrich_fields=enrich_fields,
+        screenshots=arg('--screenshots'),
+        db=ResultDB(arg('--db')) if arg('--db') else None,
+        dedup=dedup,
+        base_url=arg('--base-url')
+    )
+    print(f"🔍 {len(queries)} sorgu, {runner.workers} paralel, {runner.limiter.rate} istek/sn")
+    started = time.time()
+    summary = runner.run()
+    if runner.db:
+        runner.db.close()
+    if dedup:
+        dedup.close()
+        print(f"\n🔁 Tekilleştirme ({dedup.mode}, {dedup.backend}):")
+        for item in dedup.report():
+            overlap = ', '.join(f"{q[:30]}: {n}" for q, n in list(item['overlap'].items())[:3])
+            print(f"  {item['query'][:40]:<40} yeni {item['new']:>6}  tekrar {item['duplicates']:>6}"
+                  f"{'  ← ' + overlap if overlap else ''}")
+    total = sum(s['count'] for s in summary)
+    requests_made = sum(s['requests']['requests'] for s in summary)
+    waited = sum(s['requests']['rate_wait_seconds'] for s in summary)
+    network = sum(s['requests']['network_seconds'] for s in summary)
+    print(f"\n📈 {requests_made} istek, ağda {network:.1f} sn, rate limit beklemesi {waited:.1f} sn "
+          f"(sorgu başına ayrıntı: *_report.json)")
+    print(f"✅ {len(summary)} sorgu, {total} sonuç, {time.time() - started:.1f} sn → {out_dir}")
+
+
+def run_find(argv):
+    """--db DOSYA --find METİN [--country TR] [--status 200] [--since TARİH] [--sort scan_time] [--asc] [--limit 50]"""
+    def arg(name, default=None):
+        return argv_value(argv, name, default)
+    
+    path = arg('--db')
+    if not path or not os.path.exists(path):
+        print("⚠️ --db ile var olan bir veritabanı verin")
+        return
+    text = arg('--find', '')
+    if text.startswith('--'):
+        text = ''
+    filters = dict(text=text, country=arg('--country'), status=arg('--status'), since=arg('--since'))
+    
+    db = ResultDB(path)
+    started = time.perf_counter()
+    try:
+        rows = db.search(order=arg('--sort', 'scan_time'), desc='--asc' not in argv,
+                         limit=int(arg('--limit', 50)), **filters)
+        total = db.count(**filters)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        return
+    finally:
+        db.close()
+    ms = (time.perf_counter() - started) * 1000
+    
+    for r in rows:
+        print(f"{r['scan_time'][:19]}  [{r['country'] or '--'}] {r['status'] or '---':>3}  "
+              f"{r['domain'][:30]:<30}  {r['url']}")
+    print(f"\n🔎 {len(rows)}/{total} sonuç, {ms:.1f} ms ({'FTS5' if db.fts else 'LIKE'})")
+
+
+# Etkileşimsiz arama modunun çıkış kodları
+EXIT_OK = 0
+EXIT_ERROR = 1          # en az bir sorguda API / ağ hatası
+EXIT_USAGE = 2          # hatalı argüman (argparse ile aynı)
+EXIT_EMPTY = 3          # --fail-empty verildi ve hiç sonuç yok
+EXIT_INTERRUPTED = 130
+
+
+def search_arg_parser():
+    """'search' alt komutunun argümanları"""
+    parser = argparse.ArgumentParser(
+        prog='link.py search',
+        description="Etkileşimsiz arama: sonuçlar stdout'a NDJSON, ilerleme stderr'e yazılır.",
+        epilog="Çıkış kodları: 0 başarılı, 1 sorgu hatası, 2 hatalı kullanım, "
+               "3 sonuç yok (--fail-empty), 130 kesildi")
+    parser.add_argument('query', nargs='?', help="Arama sorgusu ('-' ise stdin'den satır başına bir sorgu)")
+    parser.add_argument('-f', '--query-file', help="Sorgu dosyası (satır başına bir sorgu, # yorum)")
+    parser.add_argument('-n', '--max', type=int, default=500, help="Sorgu başına en fazla sonuç (varsayılan 500)")
+    
+    out = parser.add_argument_group('çıktı')
+    out.add_argument('-o', '--out', help="Dosya çıktıları için klasör (verilmezse diske yazılmaz)")
+    out.add_argument('--formats', default='ndjson',
+                     help=f"--out için formatlar, virgülle ({','.join(SINK_TYPES)}; varsayılan ndjson)")
+    out.add_argument('--gzip', action='store_true', help="Dosyaları gzip ile sıkıştır")
+    out.add_argument('--no-stdout', action='store_true', help="Sonuçları stdout'a yazma (--out gerekir)")
+    out.add_argument('-q', '--quiet', action='store_true', help="stderr'e ilerleme yazma")
+    out.add_argument('--fail-empty', action='store_true', help="Hiç sonuç yoksa 3 ile çık")
+    
+    net = parser.add_argument_group('istekler')
+    net.add_argument('--workers', type=int, default=4, help="Paralel sorgu sayısı")
+    net.add_argument('--rate', type=float, default=1.0, help="Saniyedeki istek üst sınırı")
+    net.add_argument('--base-url', help="Arama API adresi (veya URLSCAN_BASE_URL)")
+    net.add_argument('--cache', help="Ham sayfa önbelleği klasörü")
+    net.add_argument('--cache-ttl', type=float, default=24 * 3600, help="Önbellek ömrü (sn)")
+    net.add_argument('--cache-mb', type=float, default=200, help="Önbellek boyut sınırı (MB)")
+    net.add_argument('--offline', action='store_true', help="Sadece önbellekten çalış (--cache gerekir)")
+    
+    extra = parser.add_argument_group('toplama')
+    extra.add_argument('--delta', help="Sadece son çalıştırmadan beri yeni sonuçlar (durum klasörü)")
+    extra.add_argument('--slices', type=int, default=0, help="Son --since günü N tarih dilimine böl (--delta ile kullanılamaz)")
+    extra.add_argument('--since', type=float, default=365, help="Dilimli aramada gün sayısı")
+    extra.add_argument('--enrich', nargs='?', const='', help="Detay JSON'undan alan ekle (asn,domains,...)")
+    extra.add_argument('--dedup', choices=Deduper.MODES, help="Sorgular arası tekrarları atla")
+    extra.add_argument('--dedup-store', choices=Deduper.BACKENDS, default='auto')
+    extra.add_argument('--db', help="Sonuçları SQLite veritabanına da yaz")
+    extra.add_argument('--screenshots', help="Ekran görüntülerini bu klasöre indir")
+    return parser
+
+
+def run_search(argv):
+    """search SORGU|-f DOSYA [seçenekler] → çıkış kodu (bkz. search_arg_parser)"""
+    parser = search_arg_parser()
+    args = parser.parse_args(argv)
+    
+    queries = []
+    if args.query == '-':
+        queries += [line.strip() for line in sys.stdin if line.strip() and not line.startswith('#')]
+    elif args.query:
+        queries.append(args.query)
+    if args.query_file:
+        try:
+            queries += load_queries(args.query_file)
+        except OSError as e:
+            parser.error(f"sorgu dosyası okunamadı: {e}")
+    if not queries:
+        parser.error("sorgu ya da --query-file gerekli")
+    if args.offline and not args.cache:
+        parser.error("--offline için --cache gerekli")
+    if args.no_stdout and not args.out:
+        parser.error("--no-stdout ile birlikte --out gerekli")
+    if args.slices and args.delta:
+        parser.error("--slices ve --delta birlikte kullanılamaz")
+    formats = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in SINK_TYPES]
+    if unknown:
+        parser.error(f"bilinmeyen format: {', '.join(unknown)}")
+    
+    try:
+        enrich_fields = parse_enrich_fields(args.enrich) if args.enrich is not None else None
+        dedup = Deduper(args.dedup, args.dedup_store, expected=args.max * len(queries),
+                        path=os.path.join(args.out or '.', 'dedup.sqlite')) if args.dedup else None
+    except ValueError as e:
+        parser.error(str(e))
+    
+    cache = None
+    if args.cache:
+        cache = PageCache(args.cache, ttl=args.cache_ttl, max_bytes=int(args.cache_mb * 1024 * 1024))
+    runner = BatchRunner(
+        queries, args.out,
+        max_results=min(args.max, 50000),
+        workers=args.workers,
+        rate=args.rate,
+        formats=formats,
+        compress=args.gzip,
+        callback=None if args.quiet else batch_cli_callback,
+        cache=cache,
+        offline=args.offline,
+        delta=DeltaStore(args.delta, compress=args.gzip) if args.delta else None,
+        slices=args.slices,
+        since_days=args.since,
+        enrich_fields=enrich_fields,
+        screenshots=args.screenshots,
+        db=ResultDB(args.db) if args.db else None,
+        dedup=dedup,
+        base_url=args.base_url,
+        stream=None if args.no_stdout else sys.stdout
+    )
+    
+    # stdout sadece sonuçlara ait; tüm bilgi mesajları stderr'e gider
+    with redirect_stdout(sys.stderr):
+        started = time.time()
+        try:
+            summary = runner.run()
+        except KeyboardInterrupt:
+            print("\n👋 Kesildi.")
+            return EXIT_INTERRUPTED
+        finally:
+            if runner.db:
+                runner.db.close()
+            if dedup:
+                dedup.close()
         
-        self.is_searching = False
-        if callback:
-            callback('complete', len(self.all_results))
+        total = sum(s['count'] for s in summary)
+        failed = [s for s in summary if s['error']]
+        if not args.quiet:
+            print(f"✅ {len(summary)} sorgu, {total} sonuç, {len(failed)} hata, "
+                  f"{time.time() - started:.1f} sn")
+    
+    if failed:
+        return EXIT_ERROR
+    if args.fail_empty and total == 0:
+        return EXIT_EMPTY
+    return EXIT_OK
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# URLSCAN → IPTV KONTROL HATTI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class IPTVPipeline:
+    """URLScan sonuçlarını sayfa sayfa testaraci.py'nin kontrolörüne akıtır.
+    
+    Arama ayrı bir thread'de sürer ve her sayfa write_rows ile gelir: URL'ler
+    filter_m3u_urls ile süzülür, normalize_url ile tekilleştirilir ve sınırlı bir
+    kuyruğa atılır. Kontrolörün event loop'u kuyruğu boşaltır; kontroller keşifle
+    eşzamanlı yürür, kuyruk dolarsa arama bekler. Her sonuç, URL'nin bulunduğu
+    taramanın bilgileriyle birlikte verdicts.ndjson'a yazılır.
+    """
+    
+    def __init__(self, api, checker, out_dir, channels=3, formats=(), callback=None):
+        import testaraci
+        self.iptv = testaraci
+        self.api = api
+        self.checker = checker
+        self.out_dir = out_dir
+        self.channels = channels
+        self.callback = callback
+        # Kuyrukta bekleyen + kontrol edilen URL sınırı (fazlası aramayı bekletir)
+        self.max_pending = checker.concurrency * 2
+        self.queue = queue.Queue(self.max_pending)
+        self.seen = set()
+        self.query = None
+        self.scans = self.candidates = self.duplicates = 0
+        self.checked = self.working = 0
+        self.checked_during_discovery = 0
+        self.errors = []
+        self._discovered = threading.Event()
+        self._stop_event = threading.Event()
         
-        return self.all_results
+        os.makedirs(out_dir, exist_ok=True)
+        self.filename = os.path.join(out_dir, 'verdicts.ndjson')
+        self._f = open(self.filename, 'w', encoding='utf-8')
+        # Çalışan linkler için testaraci çıktıları (txt, m3u, csv...)
+        self.sinks = testaraci.open_sinks(out_dir, formats, prefix='pipeline') if formats else []
     
     def stop(self):
-        """Aramayı durdur"""
-        self.is_searching = False
+        self._stop_event.set()
+        self.api.stop()
+        self.checker.stop()
     
-    def save_txt(self, filename):
-        """Sadece URL'leri TXT olarak kaydet"""
-        if not self.all_results:
-            return False
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# URLScan.io Arama Sonuçları\n")
-            f.write(f"# Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Toplam: {len(self.all_results)} URL\n")
-            f.write("#" + "=" * 60 + "\n\n")
-            
-            for result in self.all_results:
-                f.write(f"{result['url']}\n")
-        
-        return True
+    def _emit(self, event, data):
+        if self.callback:
+            self.callback(event, data)
     
-    def save_detailed_txt(self, filename):
-        """Detaylı TXT raporu kaydet"""
-        if not self.all_results:
-            return False
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("╔" + "═" * 78 + "╗\n")
-            f.write("║" + " URLScan.io Detaylı Arama Raporu".center(78) + "║\n")
-            f.write("╚" + "═" * 78 + "╝\n\n")
-            f.write(f"📅 Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"📊 Toplam Sonuç: {len(self.all_results)}\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for i, result in enumerate(self.all_results, 1):
-                f.write(f"{'─' * 80}\n")
-                f.write(f"📌 Sonuç #{i}\n")
-                f.write(f"{'─' * 80}\n")
-                f.write(f"🔗 URL      : {result['url']}\n")
-                f.write(f"🌐 Domain   : {result['domain']}\n")
-                f.write(f"📍 IP       : {result['ip']}\n")
-                f.write(f"🏳️ Ülke     : {result['country']}\n")
-                f.write(f"🖥️ Sunucu   : {result['server']}\n")
-                f.write(f"📊 Durum    : {result['status']}\n")
-                title = result['title'][:60] + '...' if len(result['title']) > 60 else result['title']
-                f.write(f"📝 Başlık   : {title}\n")
-                f.write(f"🕐 Tarama   : {result['scan_time']}\n")
-                f.write(f"🔍 Detay    : {result['result_url']}\n")
-                f.write(f"📸 Ekran    : {result['screenshot']}\n\n")
-        
-        return True
+    # --- keşif (arama thread'i) ---
     
-    def save_csv(self, filename):
-        """CSV olarak kaydet"""
-        if not self.all_results:
-            return False
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("No,URL,Domain,IP,Country,Server,Status,Title,Scan_Time,Result_URL\n")
-            
-            for i, r in enumerate(self.all_results, 1):
-                title = r['title'].replace('"', '""').replace('\n', ' ')
-                url = r['url'].replace('"', '""')
-                f.write(f'{i},"{url}","{r["domain"]}","{r["ip"]}",')
-                f.write(f'"{r["country"]}","{r["server"]}","{r["status"]}",')
-                f.write(f'"{title}","{r["scan_time"]}","{r["result_url"]}"\n')
-        
-        return True
+    def write_rows(self, rows):
+        """URLScanAPI.search'ün her sayfası (MultiSink yerine)"""
+        self.scans += len(rows)
+        m3u = set(self.iptv.filter_m3u_urls([r['url'] for r in rows]))
+        queued = 0
+        for r in rows:
+            if r['url'] not in m3u:
+                continue
+            key = normalize_url(r['url'])
+            if key in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(key)
+            self.candidates += 1
+            while not self._stop_event.is_set():
+                try:
+                    self.queue.put((self.query, r), timeout=0.5)
+                    queued += 1
+                    break
+                except queue.Full:
+                    continue
+        self._emit('discover', {'query': self.query, 'scans': self.scans, 'new': queued,
+                                'candidates': self.candidates, 'duplicates': self.duplicates})
     
-    def save_json(self, filename):
-        """JSON olarak kaydet"""
-        if not self.all_results:
-            return False
+    def _discover(self, queries, max_results):
+        def cb(event, data):
+            if event == 'error':
+                self.errors.append(f"{self.query}: {data}")
+            self._emit(event, data)
         
-        export_data = {
-            'meta': {
-                'generated': datetime.now().isoformat(),
-                'total_results': len(self.all_results),
-                'tool': 'URLScan.io Search Tool - Educational Version'
-            },
-            'results': self.all_results
-        }
+        try:
+            for index, query in enumerate(queries, 1):
+                if self._stop_event.is_set():
+                    break
+                self.query = query
+                self.api.search(query, max_results, cb, sinks=self)
+                self.api.write_report(os.path.join(self.out_dir, f"{index:03d}_{query_slug(query)}_report.json"))
+        except Exception as e:
+            self.errors.append(str(e))
+            self._emit('error', str(e))
+        finally:
+            self.discovery_seconds = time.time() - self.started
+            self._discovered.set()
+    
+    # --- kontrol (event loop) ---
+    
+    def _next(self):
+        try:
+            return self.queue.get(timeout=0.5)
+        except queue.Empty:
+            return None
+    
+    async def _check(self, query, record):
+        import asyncio
+        t0 = time.perf_counter()
+        try:
+            res = await self.checker.check_m3u(record['url'], max_channel_check=self.channels)
+        except asyncio.CancelledError:
+            res = {'url': record['url'], 'ok': False, 'error': 'Cancelled'}
+        except Exception as e:
+            res = {'url': record['url'], 'ok': False, 'error': str(e)}
+        res['elapsed'] = time.perf_counter() - t0
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
+        row = record.to_dict()
+        row['query'] = query
+        row['verdict'] = self.iptv.result_row(res)
+        # Event loop tek thread: dosyaya sıralı yazılır
+        self._f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self._f.flush()
+        for sink in self.sinks:
+            sink.write(res)
         
-        return True
+        self.checked += 1
+        self.working += bool(res.get('ok'))
+        if not self._discovered.is_set():
+            self.checked_during_discovery += 1
+        self._emit('check', {'url': record['url'], 'ok': bool(res.get('ok')), 'score': res.get('score'),
+                             'error': res.get('error'), 'checked': self.checked,
+                             'working': self.working, 'pending': self.candidates - self.checked})
     
-    def get_statistics(self):
-        """İstatistikleri hesapla"""
-        if not self.all_results:
-            return {}
+    async def _dispatch(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_pending)
+        tasks = set()
         
-        countries = {}
-        servers = {}
-        statuses = {}
-        domains = set()
+        def done(task):
+            tasks.discard(task)
+            slots.release()
         
-        for r in self.all_results:
-            # Ülkeler
-            country = r['country'] or 'Bilinmiyor'
-            countries[country] = countries.get(country, 0) + 1
-            
-            # Sunucular
-            server = (r['server'] or 'Bilinmiyor')[:20]
-            servers[server] = servers.get(server, 0) + 1
-            
-            # HTTP durumları
-            status = str(r['status']) or 'Bilinmiyor'
-            statuses[status] = statuses.get(status, 0) + 1
-            
-            # Benzersiz domainler
-            if r['domain']:
-                domains.add(r['domain'])
+        try:
+            while not self._stop_event.is_set():
+                item = await loop.run_in_executor(None, self._next)
+                if item is None:
+                    if self._discovered.is_set() and self.queue.empty():
+                        break
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(self._check(*item))
+                tasks.add(task)
+                task.add_done_callback(done)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # Ctrl+C: aramayı da durdur
+            self.stop()
+            raise
+        finally:
+            await self.checker.close()
+    
+    def run(self, queries, max_results):
+        """Aramayı ve kontrolleri birlikte çalıştır, özet döndür"""
+        import asyncio
+        self.started = time.time()
+        self.discovery_seconds = None
+        discovery = threading.Thread(target=self._discover, args=(queries, max_results), daemon=True)
+        discovery.start()
+        try:
+            asyncio.run(self._dispatch())
+        finally:
+            self.stop()
+            discovery.join()
+            self._f.close()
+            for sink in self.sinks:
+                sink.close()
         
-        return {
-            'total': len(self.all_results),
-            'countries': dict(sorted(countries.items(), key=lambda x: x[1], reverse=True)),
-            'servers': dict(sorted(servers.items(), key=lambda x: x[1], reverse=True)),
-            'statuses': dict(sorted(statuses.items(), key=lambda x: x[1], reverse=True)),
-            'unique_domains': len(domains),
-            'unique_countries': len(countries)
+        summary = {
+            'generated': datetime.now().isoformat(),
+            'queries': list(queries),
+            'scans': self.scans,
+            'candidates': self.candidates,
+            'duplicates': self.duplicates,
+            'checked': self.checked,
+            'working': self.working,
+            'checked_during_discovery': self.checked_during_discovery,
+            'discovery_seconds': round(self.discovery_seconds or 0, 2),
+            'seconds': round(time.time() - self.started, 2),
+            'errors': self.errors,
+            'files': [self.filename] + [s.path for s in self.sinks]
         }
+        with open(os.path.join(self.out_dir, 'pipeline_summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+
+def pipeline_cli_callback(event, data):
+    """Hat modu için kısa terminal çıktısı"""
+    if event == 'discover' and data['new']:
+        print(f"🔎 {data['query'][:40]}: {data['scans']} tarama, +{data['new']} m3u "
+              f"(toplam {data['candidates']}, tekrar {data['duplicates']})")
+    elif event == 'check':
+        mark = '✅' if data['ok'] else '❌'
+        detail = f"puan {data['score']}" if data['ok'] else data['error']
+        print(f"  {mark} [{data['checked']}, bekleyen {data['pending']}] {data['url'][:80]} ({detail})")
+    elif event == 'rate_limit':
+        print(f"⏳ Rate limit, {data:.0f} sn bekleniyor...")
+    elif event == 'error':
+        print(f"❌ Hata: {data}")
+
+
+def run_pipeline(argv):
+    """pipeline SORGU|-f DOSYA [seçenekler] → çıkış kodu"""
+    try:
+        import testaraci
+    except ImportError as e:
+        print(f"❌ testaraci.py yüklenemedi: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    
+    parser = argparse.ArgumentParser(
+        prog='link.py pipeline',
+        description="URLScan sonuçlarındaki M3U linklerini bulundukları anda IPTV kontrolüne ver.",
+        epilog='Örnek: link.py pipeline \'page.url:"m3u"\' -n 2000 -o iptv_hat')
+    parser.add_argument('query', nargs='?', help="Arama sorgusu")
+    parser.add_argument('-f', '--query-file', help="Sorgu dosyası (satır başına bir sorgu)")
+    parser.add_argument('-n', '--max', type=int, default=1000, help="Sorgu başına en fazla tarama sonucu")
+    parser.add_argument('-o', '--out', help="Çıktı klasörü (varsayılan urlscan_pipeline_TARİH)")
+    parser.add_argument('--formats', default='txt,m3u',
+                        help=f"Çalışan linkler için ek çıktılar ({','.join(testaraci.EXPORT_SINKS)})")
+    parser.add_argument('--concurrency', type=int, default=50, help="Eşzamanlı kontrol sayısı")
+    parser.add_argument('--timeout', type=float, default=8)
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--channels', type=int, default=3, help="Liste başına denenecek kanal sayısı")
+    parser.add_argument('--transport', choices=tuple(testaraci.TRANSPORTS), default='aiohttp')
+    parser.add_argument('--base-url', help="Arama API adresi (veya URLSCAN_BASE_URL)")
+    parser.add_argument('--cache', help="Ham sayfa önbelleği klasörü")
+    parser.add_argument('--offline', action='store_true', help="Sadece önbellekten ara (--cache gerekir)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Sadece özeti yaz")
+    args = parser.parse_args(argv)
+    
+    queries = [args.query] if args.query else []
+    if args.query_file:
+        try:
+            queries += load_queries(args.query_file)
+        except OSError as e:
+            parser.error(f"sorgu dosyası okunamadı: {e}")
+    if not queries:
+        parser.error("sorgu ya da --query-file gerekli")
+    if args.offline and not args.cache:
+        parser.error("--offline için --cache gerekli")
+    formats = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in testaraci.EXPORT_SINKS]
+    if unknown:
+        parser.error(f"bilinmeyen format: {', '.join(unknown)}")
+    
+    out_dir = args.out or f"urlscan_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    api = URLScanAPI(cache=PageCache(args.cache) if args.cache else None, offline=args.offline,
+                     base_url=args.base_url)
+    checker = testaraci.AsyncIPTVChecker(concurrency=args.concurrency, timeout=args.timeout,
+                                         retries=args.retries, transport=args.transport)
+    pipeline = IPTVPipeline(api, checker, out_dir, channels=args.channels, formats=formats,
+                            callback=None if args.quiet else pipeline_cli_callback)
+    try:
+        summary = pipeline.run(queries, min(args.max, 50000))
+    except KeyboardInterrupt:
+        print("\n👋 Kesildi.")
+        return EXIT_INTERRUPTED
+    
+    print(f"\n📡 {summary['scans']} tarama → {summary['candidates']} m3u "
+          f"({summary['duplicates']} tekrar), {summary['checked']} kontrol, {summary['working']} çalışan")
+    print(f"⏱️ Keşif {summary['discovery_seconds']:.1f} sn, toplam {summary['seconds']:.1f} sn; "
+          f"{summary['checked_during_discovery']} kontrol keşifle eşzamanlı bitti → {out_dir}")
+    return EXIT_ERROR if summary['errors'] else EXIT_OK
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -294,8 +3054,8 @@ class URLScanAPI:
 class TerminalMode:
     """Terminal arayüzü"""
     
-    def __init__(self):
-        self.api = URLScanAPI()
+    def __init__(self, api=None):
+        self.api = api or URLScanAPI()
     
     def banner(self):
         """Başlık banner'ı"""
@@ -353,15 +3113,22 @@ class TerminalMode:
         if event == 'total':
             print(f"📊 Toplam {data} sonuç mevcut!")
         elif event == 'progress':
-            print(f"  📥 Sayfa {data['page']}: Toplam {data['count']}/{data['total']} sonuç alındı")
+            print(f"  📥 Sayfa {data['page']}: Toplam {data['count']}/{data['total']} sonuç alındı"
+                  f"{format_quota(data.get('quota'))}")
+        elif event == 'cache':
+            print(f"  💾 Sayfa {data} önbellekten")
         elif event == 'rate_limit':
-            print("\n⏳ Rate limit! 30 saniye bekleniyor...")
+            print(f"\n⏳ Rate limit! {data:.0f} saniye bekleniyor...")
         elif event == 'timeout':
             print("\n⚠️ Zaman aşımı! Tekrar deneniyor...")
         elif event == 'error':
             print(f"\n❌ Hata: {data}")
         elif event == 'complete':
             print(f"\n✅ Arama tamamlandı! {data} sonuç bulundu.")
+            m = self.api.metrics.summary()
+            lat = m['by_kind'].get('search', {}).get('latency_ms', {})
+            print(f"📈 {m['requests']} istek ({m['cached']} önbellek), p50 {lat.get('p50', 0):.0f} ms, "
+                  f"p99 {lat.get('p99', 0):.0f} ms, rate limit beklemesi {m['rate_wait_seconds']:.1f} sn")
     
     def show_statistics(self):
         """İstatistikleri göster"""
@@ -430,11 +3197,31 @@ class TerminalMode:
                 except ValueError:
                     max_results = 500
                 
+                live = input("💾 Sonuçlar geldikçe kaydedilsin mi? (e/h): ").strip().lower() == 'e'
+                sinks = None
+                if live:
+                    formats = input("   Formatlar (txt,csv,ndjson,json,detailed,sqlite,parquet,arrow) [txt,csv,ndjson]: ").strip()
+                    compress = input("   gzip ile sıkıştır? (e/h): ").strip().lower() == 'e'
+                    base = f"urlscan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    try:
+                        sinks = MultiSink.open(base, formats or 'txt,csv,ndjson', compress)
+                    except (OSError, ValueError) as e:
+                        print(f"❌ Dosyalar açılamadı: {e}")
+                        continue
+                
                 print(f"\n🔍 Aranıyor: {query}")
                 print(f"📊 Maksimum: {max_results}")
                 print("-" * 60)
                 
-                self.api.search(query, max_results, self.cli_callback)
+                try:
+                    self.api.search(query, max_results, self.cli_callback, sinks=sinks)
+                finally:
+                    if sinks:
+                        sinks.close()
+                
+                if sinks:
+                    print(f"✅ Kaydedildi: {', '.join(sinks.filenames)}")
+                    continue
                 
                 if self.api.all_results:
                     save = input("\n💾 Kaydetmek ister misiniz? (e/h): ").strip().lower()
@@ -456,7 +3243,7 @@ class TerminalMode:
             elif choice == '5':
                 if GUI_AVAILABLE:
                     print("\n🖥️ GUI modu başlatılıyor...")
-                    gui = GUIMode()
+                    gui = GUIMode(self.api)
                     gui.run()
                 else:
                     print("\n❌ Tkinter yüklü değil!")
@@ -469,6 +3256,7 @@ class TerminalMode:
         print("  3) CSV")
         print("  4) JSON")
         print("  5) Hepsi")
+        print("  6) Parquet" + ("" if PYARROW_AVAILABLE else " (pyarrow yok → NDJSON.gz)"))
         
         choice = input("\n👉 Seçim: ").strip()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -487,11 +3275,11 @@ class TerminalMode:
             self.api.save_json(f"{base}.json")
             print(f"✅ Kaydedildi: {base}.json")
         elif choice == '5':
-            self.api.save_txt(f"{base}_urls.txt")
-            self.api.save_detailed_txt(f"{base}_detailed.txt")
-            self.api.save_csv(f"{base}.csv")
-            self.api.save_json(f"{base}.json")
+            self.api.export(base, ['txt', 'detailed', 'csv', 'json'])
             print(f"✅ Tüm dosyalar kaydedildi!")
+        elif choice == '6':
+            files = self.api.export(base, ['parquet'])
+            print(f"✅ Kaydedildi: {', '.join(files)}")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -512,12 +3300,234 @@ class ModernStyle:
     ERROR = "#dc3545"
 
 
+class VirtualTable:
+    """Sadece görünen satırları üreten sanal tablo.
+    
+    Treeview'da en fazla ekrana sığan kadar öğe bulunur; kaydırınca aynı öğelerin
+    değerleri row_values(index) ile yeniden doldurulur. Böylece 50 bin satırda da
+    Tk tarafında yalnızca birkaç düzine öğe yaşar. Seçim mutlak indeks olarak tutulur.
+    """
+    
+    def __init__(self, parent, columns, row_values, rowheight=28, on_sort=None):
+        self.row_values = row_values
+        self.rowheight = rowheight
+        self.count = 0
+        self.offset = 0
+        self.selected = None
+        
+        self.scroll_y = ttk.Scrollbar(parent, command=self._on_scroll)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        scroll_x = ttk.Scrollbar(parent, orient=tk.HORIZONTAL)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.tree = ttk.Treeview(parent, columns=[c[0] for c in columns],
+            show='headings', selectmode='browse', xscrollcommand=scroll_x.set)
+        for col, text, width in columns:
+            if on_sort:
+                self.tree.heading(col, text=text, command=lambda c=col: on_sort(c))
+            else:
+                self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, minwidth=50)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        scroll_x.config(command=self.tree.xview)
+        
+        self.tree.bind('<Configure>', lambda e: self.render())
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(3))
+        for key, step in [('<Up>', -1), ('<Down>', 1), ('<Prior>', -10), ('<Next>', 10)]:
+            self.tree.bind(key, lambda e, s=step: self.move_selection(s))
+        self.tree.bind('<Home>', lambda e: self.select(0))
+        self.tree.bind('<End>', lambda e: self.select(self.count - 1))
+    
+    def visible_rows(self):
+        # Başlık satırı da yaklaşık bir satır yüksekliğinde
+        height = self.tree.winfo_height()
+        return max(1, height // self.rowheight - 1)
+    
+    def set_count(self, count):
+        """Satır sayısını güncelle (yeni sayfa geldiğinde tek seferde)"""
+        self.count = count
+        self.render()
+    
+    def reset(self):
+        self.count = 0
+        self.offset = 0
+        self.selected = None
+        self.render()
+    
+    def render(self):
+        rows = self.visible_rows()
+        self.offset = max(0, min(self.offset, self.count - rows))
+        n = min(rows, self.count - self.offset)
+        
+        items = self.tree.get_children()
+        if len(items) > n:
+            self.tree.delete(*items[n:])
+        for i in range(n):
+            values = self.row_values(self.offset + i)
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', 'end', iid=f"r{i}", values=values)
+        
+        if self.selected is not None and 0 <= self.selected - self.offset < n:
+            iid = f"r{self.selected - self.offset}"
+            if self.tree.selection() != (iid,):
+                self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        
+        if self.count:
+            self.scroll_y.set(self.offset / self.count, (self.offset + n) / self.count)
+        else:
+            self.scroll_y.set(0, 1)
+    
+    def scroll_to(self, offset):
+        self.offset = int(offset)
+        self.render()
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+    
+    def _on_scroll(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * self.count)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows()
+            self.scroll_by(step)
+    
+    def _on_wheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+    
+    def _on_select(self, event):
+        sel = self.tree.selection()
+        # Görünümden çıkan satır için seçim kaldırılır ama mutlak seçim korunur
+        if sel:
+            self.selected = self.offset + int(sel[0][1:])
+    
+    def index_at(self, y):
+        """Ekran y koordinatındaki satırın mutlak indeksi"""
+        iid = self.tree.identify_row(y)
+        return self.offset + int(iid[1:]) if iid else None
+    
+    def select(self, index):
+        if not self.count:
+            return 'break'
+        self.selected = max(0, min(index, self.count - 1))
+        rows = self.visible_rows()
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + rows:
+            self.offset = self.selected - rows + 1
+        self.render()
+        return 'break'
+    
+    def move_selection(self, step):
+        start = self.offset if self.selected is None else self.selected + step
+        return self.select(start)
+
+
+class GalleryWindow:
+    """Ekran görüntüsü galerisi; indirme sürerken hazır olan küçük resimler yüklenir"""
+    
+    COLUMNS = 4
+    PAGE = 40
+    
+    def __init__(self, app, records):
+        self.app = app
+        self.store = app.shots
+        self.records = records
+        self.shown = 0
+        self.cells = {}
+        self.images = {}
+        colors = app.colors
+        
+        self.win = tk.Toplevel(app.root)
+        self.win.title(f"🖼 Ekran Görüntüleri ({len(records)})")
+        self.win.geometry("1100x750")
+        self.win.configure(bg=colors.BG_DARK)
+        
+        bottom = tk.Frame(self.win, bg=colors.BG_DARK)
+        bottom.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=8)
+        self.more_btn = tk.Button(bottom, text="⬇️ Daha Fazla", font=('Segoe UI', 9),
+            bg=colors.BG_LIGHT, fg='white', border=0, padx=12, pady=5,
+            cursor='hand2', command=self.show_more)
+        self.more_btn.pack(side=tk.RIGHT)
+        
+        self.canvas = tk.Canvas(self.win, bg=colors.BG_DARK, highlightthickness=0)
+        scroll = ttk.Scrollbar(self.win, command=self.canvas.yview)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        self.canvas.config(yscrollcommand=scroll.set)
+        
+        self.grid = tk.Frame(self.canvas, bg=colors.BG_DARK)
+        self.canvas.create_window((0, 0), window=self.grid, anchor='nw')
+        self.grid.bind('<Configure>',
+            lambda e: self.canvas.config(scrollregion=self.canvas.bbox('all')))
+        self.canvas.bind('<MouseWheel>',
+            lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.canvas.yview_scroll(-1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.canvas.yview_scroll(1, 'units'))
+        
+        self.show_more()
+        self.refresh()
+    
+    def show_more(self):
+        colors = self.app.colors
+        for r in self.records[self.shown:self.shown + self.PAGE]:
+            i = self.shown
+            self.shown += 1
+            cell = tk.Frame(self.grid, bg=colors.BG_MEDIUM, padx=5, pady=5)
+            cell.grid(row=i // self.COLUMNS, column=i % self.COLUMNS, padx=4, pady=4, sticky='n')
+            
+            image = tk.Label(cell, text="⏳", width=32, height=9,
+                bg=colors.BG_LIGHT, fg=colors.TEXT_SECONDARY, cursor='hand2')
+            image.pack()
+            image.bind('<Button-1>', lambda e, url=r['result_url']: webbrowser.open(url))
+            
+            tk.Label(cell, text=r['domain'][:36], font=('Segoe UI', 8),
+                fg=colors.TEXT_PRIMARY, bg=colors.BG_MEDIUM).pack(anchor='w')
+            self.cells[r['scan_id']] = image
+        
+        if self.shown >= len(self.records):
+            self.more_btn.config(state='disabled')
+    
+    def refresh(self):
+        if not self.win.winfo_exists():
+            return
+        for sid, label in self.cells.items():
+            if sid in self.images:
+                continue
+            path, small = self.store.image_for(sid)
+            if path:
+                try:
+                    img = tk.PhotoImage(file=path)
+                except tk.TclError:
+                    continue
+                if not small:
+                    # PIL yoksa orijinal tam sayı oranıyla küçültülür
+                    img = img.subsample(max(1, img.width() // ScreenshotStore.THUMB_SIZE[0]))
+                self.images[sid] = img
+                label.config(image=img, text='', width=0, height=0)
+            elif sid in self.store.index:
+                label.config(text="Görüntü yok")
+        self.win.after(700, self.refresh)
+
+
 class GUIMode:
     """GUI arayüzü"""
     
-    def __init__(self):
+    def __init__(self, api=None):
         if not GUI_AVAILABLE:
             raise ImportError("Tkinter yüklü değil!")
+        load_gui()
         
         self.root = tk.Tk()
         self.root.title("🔍 URLScan.io Arama Aracı")
@@ -525,11 +3535,21 @@ class GUIMode:
         self.root.minsize(1000, 700)
         
         self.colors = ModernStyle()
-        self.api = URLScanAPI()
+        self.api = api or URLScanAPI()
         self.search_thread = None
+        self.live_sinks = None
+        self.enricher = None
+        self.shots = None
+        # Açık yerel veritabanı (ResultDB); açıkken aramalar da içine yazılır
+        self.db = None
+        self.sort_col, self.sort_desc = 'scan_time', True
+        # Arka plan thread'lerinden (arama, detay, ekran görüntüsü) gelen olaylar;
+        # ana thread pump_events ile toplu olarak işler
+        self.events = queue.Queue()
         
         self.setup_styles()
         self.create_gui()
+        self.root.after(100, self.pump_events)
     
     def setup_styles(self):
         """TTK stillerini ayarla"""
@@ -652,6 +3672,56 @@ class GUIMode:
         )
         self.stop_btn.pack(side=tk.LEFT)
         
+        # Canlı kaydetme: sonuçlar geldikçe seçilen klasöre yazılır
+        live_row = tk.Frame(inner, bg=self.colors.BG_MEDIUM)
+        live_row.pack(fill=tk.X, pady=(10, 0))
+        
+        self.live_var = tk.BooleanVar(value=False)
+        self.gzip_var = tk.BooleanVar(value=False)
+        self.live_formats_var = tk.StringVar(value="txt,csv,ndjson")
+        for text, var in [("💾 Canlı kaydet", self.live_var), ("🗜 gzip", self.gzip_var)]:
+            tk.Checkbutton(live_row, text=text, variable=var, font=('Segoe UI', 9),
+                fg=self.colors.TEXT_SECONDARY, bg=self.colors.BG_MEDIUM,
+                selectcolor=self.colors.BG_LIGHT, activebackground=self.colors.BG_MEDIUM
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(live_row, text="Formatlar:", font=('Segoe UI', 9),
+            fg=self.colors.TEXT_SECONDARY, bg=self.colors.BG_MEDIUM
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        tk.Entry(live_row, textvariable=self.live_formats_var, font=('Segoe UI', 9),
+            bg=self.colors.BG_LIGHT, fg=self.colors.TEXT_PRIMARY, relief='flat', width=30
+        ).pack(side=tk.LEFT)
+        
+        # Yerel veritabanı: kota harcamadan filtrele / sırala
+        db_row = tk.Frame(inner, bg=self.colors.BG_MEDIUM)
+        db_row.pack(fill=tk.X, pady=(8, 0))
+        
+        tk.Button(db_row, text="🗄 Veritabanı", font=('Segoe UI', 9),
+            bg=self.colors.BG_LIGHT, fg='white', border=0, padx=10, pady=3,
+            cursor='hand2', command=self.open_db
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.filter_var = tk.StringVar()
+        self.filter_country_var = tk.StringVar()
+        self.filter_status_var = tk.StringVar()
+        for label, var, width in [("Filtre:", self.filter_var, 30), ("Ülke:", self.filter_country_var, 5),
+                                  ("Durum:", self.filter_status_var, 5)]:
+            tk.Label(db_row, text=label, font=('Segoe UI', 9),
+                fg=self.colors.TEXT_SECONDARY, bg=self.colors.BG_MEDIUM
+            ).pack(side=tk.LEFT, padx=(0, 5))
+            entry = tk.Entry(db_row, textvariable=var, font=('Segoe UI', 9),
+                bg=self.colors.BG_LIGHT, fg=self.colors.TEXT_PRIMARY, relief='flat', width=width)
+            entry.pack(side=tk.LEFT, padx=(0, 10))
+            entry.bind('<Return>', lambda e: self.apply_filter())
+        
+        tk.Button(db_row, text="🔎 Filtrele", font=('Segoe UI', 9),
+            bg=self.colors.BG_LIGHT, fg='white', border=0, padx=10, pady=3,
+            cursor='hand2', command=self.apply_filter
+        ).pack(side=tk.LEFT)
+        
+        self.db_label = tk.Label(db_row, text="", font=('Segoe UI', 9),
+            fg=self.colors.TEXT_SECONDARY, bg=self.colors.BG_MEDIUM)
+        self.db_label.pack(side=tk.LEFT, padx=10)
+        
         # Progress
         self.progress = ttk.Progressbar(inner,
             style="Custom.Horizontal.TProgressbar",
@@ -698,34 +3768,27 @@ class GUIMode:
                 padx=12, pady=5, cursor='hand2', command=cmd
             ).pack(side=tk.RIGHT, padx=2)
         
+        for text, cmd in [("🔬 Detaylar", self.enrich_all), ("🖼 Galeri", self.open_gallery)]:
+            tk.Button(rh, text=text, font=('Segoe UI', 9),
+                bg=self.colors.BG_LIGHT, fg='white', border=0,
+                padx=12, pady=5, cursor='hand2', command=cmd
+            ).pack(side=tk.RIGHT, padx=2)
+        
         # Treeview
         tree_frame = tk.Frame(results_frame, bg=self.colors.BG_MEDIUM)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
         
-        scroll_y = ttk.Scrollbar(tree_frame)
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
-        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        columns = ('no', 'url', 'domain', 'ip', 'country', 'status')
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
-            yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-        
-        for col, text, width in [('no', '#', 50), ('url', 'URL', 400),
+        self.table = VirtualTable(tree_frame, [('no', '#', 50), ('url', 'URL', 400),
             ('domain', 'Domain', 200), ('ip', 'IP', 120),
-            ('country', 'Ülke', 60), ('status', 'Durum', 60)]:
-            self.tree.heading(col, text=text)
-            self.tree.column(col, width=width, minwidth=50)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True)
-        scroll_y.config(command=self.tree.yview)
-        scroll_x.config(command=self.tree.xview)
+            ('country', 'Ülke', 60), ('status', 'Durum', 60)], self.row_values,
+            on_sort=self.sort_by)
+        self.tree = self.table.tree
         
         # Sağ tık
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="🔗 URL Kopyala", command=self.copy_url)
         self.context_menu.add_command(label="🌐 Tarayıcıda Aç", command=self.open_browser)
+        self.context_menu.add_command(label="🔬 Detayları Getir", command=self.enrich_selected)
         self.tree.bind('<Button-3>', self.show_context)
         self.tree.bind('<Double-1>', lambda e: self.open_browser())
         
@@ -768,6 +3831,12 @@ class GUIMode:
             bg=self.colors.BG_LIGHT, anchor='w'
         )
         self.status_label.pack(side=tk.LEFT, padx=10, pady=5)
+        
+        self.quota_label = tk.Label(status, text="",
+            font=('Segoe UI', 9), fg=self.colors.TEXT_SECONDARY,
+            bg=self.colors.BG_LIGHT, anchor='e'
+        )
+        self.quota_label.pack(side=tk.RIGHT, padx=10, pady=5)
     
     def set_query(self, query):
         self.search_entry.delete(0, tk.END)
@@ -778,53 +3847,73 @@ class GUIMode:
         if color:
             self.status_label.config(fg=color)
     
+    def update_quota(self):
+        """Kota ve sıfırlanma geri sayımını her saniye güncelle (arama sürdükçe)"""
+        quota = self.api.pacer.snapshot()
+        text = format_quota(quota).lstrip(' |')
+        if self.api.pacer.blocked_until > time.monotonic():
+            text = f"⏳ Rate limit: {quota['reset_in']:.0f} sn"
+        self.quota_label.config(text=text)
+        if self.api.is_searching:
+            self.root.after(1000, self.update_quota)
+    
     def update_stats(self):
-        stats = self.api.get_statistics()
-        if not stats:
-            return
+        stats = self.api.stats.snapshot()
         
         self.stat_labels['total'].config(text=str(stats['total']))
         self.stat_labels['countries'].config(text=str(stats['unique_countries']))
         self.stat_labels['domains'].config(text=str(stats['unique_domains']))
-        
-        success = sum(v for k, v in stats['statuses'].items() if k.startswith('2'))
-        error = sum(v for k, v in stats['statuses'].items() if k.startswith(('4', '5')))
-        
-        self.stat_labels['success'].config(text=str(success))
-        self.stat_labels['error'].config(text=str(error))
+        self.stat_labels['success'].config(text=str(stats['success']))
+        self.stat_labels['error'].config(text=str(stats['error']))
+    
+    def row_values(self, index):
+        """Sanal tablo satırı; numara all_results indeksinin 1 fazlası"""
+        r = self.api.all_results[index]
+        return (index + 1, r['url'][:80], r['domain'], r['ip'], r['country'], r['status'])
     
     def gui_callback(self, event, data):
-        """GUI callback"""
-        if event == 'total':
-            self.root.after(0, lambda: self.set_status(
-                f"📊 Toplam {data} sonuç bulundu!", self.colors.WARNING))
-        elif event == 'progress':
-            self.root.after(0, lambda: self.set_status(
-                f"📥 Sayfa {data['page']}: {data['count']}/{data['total']}",
-                self.colors.WARNING))
-            self.root.after(0, lambda: self.results_label.config(
-                text=f"📋 Sonuçlar ({data['count']})"))
-            
-            # Sonuçları ekle
-            for r in data.get('results', []):
-                idx = len(self.api.all_results)
-                self.root.after(0, lambda r=r, i=idx: self.tree.insert('', 'end', values=(
-                    i, r.get('page', {}).get('url', '')[:80],
-                    r.get('page', {}).get('domain', ''),
-                    r.get('page', {}).get('ip', ''),
-                    r.get('page', {}).get('country', ''),
-                    r.get('page', {}).get('status', '')
-                )))
-            
-            self.root.after(0, self.update_stats)
-        elif event == 'rate_limit':
-            self.root.after(0, lambda: self.set_status(
-                "⏳ Rate limit! Bekleniyor...", self.colors.WARNING))
-        elif event == 'error':
-            self.root.after(0, lambda: self.set_status(
-                f"❌ Hata: {data}", self.colors.ERROR))
-        elif event == 'complete':
-            self.root.after(0, self.search_complete)
+        """GUI callback (arka plan thread'inde çalışır, sadece kuyruğa atar)"""
+        if event not in ('quota', 'request'):
+            self.events.put((event, data))
+    
+    def pump_events(self):
+        """Kuyruktaki olayları toplu işle; sayfalar tek seferde tabloya yansır"""
+        progress = None
+        done = False
+        while True:
+            try:
+                event, data = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event == 'progress':
+                progress = data
+            elif event == 'total':
+                self.set_status(f"📊 Toplam {data} sonuç bulundu!", self.colors.WARNING)
+            elif event == 'rate_limit':
+                self.set_status(f"⏳ Rate limit! {data:.0f} sn bekleniyor...", self.colors.WARNING)
+            elif event == 'error':
+                self.set_status(f"❌ Hata: {data}", self.colors.ERROR)
+            elif event == 'complete':
+                done = True
+            elif event == 'enrich':
+                self.set_status(f"🔬 Detaylar: {data['done']}/{data['total']}", self.colors.WARNING)
+            elif event == 'enrich_done':
+                self._enrich_done(*data)
+            elif event == 'screenshot':
+                self.set_status(f"🖼 Ekran görüntüleri: {data['done']}/{data['total']}", self.colors.WARNING)
+            elif event == 'screenshot_done':
+                self.set_status(f"🖼 {data} yeni ekran görüntüsü indirildi", self.colors.SUCCESS)
+        
+        if progress:
+            self.set_status(f"📥 Sayfa {progress['page']}: {progress['count']}/{progress['total']}",
+                self.colors.WARNING)
+            self.results_label.config(text=f"📋 Sonuçlar ({progress['count']})")
+            self.table.set_count(progress['count'])
+            self.update_stats()
+        
+        if done:
+            self.search_complete()
+        self.root.after(100, self.pump_events)
     
     def start_search(self):
         query = self.search_entry.get().strip()
@@ -838,8 +3927,26 @@ class GUIMode:
         except:
             max_results = 1000
         
-        self.tree.delete(*self.tree.get_children())
+        self.live_sinks = None
+        if self.live_var.get():
+            folder = filedialog.askdirectory(title="Canlı kayıt klasörü")
+            if not folder:
+                return
+            base = os.path.join(folder, f"urlscan_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            try:
+                self.live_sinks = MultiSink.open(base, self.live_formats_var.get(), self.gzip_var.get())
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Hata", f"Dosyalar açılamadı:\n{e}")
+                return
+        
+        if self.db:
+            if self.live_sinks is None:
+                self.live_sinks = MultiSink([])
+            self.live_sinks.sinks.append(SqliteSink(None, db=self.db, query=query))
+        
         self.api.all_results = []
+        self.api.stats.reset()
+        self.table.reset()
         
         self.search_btn.config(state='disabled')
         self.stop_btn.config(state='normal')
@@ -847,11 +3954,19 @@ class GUIMode:
         self.set_status(f"🔍 Aranıyor: {query}", self.colors.WARNING)
         
         self.search_thread = threading.Thread(
-            target=self.api.search,
-            args=(query, max_results, self.gui_callback)
+            target=self._search_worker,
+            args=(query, max_results, self.live_sinks)
         )
         self.search_thread.daemon = True
         self.search_thread.start()
+        self.root.after(1000, self.update_quota)
+    
+    def _search_worker(self, query, max_results, sinks):
+        try:
+            self.api.search(query, max_results, self.gui_callback, sinks=sinks)
+        finally:
+            if sinks:
+                sinks.close()
     
     def search_complete(self):
         self.search_btn.config(state='normal')
@@ -861,26 +3976,29 @@ class GUIMode:
         count = len(self.api.all_results)
         self.set_status(f"✅ Tamamlandı! {count} sonuç", self.colors.SUCCESS)
         self.results_label.config(text=f"📋 Sonuçlar ({count})")
+        self.table.set_count(count)
         self.update_stats()
         
         if count > 0:
-            messagebox.showinfo("Tamamlandı", f"🎉 {count} sonuç bulundu!")
+            saved = ''
+            if self.live_sinks and self.live_sinks.sinks:
+                saved = "\n\n💾 " + "\n💾 ".join(self.live_sinks.filenames)
+            messagebox.showinfo("Tamamlandı", f"🎉 {count} sonuç bulundu!{saved}")
     
     def stop_search(self):
         self.api.stop()
         self.set_status("⏹ Durduruldu", self.colors.WARNING)
     
     def show_context(self, event):
-        item = self.tree.identify_row(event.y)
-        if item:
-            self.tree.selection_set(item)
+        idx = self.table.index_at(event.y)
+        if idx is not None:
+            self.table.select(idx)
             self.context_menu.post(event.x_root, event.y_root)
     
     def get_selected(self):
-        sel = self.tree.selection()
-        if not sel:
+        idx = self.table.selected
+        if idx is None:
             return None
-        idx = int(self.tree.item(sel[0])['values'][0]) - 1
         if 0 <= idx < len(self.api.all_results):
             return self.api.all_results[idx]
         return None
@@ -897,6 +4015,129 @@ class GUIMode:
         if r and r['url']:
             webbrowser.open(r['url'])
     
+    def enrich_selected(self):
+        r = self.get_selected()
+        if r:
+            self._start_enrich([r], show=r)
+    
+    def enrich_all(self):
+        if not self.api.all_results:
+            messagebox.showwarning("Uyarı", "Sonuç yok!")
+            return
+        self._start_enrich(list(self.api.all_results))
+    
+    def _start_enrich(self, records, show=None):
+        """Detay JSON'larını arka planda çek (önbellekteki taramalar tekrar çekilmez)"""
+        if self.enricher is None:
+            self.enricher = ResultEnricher(self.api, callback=self.gui_callback)
+        
+        def worker():
+            count = self.enricher.enrich(records)
+            self.events.put(('enrich_done', (count, show)))
+        
+        self.set_status(f"🔬 {len(records)} kayıt için detay alınıyor...", self.colors.WARNING)
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _enrich_done(self, count, show):
+        self.set_status(f"🔬 {count} kayıt zenginleştirildi", self.colors.SUCCESS)
+        if show is None:
+            return
+        if show.extra is None:
+            messagebox.showwarning("Uyarı", "Tarama detayı alınamadı!")
+            return
+        
+        win = tk.Toplevel(self.root)
+        win.title(f"Detay - {show['domain']}")
+        win.geometry("600x500")
+        win.configure(bg=self.colors.BG_DARK)
+        
+        text = scrolledtext.ScrolledText(win,
+            font=('Consolas', 10),
+            bg=self.colors.BG_MEDIUM,
+            fg=self.colors.TEXT_PRIMARY
+        )
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text.insert('1.0', f"{show['url']}\n{show['result_url']}\n\n"
+                    + json.dumps(show.extra, ensure_ascii=False, indent=2))
+        text.config(state='disabled')
+    
+    def open_db(self):
+        """Yerel SQLite veritabanını aç veya oluştur"""
+        f = filedialog.asksaveasfilename(title="Veritabanı (yoksa oluşturulur)",
+            defaultextension=".sqlite", initialfile="urlscan.sqlite", confirmoverwrite=False,
+            filetypes=[("SQLite", "*.sqlite *.db"), ("Tümü", "*.*")])
+        if not f:
+            return
+        try:
+            db = ResultDB(f)
+        except sqlite3.Error as e:
+            messagebox.showerror("Hata", f"Veritabanı açılamadı:\n{e}")
+            return
+        if self.db:
+            self.db.close()
+        self.db = db
+        if self.api.all_results:
+            db.add_rows(self.api.all_results)
+        mode = "FTS5" if db.fts else "LIKE"
+        self.db_label.config(text=f"🗄 {os.path.basename(f)}: {db.count()} kayıt ({mode})")
+    
+    def apply_filter(self):
+        """Veritabanında filtrele/sırala, sonucu tabloya yükle (API kotası kullanmaz)"""
+        if not self.db:
+            messagebox.showwarning("Uyarı", "Önce bir veritabanı açın!")
+            return
+        if self.api.is_searching:
+            return
+        filters = dict(text=self.filter_var.get(),
+                       country=self.filter_country_var.get().strip(),
+                       status=self.filter_status_var.get().strip())
+        started = time.perf_counter()
+        try:
+            rows = self.db.search(order=self.sort_col, desc=self.sort_desc, limit=50000, **filters)
+            total = self.db.count(**filters)
+        except sqlite3.Error as e:
+            self.set_status(f"❌ Filtre hatası: {e}", self.colors.ERROR)
+            return
+        ms = (time.perf_counter() - started) * 1000
+        
+        self.api.all_results = rows
+        self.api.stats.rebuild(rows)
+        self.table.reset()
+        self.table.set_count(len(rows))
+        self.results_label.config(text=f"📋 Sonuçlar ({len(rows)}/{total})")
+        self.update_stats()
+        self.set_status(f"🗄 {total} eşleşme, {ms:.1f} ms", self.colors.SUCCESS)
+    
+    def sort_by(self, col):
+        """Sütun başlığına tıklanınca sırala (aynı sütun: yön değişir)"""
+        col = {'no': 'scan_time'}.get(col, col)
+        if self.api.is_searching:
+            return
+        self.sort_desc = not self.sort_desc if col == self.sort_col else col == 'scan_time'
+        self.sort_col = col
+        if self.db:
+            self.apply_filter()
+            return
+        self.api.all_results.sort(key=lambda r: str(r[col]), reverse=self.sort_desc)
+        self.table.render()
+    
+    def open_gallery(self):
+        """Ekran görüntülerini arka planda indir, galeriyi hemen aç"""
+        if not self.api.all_results:
+            messagebox.showwarning("Uyarı", "Sonuç yok!")
+            return
+        if self.shots is None:
+            self.shots = ScreenshotStore(self.api, callback=self.gui_callback)
+        
+        records = list(self.api.all_results)
+        
+        def worker():
+            count = self.shots.download(records)
+            self.events.put(('screenshot_done', count))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        GalleryWindow(self, records)
+    
     def export_txt(self):
         if not self.api.all_results:
             messagebox.showwarning("Uyarı", "Sonuç yok!")
@@ -935,9 +4176,7 @@ class GUIMode:
         if folder:
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             base = os.path.join(folder, f"urlscan_{ts}")
-            self.api.save_txt(f"{base}_urls.txt")
-            self.api.save_csv(f"{base}.csv")
-            self.api.save_json(f"{base}.json")
+            self.api.export(base, ['txt', 'csv', 'json'])
             messagebox.showinfo("Başarılı", f"Tüm dosyalar kaydedildi!")
     
     def show_help(self):
@@ -994,9 +4233,17 @@ class GUIMode:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def main():
-    if '--cli' in sys.argv or '-c' in sys.argv:
+    if sys.argv[1:2] == ['search']:
+        sys.exit(run_search(sys.argv[2:]))
+    elif sys.argv[1:2] == ['pipeline']:
+        sys.exit(run_pipeline(sys.argv[2:]))
+    elif '--batch' in sys.argv:
+        run_batch(sys.argv)
+    elif '--find' in sys.argv:
+        run_find(sys.argv)
+    elif '--cli' in sys.argv or '-c' in sys.argv:
         # Terminal modu
-        cli = TerminalMode()
+        cli = TerminalMode(api_from_argv(sys.argv))
         cli.run()
     elif '--help' in sys.argv or '-h' in sys.argv:
         print("""
@@ -1006,6 +4253,49 @@ URLScan.io Arama Aracı
 Kullanım:
     python urlscan_tool.py          GUI modu (varsayılan)
     python urlscan_tool.py --cli    Terminal modu
+    python urlscan_tool.py --batch sorgular.txt [--out klasör] [--max 500]
+                           [--workers 4] [--rate 1.0] [--formats txt,csv,ndjson,json,parquet,arrow,sqlite]
+                           [--gzip]
+                                    Toplu sorgu modu (ortak hız sınırı)
+                           [--delta klasör]
+                                    Sadece son çalıştırmadan beri gelen yeni
+                                    sonuçları çek, klasördeki veri setine ekle
+                           [--enrich asn,domains,certificates]
+                                    Her taramanın detay JSON'undan alan ekle
+                                    (disk önbellekli, tekrar çekilmez)
+                           [--dedup scan_id|url|domain] [--dedup-store auto|set|bloom|disk]
+                                    Sorgular arası tekrarları atla, çakışmayı raporla
+                           [--db sonuclar.sqlite]
+                                    Sonuçları ortak SQLite veritabanına da yaz
+                           [--screenshots klasör]
+                                    Ekran görüntülerini indir (aynı görüntü bir
+                                    kez saklanır, kaldığı yerden devam eder)
+                           [--slices 8] [--since 365]
+                                    Sorguyu son N günün tarih dilimlerine bölüp
+                                    dilimleri paralel sayfala
+    python urlscan_tool.py search "domain:example.com" [-n 1000] [-o klasör]
+                           [--formats csv,parquet] [--delta klasör] [--cache klasör]
+                           [-f sorgular.txt] [-q] [--fail-empty]
+                                    Etkileşimsiz mod (cron / pipeline): sonuçlar
+                                    stdout'a NDJSON, ilerleme stderr'e; çıkış
+                                    kodu başarıyı bildirir (search --help)
+    python urlscan_tool.py pipeline 'page.url:"m3u"' [-n 1000] [-o klasör]
+                           [--concurrency 50] [--channels 3] [--formats txt,m3u]
+                                    Bulunan M3U linklerini arama sürerken
+                                    testaraci.py kontrolöründen geçir; sonuçlar
+                                    tarama bilgileriyle verdicts.ndjson'a
+    python urlscan_tool.py --db sonuclar.sqlite --find "login" [--country TR]
+                           [--status 200] [--since 2024-01-01] [--sort domain]
+                           [--asc] [--limit 50]
+                                    Yerel veritabanında tam metin arama (kota yok)
+
+Önbellek (tüm modlarda):
+    --cache klasör [--cache-ttl 86400] [--cache-mb 200]
+                                    Ham sayfaları diskte sakla, tekrar eden
+                                    sayfaları ağdan çekme
+    --offline                       Sadece önbellekten çalış (ağ yok)
+    --base-url URL                  Arama API adresi (veya URLSCAN_BASE_URL),
+                                    örn. link_bench.py replay sunucusu
     python urlscan_tool.py --help   Bu yardım mesajı
 
 Özellikler:
@@ -1017,11 +4307,11 @@ Kullanım:
     else:
         # GUI modu
         if GUI_AVAILABLE:
-            gui = GUIMode()
+            gui = GUIMode(api_from_argv(sys.argv))
             gui.run()
         else:
             print("❌ Tkinter yüklü değil! Terminal modu kullanılıyor...")
-            cli = TerminalMode()
+            cli = TerminalMode(api_from_argv(sys.argv))
             cli.run()
 
 
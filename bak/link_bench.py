@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URLScan.io Arama Aracı - Yerel Replay Sunucusu ve Benchmark
+===========================================================
+urlscan.io'ya hiç istek atmadan URLScanAPI.search, dışa aktarma formatları
+ve GUI tablo ekleme yolunu ölçer.
+
+Sunucu sentetik arama sayfaları üretir ya da --replay ile link.py'nin sayfa
+önbelleğindeki kayıtlı sayfaları aynen sunar. Gecikme, 429 patlamaları ve
+has_more davranışı ayarlanabilir.
+
+Kullanım:
+    python link_bench.py serve [--port 8765] [--total 50000] [--latency 0.02]
+                               [--burst-every 50 --burst-len 2] [--has-more normal]
+                               [--replay önbellek_klasörü]
+        (başka terminalde: URLSCAN_BASE_URL=http://127.0.0.1:8765/api/v1/search/ python link.py --cli)
+
+    python link_bench.py run [--results 10000,50000] [--formats txt,csv,json,...]
+                             [--latency 0.0] [--burst-every 0] [--json rapor.json]
+
+    python link_bench.py importtime [--runs 5] [--baseline importtime.json]
+                                    [--save-baseline importtime.json]
+        (link.py ve testaraci.py yükleme süresi, -X importtime; ağır bağımlılık
+         yüklenirse, bütçe ya da kayıtlı taban %25'ten fazla aşılırsa çıkış kodu 1)
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import link
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REPLAY SUNUCUSU
+# ═══════════════════════════════════════════════════════════════════════════════
+
+COUNTRIES = ('TR', 'US', 'DE', 'NL', 'FR', 'RU', 'GB', '')
+SERVERS = ('nginx', 'Apache', 'cloudflare', 'LiteSpeed', 'Microsoft-IIS/10.0', '')
+STATUSES = ('200', '200', '200', '301', '403', '404', '500')
+
+
+def synthetic_result(i, base_ms=1700000000000):
+    """i. sonuç; aynı i her zaman aynı sonucu verir (yeniden eskiye sıralı)"""
+    sid = hashlib.md5(str(i).encode()).hexdigest()
+    scan_id = f"{sid[:8]}-{sid[8:12]}-{sid[12:16]}-{sid[16:20]}-{sid[20:]}"
+    ms = base_ms - i * 60000
+    host = f"site{i % 997}.example{i % 7}.com"
+    return {
+        '_id': scan_id,
+        'sort': [ms, scan_id],
+        'task': {'time': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(ms / 1000))},
+        'page': {
+            'url': f"https://{host}/path/{i}/index.html?ref={i % 13}",
+            'domain': host,
+            'ip': f"10.{i % 256}.{(i // 256) % 256}.{i % 7}",
+            'country': COUNTRIES[i % len(COUNTRIES)],
+            'server': SERVERS[i % len(SERVERS)],
+            'status': STATUSES[i % len(STATUSES)],
+            'title': f"Örnek sayfa {i} \"tırnaklı\" başlık",
+            'asn': f"AS{64500 + i % 50}",
+        },
+    }
+
+
+class ReplayConfig:
+    """Sunucu davranışı (handler'lar arasında paylaşılır)"""
+
+    def __init__(self, total=10000, latency=0.0, jitter=0.0, burst_every=0, burst_len=1,
+                 retry_after=0.2, has_more='normal', replay=None, quota=100000, window=60.0):
+        self.total = total
+        self.latency = latency
+        self.jitter = jitter
+        self.burst_every = burst_every      # her N istekte bir 429 patlaması (0 = yok)
+        self.burst_len = burst_len          # patlamadaki ardışık 429 sayısı
+        self.retry_after = retry_after
+        self.has_more = has_more            # normal | never | always
+        self.cache = link.PageCache(replay) if replay else None
+        self.quota = quota
+        self.window = window
+        self.requests = 0
+        self.throttled = 0
+        self._burst_left = 0
+        self._lock = threading.Lock()
+
+    def next_is_429(self):
+        with self._lock:
+            self.requests += 1
+            if self._burst_left > 0:
+                self._burst_left -= 1
+            elif self.burst_every and self.requests % self.burst_every == 0:
+                self._burst_left = self.burst_len - 1
+            else:
+                return False
+            self.throttled += 1
+            return True
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    config = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _search_page(self, query):
+        cfg = self.config
+        size = int(query.get('size', ['100'])[0])
+        search_after = query.get('search_after', [None])[0]
+
+        if cfg.cache:
+            params = {'q': query.get('q', [''])[0], 'size': size}
+            if search_after:
+                params['search_after'] = search_after
+            data = cfg.cache.get(params, ignore_ttl=True)
+            return data or {'results': [], 'total': 0, 'has_more': False}
+
+        # Sentetik: cursor'daki scan_id'nin indeksi, sort'un ilk değerinden bulunur
+        start = 0
+        if search_after:
+            ms = int(search_after.split(',')[0])
+            start = (1700000000000 - ms) // 60000 + 1
+        end = min(cfg.total, start + size)
+        results = [synthetic_result(i) for i in range(start, end)]
+        has_more = {'never': False, 'always': True}.get(cfg.has_more, end < cfg.total)
+        return {'results': results, 'total': min(cfg.total, 10000), 'took': 5, 'has_more': has_more}
+
+    def do_GET(self):
+        cfg = self.config
+        if cfg.latency or cfg.jitter:
+            delay = cfg.latency + cfg.jitter * (hash(self.path) % 1000) / 1000
+            time.sleep(delay)
+        url = urlparse(self.path)
+
+        if url.path.startswith('/screenshots/'):
+            seed = url.path.rsplit('/', 1)[-1][:2]
+            # Aynı içerikli görüntüler: içerik adresli depoda tekilleşir
+            return self._send(200, b'\x89PNG\r\n\x1a\n' + bytes([int(seed, 16) % 5]) * 20000, 'image/png')
+
+        if '/result/' in url.path:
+            scan_id = url.path.rstrip('/').rsplit('/', 1)[-1]
+            body = json.dumps({
+                'page': {'asn': 'AS64500', 'asnname': 'EXAMPLE-NET'},
+                'lists': {'domains': [f"{scan_id[:6]}.example.com", 'cdn.example.net'],
+                          'ips': ['10.0.0.1'], 'certificates': [{'subjectName': 'example.com'}]},
+                'verdicts': {'overall': {'malicious': False}},
+            }).encode()
+            return self._send(200, body)
+
+        if cfg.next_is_429():
+            return self._send(429, b'{"message": "Rate limit exceeded"}',
+                              headers={'Retry-After': str(cfg.retry_after),
+                                       'X-Rate-Limit-Remaining': '0',
+                                       'X-Rate-Limit-Reset-After': str(cfg.retry_after)})
+
+        body = json.dumps(self._search_page(parse_qs(url.query))).encode()
+        self._send(200, body, headers={
+            'X-Rate-Limit-Limit': str(cfg.quota),
+            'X-Rate-Limit-Remaining': str(max(0, cfg.quota - cfg.requests)),
+            'X-Rate-Limit-Reset-After': str(cfg.window),
+        })
+
+
+def start_server(config, port=0):
+    """Sunucuyu arka planda başlat; (server, arama adresi) döndür"""
+    handler = type('Handler', (ReplayHandler,), {'config': config})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/search/"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def bench_search(base_url, n):
+    """(sonuçlar, saniye, sayfa sayısı)"""
+    api = link.URLScanAPI(base_url=base_url)
+    pages = 0
+
+    def cb(event, data):
+        nonlocal pages
+        if event == 'progress':
+            pages += 1
+
+    started = time.perf_counter()
+    api.search('page.domain:example.com', n, cb)
+    return api.all_results, time.perf_counter() - started, pages
+
+
+def bench_memory(base_url, n):
+    """Arama sırasında tepe bellek (tracemalloc, bayt)"""
+    gc.collect()
+    tracemalloc.start()
+    api = link.URLScanAPI(base_url=base_url)
+    api.search('page.domain:example.com', n)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_exports(records, formats, directory):
+    """Format başına (saniye, bayt)"""
+    api = link.URLScanAPI()
+    api.all_results = records
+    report = {}
+    for fmt in formats:
+        base = os.path.join(directory, f"bench_{fmt}")
+        started = time.perf_counter()
+        files = api.export(base, [fmt])
+        elapsed = time.perf_counter() - started
+        report[fmt] = (elapsed, sum(os.path.getsize(f) for f in files))
+    return report
+
+
+def bench_gui(records, page_size=100):
+    """Sayfa sayfa tabloya ekleme hızı (satır/sn); ekran yoksa None"""
+    if not link.GUI_AVAILABLE:
+        return None
+    try:
+        gui = link.GUIMode(link.URLScanAPI())
+    except link.tk.TclError:
+        return None
+    try:
+        gui.root.update()
+        gui.api.all_results = records
+        started = time.perf_counter()
+        for start in range(0, len(records), page_size):
+            count = min(start + page_size, len(records))
+            # pump_events'in sayfa başına yaptığı iş
+            gui.api.stats.add_many(records[start:count])
+            gui.table.set_count(count)
+            gui.update_stats()
+            gui.root.update()
+        return len(records) / (time.perf_counter() - started)
+    finally:
+        gui.root.destroy()
+
+
+def run_benchmark(args):
+    sizes = [int(x) for x in args.results.split(',')]
+    formats = [f for f in args.formats.split(',') if f in link.SINK_TYPES]
+    config = ReplayConfig(total=max(sizes), latency=args.latency, burst_every=args.burst_every,
+                          burst_len=args.burst_len, retry_after=args.retry_after, replay=args.replay)
+    server, base_url = start_server(config)
+    report = {'sizes': {}, 'exports': {}, 'gui_rows_per_sec': None}
+
+    print(f"🧪 Replay sunucusu: {base_url}")
+    print(f"{'Sonuç':>8} {'sn':>7} {'sayfa/sn':>9} {'sonuç/sn':>10} {'MB/10k':>8} {'429':>5}")
+    records = []
+    for n in sizes:
+        config.throttled = 0
+        records, elapsed, pages = bench_search(base_url, n)
+        throttled = config.throttled
+        peak = bench_memory(base_url, n)
+        per_10k = peak / max(1, len(records)) * 10000 / 1e6
+        report['sizes'][n] = {
+            'results': len(records), 'seconds': round(elapsed, 3),
+            'pages_per_sec': round(pages / elapsed, 1), 'results_per_sec': round(len(records) / elapsed),
+            'peak_mb_per_10k': round(per_10k, 2), 'throttled': throttled,
+        }
+        print(f"{len(records):>8} {elapsed:>7.2f} {pages / elapsed:>9.1f} {len(records) / elapsed:>10.0f} "
+              f"{per_10k:>8.2f} {throttled:>5}")
+
+    print(f"\n📦 Dışa aktarma ({len(records)} sonuç)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, (elapsed, size) in bench_exports(records, formats, tmp).items():
+            report['exports'][fmt] = {'seconds': round(elapsed, 3), 'bytes': size}
+            print(f"  {fmt:<9} {elapsed:>7.3f} sn {size / 1e6:>9.2f} MB")
+
+    rate = bench_gui(records)
+    report['gui_rows_per_sec'] = None if rate is None else round(rate)
+    print(f"\n🖥️ GUI tablo: {'ekran yok, atlandı' if rate is None else f'{rate:,.0f} satır/sn'}")
+
+    server.shutdown()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Rapor: {args.json}")
+    return report
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# YÜKLEME SÜRESİ (REGRESYON KONTROLÜ)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Modül yüklenirken gelmemesi gereken bağımlılıklar ve toplam süre bütçesi (ms)
+IMPORT_TARGETS = {
+    'link': {
+        'forbidden': ('requests', 'urllib3', 'tkinter', 'PIL', 'pyarrow', 'webbrowser'),
+        'budget_ms': 80,
+    },
+    'testaraci': {
+        'forbidden': ('aiohttp', 'httpx', 'vlc', 'tkinter', 'webbrowser', 'testaraci_gui'),
+        'budget_ms': 150,
+    },
+}
+
+
+def parse_importtime(stderr, module):
+    """-X importtime çıktısından modülün alt ağacı: {isim: (kendi_us, toplam_us)}
+
+    Satırlar alt modüller önce gelecek şekilde sıralıdır; girintisiz satır bir
+    üst düzey import'u kapatır. site gibi yorumlayıcı açılışındaki import'lar
+    sayılmaz.
+    """
+    tree = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        tree[name.strip()] = (int(self_us), int(cumulative))
+        if depth == 0:
+            if name.strip() == module:
+                return tree
+            tree = {}
+    return {}
+
+
+def measure_import(module, runs=5):
+    """Temiz yorumlayıcıda import süresi; (medyan ms, son çalıştırmanın alt ağacı)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    cmd = [sys.executable, '-X', 'importtime', '-c', f"import {module}"]
+    # İlk çalıştırma .pyc dosyalarını üretir, ölçüme katılmaz
+    subprocess.run(cmd, cwd=here, capture_output=True, text=True)
+    totals, tree = [], {}
+    for _ in range(runs):
+        proc = subprocess.run(cmd, cwd=here, capture_output=True, text=True)
+        tree = parse_importtime(proc.stderr, module)
+        if not tree:
+            raise RuntimeError(f"{module} yüklenemedi:\n{proc.stderr[-500:]}")
+        totals.append(tree[module][1] / 1000)
+    return statistics.median(totals), tree
+
+
+def run_importtime(args):
+    """Hedefleri ölç, kuralları denetle; regresyon varsa 1 döndür"""
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    failures, report = [], {}
+    for module, rules in IMPORT_TARGETS.items():
+        ms, tree = measure_import(module, args.runs)
+        report[module] = round(ms, 1)
+        print(f"📦 {module}: {ms:.1f} ms (medyan, {args.runs} çalıştırma, bütçe {rules['budget_ms']} ms)")
+        # Alt ağaçtaki en pahalı import'lar
+        top = sorted(((cum, name) for name, (_, cum) in tree.items() if name != module), reverse=True)
+        for cum, name in top[:args.top]:
+            print(f"     {cum / 1000:>7.1f} ms  {name}")
+        
+        loaded = [m for m in rules['forbidden'] if any(n == m or n.startswith(m + '.') for n in tree)]
+        if loaded:
+            failures.append(f"{module}: yüklenmemesi gereken modüller yüklendi: {', '.join(loaded)}")
+        if ms > rules['budget_ms']:
+            failures.append(f"{module}: {ms:.1f} ms > bütçe {rules['budget_ms']} ms")
+        if module in baseline and ms > baseline[module] * (1 + args.tolerance):
+            failures.append(f"{module}: {ms:.1f} ms > taban {baseline[module]} ms + %{args.tolerance * 100:.0f}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Taban: {args.save_baseline}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Yükleme süresi regresyonu yok")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="URLScan replay sunucusu ve benchmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def server_options(p, latency):
+        p.add_argument('--latency', type=float, default=latency, help="İstek başına gecikme (sn)")
+        p.add_argument('--burst-every', type=int, default=0, help="Her N istekte 429 patlaması (0 = yok)")
+        p.add_argument('--burst-len', type=int, default=1, help="Patlamadaki ardışık 429 sayısı")
+        p.add_argument('--retry-after', type=float, default=0.2, help="429 Retry-After (sn)")
+        p.add_argument('--replay', help="link.py sayfa önbelleği klasörü (kayıtlı sayfaları sun)")
+
+    serve = sub.add_parser('serve', help="Sunucuyu ön planda çalıştır")
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--total', type=int, default=50000, help="Sentetik sonuç sayısı")
+    serve.add_argument('--jitter', type=float, default=0.0, help="Ek rastgele gecikme üst sınırı (sn)")
+    serve.add_argument('--has-more', choices=('normal', 'never', 'always'), default='normal')
+    server_options(serve, 0.02)
+
+    run = sub.add_parser('run', help="Benchmark'ı çalıştır")
+    run.add_argument('--results', default='10000', help="Virgülle ayrılmış sonuç sayıları")
+    run.add_argument('--formats', default=','.join(link.SINK_TYPES))
+    run.add_argument('--json', help="Raporu JSON olarak kaydet")
+    server_options(run, 0.0)
+
+    importtime = sub.add_parser('importtime', help="Modül yükleme süresi regresyon kontrolü")
+    importtime.add_argument('--runs', type=int, default=5)
+    importtime.add_argument('--top', type=int, default=5, help="Gösterilecek en pahalı import sayısı")
+    importtime.add_argument('--baseline', help="Karşılaştırılacak taban (JSON, modül → ms)")
+    importtime.add_argument('--tolerance', type=float, default=0.25, help="Tabana göre izin verilen artış")
+    importtime.add_argument('--save-baseline', help="Ölçümü taban olarak kaydet")
+    
+    args = parser.parse_args(argv)
+    if args.command == 'importtime':
+        sys.exit(run_importtime(args))
+    if args.command == 'run':
+        run_benchmark(args)
+        return
+
+    config = ReplayConfig(total=args.total, latency=args.latency, jitter=args.jitter,
+                          burst_every=args.burst_every, burst_len=args.burst_len,
+                          retry_after=args.retry_after, has_more=args.has_more, replay=args.replay)
+    server, base_url = start_server(config, args.port)
+    print(f"🧪 Replay sunucusu çalışıyor: {base_url}")
+    print(f"   URLSCAN_BASE_URL={base_url} python link.py --cli")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   istek {config.requests}, 429 {config.throttled}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
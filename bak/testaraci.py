@@ -14,26 +14,38 @@ pip install python-vlc   # Önizleme gerekiyorsa
 Not: Bu betik GUI'den bağımsız olarak yüksek performanslı asenkron istekler kullanır.
 """
 
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
 import re
 import asyncio
-import aiohttp
 import threading
 import time
-import webbrowser
 import sys
 import os
 import subprocess
 import json
-from urllib.parse import urlparse
-
-# VLC opsiyonel - eğer yüklü değilse sadece önizleme devre dışı kalır
-try:
-    import vlc
-    VLC_AVAILABLE = True
-except Exception:
-    VLC_AVAILABLE = False
+import csv
+import contextlib
+import ssl
+import base64
+import statistics
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from urllib.parse import urlparse, urljoin
+
+# Ağır bağımlılıklar sadece kullanan yolda yüklenir: aiohttp ilk oturum açılırken,
+# VLC ilk önizlemede, tkinter sadece GUI açılırken (testaraci_gui.py).
+_vlc = None
+
+
+def load_vlc():
+    """python-vlc'yi ilk çağrıda yükle; yüklü değilse None (önizleme devre dışı kalır)"""
+    global _vlc
+    if _vlc is None:
+        try:
+            import vlc
+            _vlc = vlc
+        except Exception:
+            _vlc = False
+    return _vlc or None
 
 # ------------------------- Yardımcı Fonksiyonlar -------------------------
 
@@ -58,81 +70,790 @@ def filter_m3u_urls(urls):
     return [u for u in urls if any(ext in u.lower() for ext in m3u_exts)]
 
 
+# Kanal kaydı: ad ve stream url'ye ek olarak EXTINF öznitelikleri
+Channel = namedtuple('Channel', 'name url tvg_id tvg_name group logo')
+
+# Test edilen kanal: süreler saniye, verim bayt/sn (ölçülmediyse None)
+TestedChannel = namedtuple('TestedChannel', 'name url ok info elapsed ttfb throughput')
+
+# Tek bir stream probunun sonucu (ttfb/read_time saniye)
+ProbeResult = namedtuple('ProbeResult', 'ok status content_type nbytes ttfb read_time')
+
+# #EXTINF:-1 tvg-id="x" group-title="A, B",Kanal Adı
+# Başlık kısmı tırnak içindeki virgülleri atlayarak ilk "dış" virgüle kadar alınır.
+EXTINF_HEAD = re.compile(r'#EXTINF:\s*(-?\d+(?:\.\d+)?)?((?:[^",]|"[^"]*")*),(.*)$', re.IGNORECASE)
+EXTINF_ATTR = re.compile(r'([\w-]+)=(?:"([^"]*)"|\'([^\']*)\'|([^\s"\',]+))')
+
+
+def parse_extinf(line):
+    # -> (kanal adı, {öznitelik: değer})
+    m = EXTINF_HEAD.match(line)
+    if m:
+        head, name = m.group(2), m.group(3)
+    else:
+        # Kapanmamış tırnak vb. bozuk satır: eski davranış
+        head, _, name = line.partition(',')
+    attrs = {}
+    for a in EXTINF_ATTR.finditer(head):
+        attrs[a.group(1).lower()] = a.group(2) if a.group(2) is not None else (
+            a.group(3) if a.group(3) is not None else a.group(4))
+    name = name.strip() or attrs.get('tvg-name') or 'Unknown'
+    return name, attrs
+
+
+def format_extinf(ch):
+    attrs = [(k, v) for k, v in (('tvg-id', ch.tvg_id), ('tvg-name', ch.tvg_name),
+                                 ('tvg-logo', ch.logo), ('group-title', ch.group)) if v]
+    head = ''.join(f' {k}="{v}"' for k, v in attrs)
+    return f'#EXTINF:-1{head},{ch.name}'
+
+
 def parse_m3u(content):
-    # Basit ama çoğu m3u'yu yakalar
+    # Kanal kayıtları (Channel) listesi döndürür
     channels = []
     lines = [l.strip() for l in content.splitlines() if l.strip()]
+    n = len(lines)
     i = 0
-    while i < len(lines):
+    while i < n:
         line = lines[i]
-        if line.upper().startswith('#EXTINF'):
-            # #EXTINF:-1 tvg-id="" tvg-name="...",Channel Name
-            parts = line.split(',', 1)
-            name = parts[1].strip() if len(parts) > 1 else 'Unknown'
+        if line[:7].upper() == '#EXTINF':
+            name, attrs = parse_extinf(line)
+            group = attrs.get('group-title', '')
             url = None
-            if i + 1 < len(lines):
-                url_candidate = lines[i+1]
-                if url_candidate.lower().startswith('http'):
-                    url = url_candidate
-                    i += 1
-            channels.append((name, url))
+            # EXTINF ile URL arasında #EXTGRP / #EXTVLCOPT gibi satırlar olabilir
+            j = i + 1
+            while j < n and lines[j][:1] == '#' and lines[j][:7].upper() != '#EXTINF':
+                if not group and lines[j][:8].upper() == '#EXTGRP:':
+                    group = lines[j][8:].strip()
+                j += 1
+            if j < n and lines[j].lower().startswith('http'):
+                url = lines[j]
+                i = j
+            channels.append(Channel(name, url, attrs.get('tvg-id', ''), attrs.get('tvg-name', ''),
+                                    group, attrs.get('tvg-logo', '')))
         i += 1
     return channels
 
 
+def normalize_key(text):
+    return ' '.join(text.casefold().split())
+
+
+class ChannelIndex:
+    """Kontrol edilen tüm playlist'lerin kanalları için sütunlu bellek içi indeks.
+
+    Her kanal bir satırdır; sütunlar sıkı tamsayı dizileri olarak tutulur ve
+    metinler (ad, grup, tvg-id) tek bir tabloda bir kez saklanır. Grup, kanal
+    adı ve tvg-id için ters indeksler sayesinde filtreler ve kopya kanal
+    sorguları tekrar indirme yapmadan milisaniyeler içinde çalışır.
+    """
+
+    def __init__(self):
+        self.playlists = []              # playlist id -> url
+        self.playlist_ok = bytearray()   # playlist id -> çalışıyor mu
+        self._playlist_ids = {}
+        self._strings = ['']             # metin id -> normalize metin
+        self._display = ['']             # metin id -> ilk görülen orijinal yazım
+        self._string_ids = {'': 0}
+        self.col_playlist = array('I')
+        self.col_name = array('I')
+        self.col_group = array('I')
+        self.col_tvg_id = array('I')
+        self.col_url = []
+        self._by_name = {}
+        self._by_group = {}
+        self._by_tvg_id = {}
+
+    def __len__(self):
+        return len(self.col_playlist)
+
+    def clear(self):
+        self.__init__()
+
+    def _intern(self, text):
+        key = normalize_key(text) if text else ''
+        sid = self._string_ids.get(key)
+        if sid is None:
+            sid = len(self._strings)
+            self._string_ids[key] = sid
+            self._strings.append(key)
+            self._display.append(text.strip())
+        return sid
+
+    def add_playlist(self, url, channels, ok):
+        pid = self._playlist_ids.get(url)
+        if pid is not None:
+            # Aynı playlist tekrar kontrol edildi: sadece durumunu güncelle
+            self.playlist_ok[pid] = bool(ok)
+            return pid
+        pid = len(self.playlists)
+        self._playlist_ids[url] = pid
+        self.playlists.append(url)
+        self.playlist_ok.append(bool(ok))
+        for ch in channels:
+            row = len(self.col_playlist)
+            nid, gid, tid = self._intern(ch.name), self._intern(ch.group), self._intern(ch.tvg_id)
+            self.col_playlist.append(pid)
+            self.col_name.append(nid)
+            self.col_group.append(gid)
+            self.col_tvg_id.append(tid)
+            self.col_url.append(ch.url)
+            self._by_name.setdefault(nid, array('I')).append(row)
+            if gid:
+                self._by_group.setdefault(gid, array('I')).append(row)
+            if tid:
+                self._by_tvg_id.setdefault(tid, array('I')).append(row)
+        return pid
+
+    def _matching_ids(self, query, table, exact):
+        key = normalize_key(query)
+        if exact:
+            sid = self._string_ids.get(key)
+            return [sid] if sid in table else []
+        return [sid for sid in table if key in self._strings[sid]]
+
+    def _playlists_for(self, table, query, working_only, exact):
+        pids = set()
+        for sid in self._matching_ids(query, table, exact):
+            pids.update(self.col_playlist[r] for r in table[sid])
+        return [self.playlists[p] for p in sorted(pids) if not working_only or self.playlist_ok[p]]
+
+    def playlists_with_group(self, group, working_only=True, exact=False):
+        return self._playlists_for(self._by_group, group, working_only, exact)
+
+    def playlists_with_channel(self, name, working_only=True, exact=False):
+        pids = set(self._playlists_for(self._by_name, name, working_only, exact))
+        pids.update(self._playlists_for(self._by_tvg_id, name, working_only, exact))
+        return sorted(pids)
+
+    def groups(self, working_only=True):
+        # -> [(grup, kanal sayısı)] çoktan aza
+        out = []
+        for gid, rows in self._by_group.items():
+            n = sum(1 for r in rows if not working_only or self.playlist_ok[self.col_playlist[r]])
+            if n:
+                out.append((self._display[gid], n))
+        out.sort(key=lambda g: g[1], reverse=True)
+        return out
+
+    def duplicates(self, min_providers=2, working_only=True):
+        # Birden fazla playlist'te bulunan kanallar: tvg-id varsa onunla, yoksa ada göre eşlenir
+        buckets = {}
+        for row in range(len(self.col_playlist)):
+            pid = self.col_playlist[row]
+            if working_only and not self.playlist_ok[pid]:
+                continue
+            tid = self.col_tvg_id[row]
+            key = ('t', tid) if tid else ('n', self.col_name[row])
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = (self.col_name[row], set())
+            bucket[1].add(pid)
+        out = []
+        for nid, pids in buckets.values():
+            if len(pids) >= min_providers:
+                out.append((self._display[nid], [self.playlists[p] for p in sorted(pids)]))
+        out.sort(key=lambda d: len(d[1]), reverse=True)
+        return out
+
+
+def preview_candidates(channels, tested=()):
+    # Önizleme sırası: önce kontrolde çalıştığı görülen kanallar (en hızlıdan
+    # yavaşa), sonra hiç denenmemiş kanallar. Çalışmadığı bilinenler atlanır.
+    good, bad = [], set()
+    for t in tested:
+        if not t.url:
+            continue
+        if t.ok:
+            speed = t.ttfb if t.ttfb is not None else t.elapsed
+            good.append((speed if speed is not None else float('inf'), t.name, t.url))
+        else:
+            bad.add(t.url)
+    good.sort(key=lambda g: g[0])
+    seen = set(bad)
+    ordered = []
+    for _elapsed, name, s_url in good:
+        if s_url not in seen:
+            seen.add(s_url)
+            ordered.append((name, s_url))
+    for ch in channels:
+        name, s_url = ch.name, ch.url
+        if s_url and s_url not in seen:
+            seen.add(s_url)
+            ordered.append((name, s_url))
+    return ordered
+
+
+def quality_score(tested, target_throughput=1024 * 1024):
+    """Playlist kalite puanı (0-100) ve ayrıntıları.
+
+    Bileşenler: test edilen kanallarda başarı oranı, çalışan kanalların medyan
+    TTFB'si (0.5 sn -> yarım puan) ve medyan okuma verimi (target_throughput ve
+    üstü tam puan). Verim ölçülmediyse ağırlığı diğer ikisine dağıtılır.
+    """
+    with_url = [t for t in tested if t.url]
+    if not with_url:
+        return 0.0, {'success_ratio': 0.0, 'median_ttfb_ms': None, 'median_kbps': None}
+    good = [t for t in with_url if t.ok]
+    success = len(good) / len(with_url)
+    ttfbs = [t.ttfb for t in good if t.ttfb is not None]
+    rates = [t.throughput for t in good if t.throughput is not None]
+    median_ttfb = statistics.median(ttfbs) if ttfbs else None
+    median_rate = statistics.median(rates) if rates else None
+    ttfb_score = 1.0 / (1.0 + median_ttfb / 0.5) if median_ttfb is not None else 0.0
+    if median_rate is not None:
+        rate_score = min(1.0, median_rate / target_throughput)
+        score = 0.4 * success + 0.3 * ttfb_score + 0.3 * rate_score
+    else:
+        score = 0.55 * success + 0.45 * ttfb_score
+    return round(score * 100, 1), {
+        'success_ratio': round(success, 3),
+        'median_ttfb_ms': None if median_ttfb is None else round(median_ttfb * 1000, 1),
+        'median_kbps': None if median_rate is None else round(median_rate / 1024, 1),
+    }
+
+
+# ------------------------- Proxy Havuzu -------------------------
+
+class ProxyError(Exception):
+    """Proxy'ye bağlanılamadı veya proxy isteği reddetti"""
+
+
+class ProxyLease:
+    """Tek bir istek için havuzdan alınan proxy; okunan bayt sayısı burada toplanır"""
+    __slots__ = ('proxy', 'nbytes')
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.nbytes = 0
+
+
+class ProxyEntry:
+    """Bir proxy'nin sağlık ve verim bilgileri"""
+
+    def __init__(self, url, window=20):
+        self.url = url
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.nbytes = 0
+        self.busy_time = 0.0
+        self.latency = None          # EWMA gecikme (sn)
+        self.recent = deque(maxlen=window)  # son isteklerin başarı durumu
+        self.consecutive_errors = 0
+        self.consecutive_timeouts = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.probation = False
+
+    def error_ratio(self):
+        if not self.recent:
+            return 0.0
+        return 1.0 - sum(self.recent) / len(self.recent)
+
+    def cost(self, limit):
+        # Düşük maliyet = tercih edilen proxy. Bilinmeyen gecikme iyimser kabul edilir.
+        latency = self.latency if self.latency is not None else 0.1
+        load = 1.0 + self.in_flight / max(1, limit)
+        # Henüz proxy'ye yazılmamış zaman aşımları da seçimi diğer proxy'lere kaydırır
+        load *= 1 + self.consecutive_timeouts
+        return latency * load / max(0.05, 1.0 - self.error_ratio())
+
+
+class ProxyPool:
+    """Dosyadan yüklenen proxy listesi; sağlık takibi ve yük dengeleme yapar.
+
+    Her proxy için eşzamanlı istek sınırı vardır. İstekler en düşük maliyetli
+    (gecikme, hata oranı ve anlık yüke göre) proxy'ye verilir. Art arda hata
+    veren veya hata oranı eşiği aşan proxy bir süre devre dışı bırakılır; süre
+    dolunca deneme modunda tek istekle geri alınır, başarılı olursa normale döner.
+
+    Zaman aşımı hiçbir zaman başarı sayılmaz. Deneme modundaki proxy'de, aynı
+    URL başka bir proxy'den alınabildiyse veya diğerleri çalışırken art arda
+    eject_after kez tekrarlanırsa proxy hatası sayılır.
+    """
+
+    def __init__(self, proxies, max_per_proxy=20, eject_after=5, error_threshold=0.5,
+                 cooldown=30.0, max_cooldown=600.0, window=20):
+        if not proxies:
+            raise ValueError('Proxy listesi boş')
+        self.entries = [ProxyEntry(p, window) for p in proxies]
+        self.max_per_proxy = max_per_proxy
+        self.eject_after = eject_after
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._cond = None
+        self._started = time.monotonic()
+        # url -> son başarılı proxy (sınırlı); zaman aşımının kaynağını ayırt etmek için
+        self._url_ok = OrderedDict()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        proxies = []
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if '://' not in line:
+                    line = 'http://' + line
+                proxies.append(line)
+        return cls(proxies, **kwargs)
+
+    @staticmethod
+    def is_proxy_error(exc):
+        # Sadece proxy kaynaklı hatalar sağlık puanını düşürür; ölü stream'ler
+        # tüm proxy'lerde aynı şekilde hata verdiği için sayılmaz.
+        if isinstance(exc, ProxyError):
+            return True
+        # aiohttp hiç yüklenmediyse (httpx taşıması) onun hatası da oluşmamıştır
+        aiohttp = sys.modules.get('aiohttp')
+        return aiohttp is not None and isinstance(
+            exc, (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError))
+
+    @staticmethod
+    def is_timeout(exc):
+        # aiohttp'nin ServerTimeoutError/ConnectionTimeoutError'ı asyncio.TimeoutError'dan türer
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+            return True
+        httpx = sys.modules.get('httpx')
+        return httpx is not None and isinstance(exc, httpx.TimeoutException)
+
+    def _timeout_is_proxy_error(self, entry, url):
+        # Ölü stream her proxy'de zaman aşımına uğrar; proxy'yi suçlamak için kanıt gerekir
+        if entry.probation:
+            return True
+        ok_proxy = self._url_ok.get(url) if url else None
+        if ok_proxy is not None and ok_proxy != entry.url:
+            return True
+        return entry.consecutive_timeouts >= self.eject_after and any(
+            e is not entry and e.recent and e.recent[-1] for e in self.entries)
+
+    def _limit(self, entry):
+        return 1 if entry.probation else self.max_per_proxy
+
+    def _pick(self):
+        now = time.monotonic()
+        best, best_cost = None, None
+        for e in self.entries:
+            if e.ejected_until:
+                if now < e.ejected_until:
+                    continue
+                # Bekleme süresi doldu: deneme modunda geri al
+                e.ejected_until = 0.0
+                e.probation = True
+            limit = self._limit(e)
+            if e.in_flight >= limit:
+                continue
+            c = e.cost(limit)
+            if best is None or c < best_cost:
+                best, best_cost = e, c
+        if best is None and all(e.ejected_until > now for e in self.entries):
+            # Hepsi devre dışı: en erken dönecek olanı deneme moduna al
+            best = min(self.entries, key=lambda e: e.ejected_until)
+            best.ejected_until = 0.0
+            best.probation = True
+            if best.in_flight >= 1:
+                best = None
+        return best
+
+    async def _acquire(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            while True:
+                entry = self._pick()
+                if entry is not None:
+                    entry.in_flight += 1
+                    return entry
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, entry, elapsed, nbytes, outcome, url=None):
+        # outcome: 'ok' | 'target' (hedef hatası, proxy yanıt verdi) | 'proxy' | 'timeout' | 'cancelled'
+        entry.in_flight -= 1
+        if outcome == 'cancelled':
+            async with self._cond:
+                self._cond.notify_all()
+            return
+        entry.requests += 1
+        entry.nbytes += nbytes
+        entry.busy_time += elapsed
+        if outcome == 'timeout':
+            entry.consecutive_timeouts += 1
+            failed = self._timeout_is_proxy_error(entry, url)
+        else:
+            entry.consecutive_timeouts = 0
+            failed = outcome == 'proxy'
+        if failed:
+            entry.recent.append(False)
+            entry.errors += 1
+            entry.consecutive_errors += 1
+        elif outcome != 'timeout':
+            entry.recent.append(True)
+            entry.consecutive_errors = 0
+            entry.latency = elapsed if entry.latency is None else 0.7 * entry.latency + 0.3 * elapsed
+            entry.probation = False
+            if url and outcome == 'ok':
+                self._url_ok[url] = entry.url
+                self._url_ok.move_to_end(url)
+                if len(self._url_ok) > 4096:
+                    self._url_ok.popitem(last=False)
+        if failed and (entry.probation or entry.consecutive_errors >= self.eject_after
+                       or entry.consecutive_timeouts >= self.eject_after
+                       or (len(entry.recent) >= 10 and entry.error_ratio() > self.error_threshold)):
+            entry.ejections += 1
+            entry.ejected_until = time.monotonic() + min(self.max_cooldown, self.cooldown * 2 ** (entry.ejections - 1))
+            entry.probation = False
+            entry.consecutive_errors = 0
+            entry.consecutive_timeouts = 0
+            entry.recent.clear()
+        async with self._cond:
+            self._cond.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def lease(self, url=None):
+        entry = await self._acquire()
+        lease = ProxyLease(entry.url)
+        t0 = time.perf_counter()
+        outcome = 'cancelled'
+        try:
+            yield lease
+            outcome = 'ok'
+        except Exception as e:
+            if self.is_proxy_error(e):
+                outcome = 'proxy'
+            elif self.is_timeout(e):
+                outcome = 'timeout'
+            else:
+                # Hedef kaynaklı hata: proxy yanıt verdi
+                outcome = 'target'
+            raise
+        finally:
+            await self._release(entry, time.perf_counter() - t0, lease.nbytes, outcome, url)
+
+    def summary(self):
+        duration = max(1e-6, time.monotonic() - self._started)
+        now = time.monotonic()
+        rows = []
+        for e in self.entries:
+            rows.append({
+                'proxy': e.url,
+                'requests': e.requests,
+                'errors': e.errors,
+                'ejections': e.ejections,
+                'ejected': e.ejected_until > now,
+                'latency_ms': None if e.latency is None else round(e.latency * 1000),
+                'req_per_s': round(e.requests / duration, 2),
+                'kb_per_s': round(e.nbytes / 1024 / duration, 1),
+            })
+        return rows
+
+
+# ------------------------- HTTP Taşıma Katmanı -------------------------
+
+class Transport:
+    """Kontrolörün ağ erişimi için ince arayüz.
+
+    fetch_text(url, proxy)           -> (status, text)
+    probe(url, proxy, read_window)   -> ProbeResult
+
+    read_window > 0 ise gövde bu süre boyunca okunarak verim ölçülür.
+
+    Tek bir deneme yapar; tekrar deneme ve proxy seçimi kontrolörün işidir.
+    """
+    name = 'base'
+    max_read_bytes = 8 * 1024 * 1024
+
+    def __init__(self, timeout=10, headers=None, limit=0):
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.limit = limit
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def fetch_text(self, url, proxy=None):
+        raise NotImplementedError
+
+    async def probe(self, url, proxy=None, read_window=0):
+        raise NotImplementedError
+
+
+class AiohttpTransport(Transport):
+    """Varsayılan taşıma: tek paylaşılan aiohttp oturumu, HEAD sonra küçük GET"""
+    name = 'aiohttp'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._session = None
+
+    async def open(self):
+        if self._session is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300),
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch_text(self, url, proxy=None):
+        async with self._session.get(url, proxy=proxy) as resp:
+            text = await resp.text(errors='ignore')
+            return resp.status, text
+
+    async def probe(self, url, proxy=None, read_window=0):
+        t0 = time.perf_counter()
+        if read_window > 0:
+            return await self._timed_get(url, proxy, read_window, t0)
+        # Önce HEAD isteği
+        async with self._session.head(url, proxy=proxy) as resp:
+            if resp.status == 200:
+                return ProbeResult(True, resp.status, resp.headers.get('Content-Type', ''), 0,
+                                   time.perf_counter() - t0, None)
+        # Bazı sunucular HEAD'i desteklemez -> küçük GET
+        t0 = time.perf_counter()
+        async with self._session.get(url, proxy=proxy) as resp:
+            ttfb = time.perf_counter() - t0
+            if resp.status == 200:
+                # Okunacak küçük bir parça
+                chunk = await resp.content.read(1024)
+                return ProbeResult(True, resp.status, resp.headers.get('Content-Type', ''), len(chunk), ttfb, None)
+            return ProbeResult(False, resp.status, None, 0, ttfb, None)
+
+    async def _timed_get(self, url, proxy, read_window, t0):
+        # GET ile ilk bayta kadar geçen süre ve read_window boyunca okuma verimi
+        async with self._session.get(url, proxy=proxy) as resp:
+            ttfb = time.perf_counter() - t0
+            if resp.status != 200:
+                return ProbeResult(False, resp.status, None, 0, ttfb, None)
+            nbytes = 0
+            r0 = time.perf_counter()
+            deadline = r0 + read_window
+            while nbytes < self.max_read_bytes:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    chunk = await asyncio.wait_for(resp.content.readany(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if not chunk:
+                    break
+                nbytes += len(chunk)
+            return ProbeResult(True, resp.status, resp.headers.get('Content-Type', ''), nbytes, ttfb,
+                               time.perf_counter() - r0)
+
+
+class RawStreamTransport(AiohttpTransport):
+    """Ham asyncio soketi ile sadece durum satırı ve başlıkları okuyan prober.
+
+    Gövde hiç okunmaz, bağlantı başlıklardan hemen sonra kapatılır. Playlist
+    indirme, verim ölçümü ve HTTPS üzerinden proxy gereken problar aiohttp'ye
+    bırakılır.
+    """
+    name = 'raw'
+    max_redirects = 4
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ssl = ssl.create_default_context()
+
+    async def _read_head(self, url, proxy):
+        u = urlparse(url)
+        https = u.scheme == 'https'
+        host = u.hostname
+        port = u.port or (443 if https else 80)
+        target = (u.path or '/') + (f'?{u.query}' if u.query else '')
+        extra = ''
+        conn_host, conn_port = host, port
+        if proxy:
+            pu = urlparse(proxy)
+            conn_host, conn_port = pu.hostname, pu.port or 8080
+            target = url
+            if pu.username:
+                cred = base64.b64encode(f'{pu.username}:{pu.password or ""}'.encode()).decode()
+                extra = f'Proxy-Authorization: Basic {cred}\r\n'
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(conn_host, conn_port, ssl=self._ssl if https else None,
+                                        server_hostname=host if https else None),
+                self.timeout)
+        except OSError as e:
+            if proxy:
+                raise ProxyError(str(e)) from e
+            raise
+        try:
+            lines = [f'GET {target} HTTP/1.1', f'Host: {u.netloc.rpartition("@")[2]}']
+            lines += [f'{k}: {v}' for k, v in self.headers.items()]
+            request = '\r\n'.join(lines) + '\r\n' + extra + 'Connection: close\r\n\r\n'
+            writer.write(request.encode('latin-1', errors='ignore'))
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.timeout)
+        finally:
+            writer.close()
+        status_line, _, rest = head.decode('latin-1').partition('\r\n')
+        parts = status_line.split(' ', 2)
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        headers = {}
+        for line in rest.split('\r\n'):
+            k, sep, v = line.partition(':')
+            if sep:
+                headers[k.strip().lower()] = v.strip()
+        if proxy and status == 407:
+            raise ProxyError('Proxy authentication required')
+        return status, headers, len(head)
+
+    async def probe(self, url, proxy=None, read_window=0):
+        if read_window > 0 or (proxy and url.lower().startswith('https')):
+            return await super().probe(url, proxy, read_window)
+        status, nbytes = 0, 0
+        for _ in range(self.max_redirects + 1):
+            t0 = time.perf_counter()
+            status, headers, nbytes = await self._read_head(url, proxy)
+            ttfb = time.perf_counter() - t0
+            location = headers.get('location')
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                if proxy and url.lower().startswith('https'):
+                    return await super().probe(url, proxy)
+                continue
+            break
+        if status == 200:
+            return ProbeResult(True, status, headers.get('content-type', ''), nbytes, ttfb, None)
+        return ProbeResult(False, status, None, nbytes, ttfb, None)
+
+
+class HttpxTransport(Transport):
+    """httpx tabanlı alternatif (pip install httpx). Proxy başına bir istemci tutar."""
+    name = 'httpx'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clients = {}
+
+    def _client(self, proxy):
+        client = self._clients.get(proxy)
+        if client is None:
+            import httpx
+            limits = httpx.Limits(max_connections=self.limit or None)
+            client = httpx.AsyncClient(timeout=self.timeout, headers=self.headers, proxy=proxy,
+                                       limits=limits, follow_redirects=True)
+            self._clients[proxy] = client
+        return client
+
+    async def open(self):
+        import httpx  # noqa: F401 - eksikse erken ve anlaşılır hata verir
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    async def fetch_text(self, url, proxy=None):
+        resp = await self._client(proxy).get(url)
+        return resp.status_code, resp.text
+
+    async def probe(self, url, proxy=None, read_window=0):
+        t0 = time.perf_counter()
+        async with self._client(proxy).stream('GET', url) as resp:
+            ttfb = time.perf_counter() - t0
+            if resp.status_code != 200:
+                return ProbeResult(False, resp.status_code, None, 0, ttfb, None)
+            nbytes = 0
+            r0 = time.perf_counter()
+            # Takılan stream'de istemci zaman aşımı devreye girer
+            async for chunk in resp.aiter_raw():
+                nbytes += len(chunk)
+                if read_window <= 0 or nbytes >= self.max_read_bytes or time.perf_counter() - r0 >= read_window:
+                    break
+            read_time = time.perf_counter() - r0 if read_window > 0 else None
+            return ProbeResult(True, resp.status_code, resp.headers.get('content-type', ''), nbytes, ttfb, read_time)
+
+
+TRANSPORTS = {
+    'aiohttp': AiohttpTransport,
+    'raw': RawStreamTransport,
+    'httpx': HttpxTransport,
+}
+
+
 # ------------------------- Asenkron Kontrolör -------------------------
 
 class AsyncIPTVChecker:
-    def __init__(self, concurrency=200, timeout=10, retries=2, headers=None, proxy=None):
+    def __init__(self, concurrency=200, timeout=10, retries=2, headers=None, proxy=None, proxy_pool=None,
+                 transport='aiohttp', read_window=0.0, test_all=False):
         self.concurrency = concurrency
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        # read_window > 0: her kanalda bu kadar saniye okuyup verim ölç
+        self.read_window = read_window
+        # test_all: ilk çalışan kanalda durma, puan için tüm N kanalı dene
+        self.test_all = test_all
+        self.timeout = timeout
         self.retries = retries
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (IPTVChecker/1.0)'
         }
         self.proxy = proxy
+        self.proxy_pool = proxy_pool
+        if isinstance(transport, str):
+            transport = TRANSPORTS[transport](timeout=timeout, headers=self.headers)
+        self.transport = transport
+        self._opened = False
         self._semaphore = asyncio.Semaphore(concurrency)
         self._stop = False
 
     def stop(self):
         self._stop = True
 
-    async def _fetch_text(self, session, url):
+    async def close(self):
+        if self._opened:
+            self._opened = False
+            await self.transport.close()
+
+    def _proxy_lease(self, url=None):
+        # Havuz varsa istek başına proxy seçilir, yoksa sabit proxy kullanılır
+        if self.proxy_pool is not None:
+            return self.proxy_pool.lease(url)
+        return contextlib.nullcontext(ProxyLease(self.proxy))
+
+    async def _fetch_text(self, url):
         # İndirme with retries
         last_exc = None
         for attempt in range(self.retries + 1):
             if self._stop:
                 raise asyncio.CancelledError()
             try:
-                async with session.get(url, timeout=self.timeout, headers=self.headers, proxy=self.proxy) as resp:
-                    text = await resp.text(errors='ignore')
-                    return resp.status, text
+                async with self._proxy_lease(url) as lease:
+                    status, text = await self.transport.fetch_text(url, proxy=lease.proxy)
+                    lease.nbytes += len(text)
+                    return status, text
             except Exception as e:
                 last_exc = e
                 await asyncio.sleep(0.3 * (attempt + 1))
         raise last_exc
 
-    async def _head_or_small_get(self, session, url):
-        # Stream uygunluğunu test etmek için önce HEAD dene sonra küçük GET
+    async def _head_or_small_get(self, url):
+        # Stream uygunluğunu test et (yöntem taşıma katmanına bağlı); ProbeResult döner.
+        # read_window ayarlıysa TTFB'ye ek olarak kısa bir pencerede okuma verimi ölçülür.
         last_exc = None
         for attempt in range(self.retries + 1):
             if self._stop:
                 raise asyncio.CancelledError()
             try:
-                # Önce HEAD isteği
-                async with session.head(url, timeout=self.timeout, headers=self.headers, proxy=self.proxy) as resp:
-                    if resp.status == 200:
-                        c_type = resp.headers.get('Content-Type', '')
-                        return True, resp.status, c_type
-                # Bazı sunucular HEAD'i desteklemez -> küçük GET
-                async with session.get(url, timeout=self.timeout, headers=self.headers, proxy=self.proxy) as resp:
-                    if resp.status == 200:
-                        c_type = resp.headers.get('Content-Type', '')
-                        # Okunacak küçük bir parça
-                        await resp.content.read(1024)
-                        return True, resp.status, c_type
-                    else:
-                        return False, resp.status, None
+                async with self._proxy_lease(url) as lease:
+                    result = await self.transport.probe(url, proxy=lease.proxy, read_window=self.read_window)
+                    lease.nbytes += result.nbytes
+                    return result
             except Exception as e:
                 last_exc = e
                 await asyncio.sleep(0.2 * (attempt + 1))
@@ -143,46 +864,58 @@ class AsyncIPTVChecker:
         if self._stop:
             return {'url': url, 'status': 'cancelled'}
         async with self._semaphore:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
+            if not self._opened:
+                self._opened = True
+                await self.transport.open()
+            try:
+                status, text = await self._fetch_text(url)
+            except Exception as e:
+                return {'url': url, 'ok': False, 'error': f'Fetch error: {e}'}
+
+            if status != 200 or '#EXTM3U' not in (text or ''):
+                return {'url': url, 'ok': False, 'status_code': status, 'error': 'Not a valid M3U or HTTP != 200'}
+
+            channels = parse_m3u(text)
+            if not channels:
+                return {'url': url, 'ok': False, 'channels': [], 'error': 'No channels found in M3U'}
+
+            # Hızlı: ilk N kanalı küçük GET ile test et
+            num_to_test = min(max_channel_check, len(channels))
+            tested = []
+            working = False
+            for idx, ch in enumerate(channels[:num_to_test], start=1):
+                name, stream_url = ch.name, ch.url
+                if not stream_url:
+                    tested.append(TestedChannel(name, stream_url, False, 'No URL', None, None, None))
+                    continue
+                t0 = time.perf_counter()
                 try:
-                    status, text = await self._fetch_text(session, url)
+                    r = await self._head_or_small_get(stream_url)
+                    rate = r.nbytes / r.read_time if r.read_time else None
+                    tested.append(TestedChannel(name, stream_url, r.ok, f'status={r.status}, type={r.content_type}',
+                                                time.perf_counter() - t0, r.ttfb, rate))
+                    if r.ok and deep and is_ffprobe_available():
+                        # Derin doğrulama: ffprobe varsa çalıştır
+                        probe_ok = await asyncio.get_event_loop().run_in_executor(None, self._ffprobe_check, stream_url)
+                        if not probe_ok:
+                            # HTTP yanıtı iyi olsa da akış çözülemedi; kanal çalışmıyor sayılır
+                            tested[-1] = tested[-1]._replace(ok=False, info='ffprobe failed')
+                            continue
+                    if r.ok:
+                        # Hafif modda (veya ffprobe yoksa) ilk çalışan kanal linki kabul ettirir
+                        working = True
+                        if not self.test_all:
+                            break
                 except Exception as e:
-                    return {'url': url, 'ok': False, 'error': f'Fetch error: {e}'}
-
-                if status != 200 or '#EXTM3U' not in (text or ''):
-                    return {'url': url, 'ok': False, 'status_code': status, 'error': 'Not a valid M3U or HTTP != 200'}
-
-                channels = parse_m3u(text)
-                if not channels:
-                    return {'url': url, 'ok': False, 'channels': [], 'error': 'No channels found in M3U'}
-
-                # Hızlı: ilk N kanalı küçük GET ile test et
-                num_to_test = min(max_channel_check, len(channels))
-                tested = []
-                for idx, (name, stream_url) in enumerate(channels[:num_to_test], start=1):
-                    if not stream_url:
-                        tested.append((name, stream_url, False, 'No URL'))
-                        continue
-                    try:
-                        ok, st, ctype = await self._head_or_small_get(session, stream_url)
-                        tested.append((name, stream_url, ok, f'status={st}, type={ctype}'))
-                        if ok and not deep:
-                            # Eğer hafif mod ve bir kanal çalışıyorsa linki kabul et
-                            return {'url': url, 'ok': True, 'channels': channels, 'tested': tested}
-                        elif ok and deep:
-                            # Derin doğrulama: ffprobe varsa çalıştır
-                            if is_ffprobe_available():
-                                probe_ok = await asyncio.get_event_loop().run_in_executor(None, self._ffprobe_check, stream_url)
-                                if probe_ok:
-                                    return {'url': url, 'ok': True, 'channels': channels, 'tested': tested}
-                            else:
-                                # ffprobe yoksa ilk ok kabul
-                                return {'url': url, 'ok': True, 'channels': channels, 'tested': tested}
-                    except Exception as e:
-                        tested.append((name, stream_url, False, str(e)))
-
-                # Eğer buraya geldiyse ilk N kanal çalışmadı
-                return {'url': url, 'ok': False, 'channels': channels, 'tested': tested, 'error': 'No working channels in tested set'}
+                    tested.append(TestedChannel(name, stream_url, False, str(e), time.perf_counter() - t0, None, None))
+
+            score, quality = quality_score(tested)
+            if working:
+                return {'url': url, 'ok': True, 'channels': channels, 'tested': tested,
+                        'score': score, 'quality': quality}
+            # Eğer buraya geldiyse ilk N kanal çalışmadı
+            return {'url': url, 'ok': False, 'channels': channels, 'tested': tested, 'score': score,
+                    'quality': quality, 'error': 'No working channels in tested set'}
 
     def _ffprobe_check(self, stream_url):
         # ffprobe ile kısa bir doğrulama (blocking, threadpool içinde çağrılmalı)
@@ -207,323 +940,251 @@ class AsyncIPTVChecker:
         except Exception:
             return False
 
-# ------------------------- GUI Uygulaması -------------------------
+# ------------------------- Taşıma Karşılaştırması -------------------------
 
-class AdvancedIPTVCheckerApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title('Gelişmiş IPTV Link Kontrol Aracı')
-        self.geometry('1200x800')
-        self.configure(bg='#222')
-
-        # Varsayılan tercih
-        self.prefs = {
-            'timeout': 8,
-            'concurrency': 200,
-            'retries': 2,
-            'channels_to_test': 3,
-            'deep_check': False,
-            'user_agent': 'Mozilla/5.0 (IPTVChecker/Advanced)',
-            'proxy': None
-        }
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+    return values[k]
 
-        self.loop_thread = None
-        self.loop = None
-        self.checker = None
-        self.worker_task = None
-        self.stop_event = threading.Event()
-        self.link_results = {}  # url -> result dict
-
-        self.create_widgets()
-
-    def create_widgets(self):
-        top = tk.Frame(self, bg='#333')
-        top.pack(fill=tk.X, padx=8, pady=6)
-
-        tk.Button(top, text='Dosya Seç (.txt veya .m3u)', command=self.select_file, bg='#4caf50', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Yapıştırtan Al', command=self.paste_input, bg='#2196f3', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Linkleri Bul', command=self.find_links_from_input, bg='#009688', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Kontrol Başlat', command=self.start_check, bg='#f44336', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Durdur', command=self.stop_check, bg='#ff9800', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Dışa Aktar (Çalışanlar)', command=self.export_working, bg='#607d8b', fg='white').pack(side=tk.LEFT, padx=4)
-        tk.Button(top, text='Tercihler', command=self.open_preferences, bg='#795548', fg='white').pack(side=tk.LEFT, padx=4)
-
-        # Orta bölüm: giriş/çıktı ve log
-        mid = tk.PanedWindow(self, orient=tk.HORIZONTAL)
-        mid.pack(fill=tk.BOTH, expand=True, padx=8, pady=6)
-
-        left = tk.Frame(mid, bg='#2b2b2b')
-        mid.add(left, stretch='always')
-        right = tk.Frame(mid, bg='#1f1f1f', width=380)
-        mid.add(right, stretch='never')
-
-        # Girdi alanı
-        tk.Label(left, text='Girdi (dosya veya yapıştırılmış içerik):', bg='#2b2b2b', fg='white').pack(anchor='w', padx=6, pady=4)
-        self.text_input = tk.Text(left, height=10, bg='#121212', fg='white')
-        self.text_input.pack(fill=tk.X, padx=6)
-
-        # Link listeleri
-        lists = tk.Frame(left, bg='#2b2b2b')
-        lists.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
-
-        lb_frame = tk.Frame(lists, bg='#2b2b2b')
-        lb_frame.pack(fill=tk.BOTH, expand=True)
-
-        tk.Label(lb_frame, text='Tespit Edilen M3U Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
-        self.lb_links = tk.Listbox(lb_frame, bg='#111', fg='white')
-        self.lb_links.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
-        sc = tk.Scrollbar(lb_frame, command=self.lb_links.yview)
-        sc.pack(side=tk.LEFT, fill=tk.Y)
-        self.lb_links.config(yscrollcommand=sc.set)
-
-        right_inner = tk.Frame(right, bg='#121212')
-        right_inner.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
-        tk.Label(right_inner, text='Sistem Log', bg='#121212', fg='lime').pack(anchor='w')
-        self.log = tk.Text(right_inner, bg='#000', fg='lime', height=20)
-        self.log.pack(fill=tk.BOTH, expand=True)
-
-        # İlerleme
-        bottom = tk.Frame(self, bg='#222')
-        bottom.pack(fill=tk.X, padx=8, pady=6)
-        self.progress = ttk.Progressbar(bottom, length=600)
-        self.progress.pack(side=tk.LEFT, padx=6)
-        self.progress_label = tk.Label(bottom, text='0/0', bg='#222', fg='white')
-        self.progress_label.pack(side=tk.LEFT, padx=6)
-
-        # Sağ alt: çalışma/başarısız listeleri
-        results_frame = tk.Frame(self, bg='#2b2b2b')
-        results_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=6)
-
-        left_res = tk.Frame(results_frame, bg='#2b2b2b')
-        left_res.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        tk.Label(left_res, text='Çalışan Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
-        self.lb_working = tk.Listbox(left_res, bg='#082', fg='white')
-        self.lb_working.pack(fill=tk.BOTH, expand=True)
-        self.lb_working.bind('<Double-Button-1>', self.preview_selected)
-
-        right_res = tk.Frame(results_frame, bg='#2b2b2b')
-        right_res.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        tk.Label(right_res, text='Başarısız Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
-        self.lb_failed = tk.Listbox(right_res, bg='#820', fg='white')
-        self.lb_failed.pack(fill=tk.BOTH, expand=True)
-
-    # ---------------- GUI yardımcıları ----------------
-    def log_message(self, text):
-        ts = time.strftime('%H:%M:%S')
-        self.log.insert(tk.END, f'[{ts}] {text}\n')
-        self.log.see(tk.END)
-
-    def select_file(self):
-        p = filedialog.askopenfilename(filetypes=[('Text/M3U files', '*.txt;*.m3u;*.m3u8')])
-        if not p:
-            return
-        try:
-            with open(p, 'r', encoding='utf-8', errors='ignore') as f:
-                data = f.read()
-            self.text_input.delete('1.0', tk.END)
-            self.text_input.insert(tk.END, data)
-            self.log_message(f'Yüklendi: {p}')
-        except Exception as e:
-            messagebox.showerror('Hata', f'Dosya okunamadı: {e}')
 
-    def paste_input(self):
-        # Pencereye yapıştırmak için kullanıcıya kısayol göster
-        messagebox.showinfo('Yapıştır', 'Metni panoya kopyalayıp OK ile yapıştırabilirsiniz.')
-        try:
-            clipboard = self.clipboard_get()
-            self.text_input.insert(tk.END, clipboard)
-            self.log_message('Panodan yapıştırıldı')
-        except Exception:
-            self.log_message('Panodan alınamadı veya boş.')
-
-    def find_links_from_input(self):
-        text = self.text_input.get('1.0', tk.END)
-        urls = extract_urls_from_text(text)
-        m3u_urls = filter_m3u_urls(urls)
-        self.lb_links.delete(0, tk.END)
-        for u in m3u_urls:
-            self.lb_links.insert(tk.END, u)
-        self.log_message(f'{len(m3u_urls)} adet M3U linki bulundu')
-
-    # ----------------- Asenkron iş kontrol -----------------
-    def start_check(self):
-        links = list(self.lb_links.get(0, tk.END))
-        if not links:
-            messagebox.showwarning('Uyarı', 'Kontrol edilecek link yok')
-            return
-        # Tercihlerden checker oluştur
-        headers = {'User-Agent': self.prefs.get('user_agent')}
-        proxy = self.prefs.get('proxy')
-        concurrency = int(self.prefs.get('concurrency'))
-        timeout = int(self.prefs.get('timeout'))
-        retries = int(self.prefs.get('retries'))
-        deep = bool(self.prefs.get('deep_check'))
-        channels_to_test = int(self.prefs.get('channels_to_test'))
-
-        self.checker = AsyncIPTVChecker(concurrency=concurrency, timeout=timeout, retries=retries, headers=headers, proxy=proxy)
-        self.stop_event.clear()
-        self.lb_working.delete(0, tk.END)
-        self.lb_failed.delete(0, tk.END)
-        self.link_results.clear()
-        self.progress['value'] = 0
-        total = len(links)
-        self.progress_label.config(text=f'0/{total}')
-
-        # Başlat: arka planda event loop thread
-        def run_loop():
-            asyncio.set_event_loop(asyncio.new_event_loop())
-            loop = asyncio.get_event_loop()
-            tasks = [self._run_check_one(link, channels_to_test, deep) for link in links]
-            loop.run_until_complete(asyncio.gather(*tasks))
-            loop.close()
-            # tamamlandı
-            self.after(0, lambda: self.log_message('Tüm kontroller tamamlandı.'))
-
-        t = threading.Thread(target=run_loop, daemon=True)
-        t.start()
-
-    async def _run_check_one(self, link, channels_to_test, deep):
-        # wrapper to run checker.check_m3u and push results to GUI
-        try:
-            res = await self.checker.check_m3u(link, max_channel_check=channels_to_test, deep=deep)
-        except asyncio.CancelledError:
-            res = {'url': link, 'ok': False, 'error': 'Cancelled'}
-        except Exception as e:
-            res = {'url': link, 'ok': False, 'error': str(e)}
-        # GUI update
-        def gui_update():
-            url = res.get('url')
-            ok = res.get('ok', False)
-            if ok:
-                self.lb_working.insert(tk.END, url)
-                self.log_message(f'OK: {url}')
-            else:
-                self.lb_failed.insert(tk.END, url)
-                self.log_message(f'FAIL: {url} ({res.get("error")})')
-            # progress
-            current = self.lb_working.size() + self.lb_failed.size()
-            total = self.lb_links.size()
-            if total:
-                self.progress['value'] = (current/total) * 100
-                self.progress_label.config(text=f'{current}/{total}')
-        self.after(0, gui_update)
-
-    def stop_check(self):
-        if self.checker:
-            self.checker.stop()
-            self.log_message('Durdurma talimatı gönderildi')
-        self.stop_event.set()
-
-    def export_working(self):
-        items = list(self.lb_working.get(0, tk.END))
-        if not items:
-            messagebox.showwarning('Uyarı', 'Çalışan link yok')
-            return
-        p = filedialog.asksaveasfilename(defaultextension='.txt')
-        if not p:
-            return
-        try:
-            with open(p, 'w', encoding='utf-8') as f:
-                for it in items:
-                    f.write(it + '\n')
-            messagebox.showinfo('Başarılı', 'Kaydedildi')
-            self.log_message(f'Çalışan linkler kaydedildi: {p}')
-        except Exception as e:
-            messagebox.showerror('Hata', f'Kaydedilemedi: {e}')
-
-    def open_preferences(self):
-        win = tk.Toplevel(self)
-        win.title('Tercihler')
-        win.geometry('420x360')
-        tk.Label(win, text='Concurrency (eşzamanlı istek):').pack(anchor='w', padx=8, pady=4)
-        e_conc = tk.Entry(win)
-        e_conc.insert(0, str(self.prefs.get('concurrency')))
-        e_conc.pack(fill=tk.X, padx=8)
-
-        tk.Label(win, text='Timeout (s):').pack(anchor='w', padx=8, pady=4)
-        e_timeout = tk.Entry(win)
-        e_timeout.insert(0, str(self.prefs.get('timeout')))
-        e_timeout.pack(fill=tk.X, padx=8)
-
-        tk.Label(win, text='Retries:').pack(anchor='w', padx=8, pady=4)
-        e_retries = tk.Entry(win)
-        e_retries.insert(0, str(self.prefs.get('retries')))
-        e_retries.pack(fill=tk.X, padx=8)
-
-        tk.Label(win, text='Denenecek Kanal Sayısı:').pack(anchor='w', padx=8, pady=4)
-        e_channels = tk.Entry(win)
-        e_channels.insert(0, str(self.prefs.get('channels_to_test')))
-        e_channels.pack(fill=tk.X, padx=8)
-
-        deep_var = tk.BooleanVar(value=self.prefs.get('deep_check'))
-        tk.Checkbutton(win, text='Derin Kontrol (ffprobe varsa)', variable=deep_var).pack(anchor='w', padx=8, pady=6)
-
-        tk.Label(win, text='User-Agent:').pack(anchor='w', padx=8, pady=4)
-        e_ua = tk.Entry(win)
-        e_ua.insert(0, self.prefs.get('user_agent'))
-        e_ua.pack(fill=tk.X, padx=8)
-
-        def save_prefs():
-            try:
-                self.prefs['concurrency'] = int(e_conc.get())
-                self.prefs['timeout'] = int(e_timeout.get())
-                self.prefs['retries'] = int(e_retries.get())
-                self.prefs['channels_to_test'] = int(e_channels.get())
-                self.prefs['deep_check'] = deep_var.get()
-                self.prefs['user_agent'] = e_ua.get().strip() or self.prefs['user_agent']
-                win.destroy()
-                self.log_message('Tercihler kaydedildi')
-            except Exception as e:
-                messagebox.showerror('Hata', f'Geçersiz değer: {e}')
+async def _bench_transport(name, urls, concurrency, timeout, headers):
+    transport = TRANSPORTS[name](timeout=timeout, headers=headers)
+    await transport.open()
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    counts = {'ok': 0, 'fail': 0, 'error': 0}
 
-        tk.Button(win, text='Kaydet', command=save_prefs, bg='#4caf50', fg='white').pack(pady=8)
+    async def one(u):
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await asyncio.wait_for(transport.probe(u), timeout)
+                counts['ok' if r.ok else 'fail'] += 1
+            except Exception:
+                counts['error'] += 1
+            latencies.append(time.perf_counter() - t0)
 
-    # ----------------- Önizleme -----------------
-    def preview_selected(self, event):
-        if not VLC_AVAILABLE:
-            messagebox.showwarning('VLC yok', 'python-vlc yüklü değil veya VLC bulunamadı. Önizleme devre dışı.')
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    try:
+        await asyncio.gather(*(one(u) for u in urls))
+    finally:
+        await transport.close()
+    wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    n = max(1, len(urls))
+    return {
+        'transport': name,
+        'probes': len(urls),
+        'ok': counts['ok'],
+        'fail': counts['fail'],
+        'error': counts['error'],
+        'wall_s': round(wall, 3),
+        'probes_per_s': round(len(urls) / wall, 1) if wall else None,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+        'cpu_ms_per_probe': round(cpu * 1000 / n, 3),
+    }
+
+
+def benchmark_transports(urls, names=('aiohttp', 'raw'), concurrency=100, timeout=10, rounds=1, headers=None):
+    """Aynı URL listesini her taşıma ile problayıp süre/CPU karşılaştırması döndürür"""
+    headers = headers or {'User-Agent': 'Mozilla/5.0 (IPTVChecker/1.0)'}
+    results = []
+    for _ in range(rounds):
+        for name in names:
+            results.append(asyncio.run(_bench_transport(name, urls, concurrency, timeout, headers)))
+    return results
+
+
+# ------------------------- Anlık Dışa Aktarım -------------------------
+
+class ResultSink:
+    """Kontrol sonuçlarını geldikçe tamponlu olarak dosyaya yazan temel sınıf.
+
+    Tampon belirli sayıda kayıtta veya belirli sürede bir diske boşaltılır;
+    böylece çalışma yarıda kesilse bile en fazla son birkaç sonuç kaybolur.
+    """
+    ext = '.txt'
+
+    def __init__(self, path, flush_every=20, flush_interval=1.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._f = open(path, 'w', encoding='utf-8', newline='', buffering=1 << 16)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.count = 0
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def _write(self, res):
+        raise NotImplementedError
+
+    def write(self, res):
+        if self._f is None:
             return
-        sel = self.lb_working.curselection()
-        if not sel:
+        if self._write(res) is False:
             return
-        url = self.lb_working.get(sel[0])
-        # M3U'dan kanalları çek ve ilk çalışan kanalı VLC ile oynat
-        # Hafif: indirme ve parse
-        def run_preview():
-            try:
-                import requests
-                r = requests.get(url, timeout=10)
-                if r.status_code != 200:
-                    self.log_message('Önizleme: M3U alınamadı')
-                    return
-                chs = parse_m3u(r.text)
-                for name, s_url in chs:
-                    if not s_url:
-                        continue
-                    # VLC oynatmayı GUI thread dışı yap
-                    inst = vlc.Instance()
-                    player = inst.media_player_new()
-                    media = inst.media_new(s_url)
-                    player.set_media(media)
-                    # platforma göre handle setleme basit
-                    if sys.platform.startswith('win'):
-                        player.set_hwnd(0)
-                    player.play()
-                    time.sleep(8)
-                    state = player.get_state()
-                    if state == vlc.State.Playing:
-                        self.log_message(f'Önizleme: Çalışan kanal bulundu: {name}')
-                        return
-                    else:
-                        player.stop()
-                self.log_message('Önizleme: Çalışan kanal bulunamadı')
-            except Exception as e:
-                self.log_message(f'Önizleme hata: {e}')
+        self.count += 1
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.flush_every or now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._f is not None and self._pending:
+            self._f.flush()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._f is not None:
+            self._f.flush()
+            self._f.close()
+            self._f = None
+
+
+class UrlListSink(ResultSink):
+    """Sadece çalışan M3U linklerini satır satır yazar"""
+    ext = '.txt'
+
+    def _write(self, res):
+        if not res.get('ok'):
+            return False
+        self._f.write(res['url'] + '\n')
 
-        t = threading.Thread(target=run_preview, daemon=True)
-        t.start()
 
+class M3USink(ResultSink):
+    """Çalışan linklerde doğrulanan kanallardan tek bir M3U oluşturur"""
+    ext = '.m3u'
 
-if __name__ == '__main__':
+    def write_header(self):
+        self._f.write('#EXTM3U\n')
+
+    def _write(self, res):
+        if not res.get('ok'):
+            return False
+        # tested, kanal listesinin ilk N elemanıyla birebir aynı sıradadır
+        for ch, t in zip(res.get('channels') or (), res.get('tested', [])):
+            if t.ok and t.url:
+                self._f.write(f'{format_extinf(ch)}\n{t.url}\n')
+
+
+class CsvSink(ResultSink):
+    """Tüm sonuçları süre bilgisiyle CSV olarak yazar"""
+    ext = '.csv'
+    columns = ('url', 'ok', 'score', 'status_code', 'elapsed_ms', 'median_ttfb_ms', 'median_kbps',
+               'success_ratio', 'channels', 'tested', 'error')
+
+    def write_header(self):
+        self._csv = csv.writer(self._f)
+        self._csv.writerow(self.columns)
+
+    def _write(self, res):
+        quality = res.get('quality') or {}
+        self._csv.writerow((
+            res.get('url'),
+            int(bool(res.get('ok'))),
+            res.get('score', ''),
+            res.get('status_code', ''),
+            round(res.get('elapsed', 0) * 1000),
+            quality.get('median_ttfb_ms', ''),
+            quality.get('median_kbps', ''),
+            quality.get('success_ratio', ''),
+            len(res.get('channels') or ()),
+            len(res.get('tested') or ()),
+            res.get('error', ''),
+        ))
+
+
+def result_row(res):
+    """check_m3u sonucunun JSON'a uygun özeti (kanal listesi yerine sayısı)"""
+    return {
+        'url': res.get('url'),
+        'ok': bool(res.get('ok')),
+        'score': res.get('score'),
+        'quality': res.get('quality'),
+        'status_code': res.get('status_code'),
+        'elapsed_ms': round(res.get('elapsed', 0) * 1000),
+        'channels': len(res.get('channels') or ()),
+        'tested': [
+            {'name': t.name, 'url': t.url, 'ok': t.ok, 'info': t.info,
+             'elapsed_ms': None if t.elapsed is None else round(t.elapsed * 1000),
+             'ttfb_ms': None if t.ttfb is None else round(t.ttfb * 1000, 1),
+             'kbps': None if t.throughput is None else round(t.throughput / 1024, 1)}
+            for t in res.get('tested', [])
+        ],
+        'error': res.get('error'),
+    }
+
+
+class NdjsonSink(ResultSink):
+    """Tüm sonuçları satır başına bir JSON nesnesi olarak yazar"""
+    ext = '.ndjson'
+
+    def _write(self, res):
+        self._f.write(json.dumps(result_row(res), ensure_ascii=False) + '\n')
+
+
+EXPORT_SINKS = {
+    'txt': UrlListSink,
+    'm3u': M3USink,
+    'csv': CsvSink,
+    'ndjson': NdjsonSink,
+}
+
+
+def open_sinks(directory, formats, prefix='iptv'):
+    # formats: 'txt,m3u,csv' gibi virgüllü liste veya iterable
+    if isinstance(formats, str):
+        formats = [f.strip().lower() for f in formats.split(',') if f.strip()]
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    sinks = []
+    for fmt in formats:
+        cls = EXPORT_SINKS.get(fmt)
+        if cls is None:
+            continue
+        sinks.append(cls(os.path.join(directory, f'{prefix}_{stamp}{cls.ext}')))
+    return sinks
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Gelişmiş IPTV Link Kontrol Aracı')
+    parser.add_argument('--bench-transport', metavar='DOSYA',
+                        help='Dosyadaki stream linkleri ile taşıma katmanlarını karşılaştır (GUI açılmaz)')
+    parser.add_argument('--transports', default='aiohttp,raw', help='Karşılaştırılacak taşımalar (virgüllü)')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--rounds', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.bench_transport:
+        with open(args.bench_transport, 'r', encoding='utf-8', errors='ignore') as f:
+            urls = extract_urls_from_text(f.read())
+        names = [n.strip() for n in args.transports.split(',') if n.strip()]
+        unknown = [n for n in names if n not in TRANSPORTS]
+        if unknown:
+            parser.error(f'Bilinmeyen taşıma: {", ".join(unknown)}')
+        print(f'{len(urls)} URL, eşzamanlılık={args.concurrency}, tur={args.rounds}')
+        cols = ('transport', 'probes', 'ok', 'fail', 'error', 'wall_s', 'probes_per_s', 'p50_ms', 'p95_ms',
+                'cpu_ms_per_probe')
+        print('  '.join(f'{c:>14}' for c in cols))
+        for row in benchmark_transports(urls, names, args.concurrency, args.timeout, args.rounds):
+            print('  '.join(f'{str(row[c]):>14}' for c in cols))
+        return
+
+    # Betik olarak çalışırken arayüz modülü bu modülü ikinci kez yüklemesin
+    sys.modules.setdefault('testaraci', sys.modules[__name__])
+    from testaraci_gui import AdvancedIPTVCheckerApp
     app = AdvancedIPTVCheckerApp()
     app.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,584 @@
+"""
+Gelişmiş IPTV Link Kontrol Aracı - Tkinter arayüzü
+
+testaraci.py'yi kütüphane veya komut satırı aracı olarak kullanan çağrılar
+(taşıma karşılaştırması, link.py hattı) tkinter yüklemesin diye arayüz ayrı
+modüldedir. Çalıştırmak için: python testaraci.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import filedialog, messagebox, ttk
+
+from testaraci import (
+    EXPORT_SINKS, TRANSPORTS, AsyncIPTVChecker, ChannelIndex, ProxyPool, extract_urls_from_text,
+    filter_m3u_urls, load_vlc, open_sinks, parse_m3u, preview_candidates,
+)
+
+
+class AdvancedIPTVCheckerApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title('Gelişmiş IPTV Link Kontrol Aracı')
+        self.geometry('1200x800')
+        self.configure(bg='#222')
+
+        # Varsayılan tercih
+        self.prefs = {
+            'timeout': 8,
+            'concurrency': 200,
+            'retries': 2,
+            'channels_to_test': 3,
+            'deep_check': False,
+            'user_agent': 'Mozilla/5.0 (IPTVChecker/Advanced)',
+            'proxy': None,
+            'proxy_file': '',
+            'proxy_max_conc': 20,
+            'transport': 'aiohttp',
+            'throughput_window': 0.0,
+            'test_all_channels': False,
+            'export_dir': '',
+            'export_formats': 'txt,m3u,csv,ndjson',
+            'preview_timeout': 4,
+            'preview_total_timeout': 30,
+            'preview_cache': 200
+        }
+
+        self.loop_thread = None
+        self.loop = None
+        self.checker = None
+        self.worker_task = None
+        self.stop_event = threading.Event()
+        # url -> {'channels', 'tested'}; son 'preview_cache' çalışan playlist (önizleme için)
+        self.link_results = OrderedDict()
+        self.scores = {}  # url -> kalite puanı (çalışanlar)
+        self.channel_index = ChannelIndex()  # tüm kontrollerdeki kanallar (oturum boyunca)
+        self.sinks = []
+        self._vlc_instance = None
+        self._vlc_player = None
+        self._preview_gen = 0
+        # Önizleme thread'leri ortak oynatıcıyı oluşturma ve play/stop sırasında kilitler
+        self._vlc_lock = threading.Lock()
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        top = tk.Frame(self, bg='#333')
+        top.pack(fill=tk.X, padx=8, pady=6)
+
+        tk.Button(top, text='Dosya Seç (.txt veya .m3u)', command=self.select_file, bg='#4caf50', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Yapıştırtan Al', command=self.paste_input, bg='#2196f3', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Linkleri Bul', command=self.find_links_from_input, bg='#009688', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Kontrol Başlat', command=self.start_check, bg='#f44336', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Durdur', command=self.stop_check, bg='#ff9800', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Dışa Aktar (Çalışanlar)', command=self.export_working, bg='#607d8b', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Puana Göre Sırala', command=self.sort_working_by_score, bg='#9c27b0', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Tercihler', command=self.open_preferences, bg='#795548', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(top, text='Kanal Ara', command=self.open_channel_search, bg='#3f51b5', fg='white').pack(side=tk.LEFT, padx=4)
+
+        # Orta bölüm: giriş/çıktı ve log
+        mid = tk.PanedWindow(self, orient=tk.HORIZONTAL)
+        mid.pack(fill=tk.BOTH, expand=True, padx=8, pady=6)
+
+        left = tk.Frame(mid, bg='#2b2b2b')
+        mid.add(left, stretch='always')
+        right = tk.Frame(mid, bg='#1f1f1f', width=380)
+        mid.add(right, stretch='never')
+
+        # Girdi alanı
+        tk.Label(left, text='Girdi (dosya veya yapıştırılmış içerik):', bg='#2b2b2b', fg='white').pack(anchor='w', padx=6, pady=4)
+        self.text_input = tk.Text(left, height=10, bg='#121212', fg='white')
+        self.text_input.pack(fill=tk.X, padx=6)
+
+        # Link listeleri
+        lists = tk.Frame(left, bg='#2b2b2b')
+        lists.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+
+        lb_frame = tk.Frame(lists, bg='#2b2b2b')
+        lb_frame.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(lb_frame, text='Tespit Edilen M3U Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
+        self.lb_links = tk.Listbox(lb_frame, bg='#111', fg='white')
+        self.lb_links.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+        sc = tk.Scrollbar(lb_frame, command=self.lb_links.yview)
+        sc.pack(side=tk.LEFT, fill=tk.Y)
+        self.lb_links.config(yscrollcommand=sc.set)
+
+        right_inner = tk.Frame(right, bg='#121212')
+        right_inner.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+        tk.Label(right_inner, text='Sistem Log', bg='#121212', fg='lime').pack(anchor='w')
+        self.log = tk.Text(right_inner, bg='#000', fg='lime', height=20)
+        self.log.pack(fill=tk.BOTH, expand=True)
+
+        # İlerleme
+        bottom = tk.Frame(self, bg='#222')
+        bottom.pack(fill=tk.X, padx=8, pady=6)
+        self.progress = ttk.Progressbar(bottom, length=600)
+        self.progress.pack(side=tk.LEFT, padx=6)
+        self.progress_label = tk.Label(bottom, text='0/0', bg='#222', fg='white')
+        self.progress_label.pack(side=tk.LEFT, padx=6)
+
+        # Sağ alt: çalışma/başarısız listeleri
+        results_frame = tk.Frame(self, bg='#2b2b2b')
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=6)
+
+        left_res = tk.Frame(results_frame, bg='#2b2b2b')
+        left_res.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tk.Label(left_res, text='Çalışan Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
+        self.lb_working = tk.Listbox(left_res, bg='#082', fg='white')
+        self.lb_working.pack(fill=tk.BOTH, expand=True)
+        self.lb_working.bind('<Double-Button-1>', self.preview_selected)
+
+        right_res = tk.Frame(results_frame, bg='#2b2b2b')
+        right_res.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tk.Label(right_res, text='Başarısız Linkler', bg='#2b2b2b', fg='white').pack(anchor='w')
+        self.lb_failed = tk.Listbox(right_res, bg='#820', fg='white')
+        self.lb_failed.pack(fill=tk.BOTH, expand=True)
+
+    # ---------------- GUI yardımcıları ----------------
+    def log_message(self, text):
+        ts = time.strftime('%H:%M:%S')
+        self.log.insert(tk.END, f'[{ts}] {text}\n')
+        self.log.see(tk.END)
+
+    def select_file(self):
+        p = filedialog.askopenfilename(filetypes=[('Text/M3U files', '*.txt;*.m3u;*.m3u8')])
+        if not p:
+            return
+        try:
+            with open(p, 'r', encoding='utf-8', errors='ignore') as f:
+                data = f.read()
+            self.text_input.delete('1.0', tk.END)
+            self.text_input.insert(tk.END, data)
+            self.log_message(f'Yüklendi: {p}')
+        except Exception as e:
+            messagebox.showerror('Hata', f'Dosya okunamadı: {e}')
+
+    def paste_input(self):
+        # Pencereye yapıştırmak için kullanıcıya kısayol göster
+        messagebox.showinfo('Yapıştır', 'Metni panoya kopyalayıp OK ile yapıştırabilirsiniz.')
+        try:
+            clipboard = self.clipboard_get()
+            self.text_input.insert(tk.END, clipboard)
+            self.log_message('Panodan yapıştırıldı')
+        except Exception:
+            self.log_message('Panodan alınamadı veya boş.')
+
+    def find_links_from_input(self):
+        text = self.text_input.get('1.0', tk.END)
+        urls = extract_urls_from_text(text)
+        m3u_urls = filter_m3u_urls(urls)
+        self.lb_links.delete(0, tk.END)
+        for u in m3u_urls:
+            self.lb_links.insert(tk.END, u)
+        self.log_message(f'{len(m3u_urls)} adet M3U linki bulundu')
+
+    # ----------------- Asenkron iş kontrol -----------------
+    def start_check(self):
+        if self.loop_thread is not None and self.loop_thread.is_alive():
+            messagebox.showinfo('Bilgi', 'Kontrol zaten sürüyor; yenisi için bitmesini bekleyin veya durdurun')
+            return
+        links = list(self.lb_links.get(0, tk.END))
+        if not links:
+            messagebox.showwarning('Uyarı', 'Kontrol edilecek link yok')
+            return
+        # Tercihlerden checker oluştur
+        headers = {'User-Agent': self.prefs.get('user_agent')}
+        proxy = self.prefs.get('proxy')
+        concurrency = int(self.prefs.get('concurrency'))
+        timeout = int(self.prefs.get('timeout'))
+        retries = int(self.prefs.get('retries'))
+        deep = bool(self.prefs.get('deep_check'))
+        channels_to_test = int(self.prefs.get('channels_to_test'))
+
+        proxy_pool = None
+        proxy_file = self.prefs.get('proxy_file')
+        if proxy_file:
+            try:
+                proxy_pool = ProxyPool.from_file(proxy_file, max_per_proxy=int(self.prefs.get('proxy_max_conc')))
+                self.log_message(f'Proxy havuzu: {len(proxy_pool.entries)} proxy yüklendi')
+            except Exception as e:
+                messagebox.showerror('Hata', f'Proxy listesi yüklenemedi: {e}')
+                return
+
+        self.checker = AsyncIPTVChecker(concurrency=concurrency, timeout=timeout, retries=retries, headers=headers,
+                                        proxy=proxy, proxy_pool=proxy_pool,
+                                        transport=self.prefs.get('transport') or 'aiohttp',
+                                        read_window=float(self.prefs.get('throughput_window') or 0),
+                                        test_all=bool(self.prefs.get('test_all_channels')))
+        checker = self.checker
+        self.stop_event.clear()
+        self.lb_working.delete(0, tk.END)
+        self.lb_failed.delete(0, tk.END)
+        self.link_results.clear()
+        self.scores.clear()
+        self.progress['value'] = 0
+        total = len(links)
+        self.progress_label.config(text=f'0/{total}')
+
+        # Anlık dışa aktarım: sonuçlar geldikçe diske yazılır
+        self.sinks = []
+        export_dir = self.prefs.get('export_dir')
+        if export_dir:
+            try:
+                self.sinks = open_sinks(export_dir, self.prefs.get('export_formats') or '')
+                for s in self.sinks:
+                    self.log_message(f'Anlık kayıt: {s.path}')
+            except Exception as e:
+                messagebox.showerror('Hata', f'Dışa aktarım dosyaları açılamadı: {e}')
+                return
+        sinks = self.sinks
+
+        # Başlat: arka planda event loop thread
+        def run_loop():
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            loop = asyncio.get_event_loop()
+            tasks = [self._run_check_one(checker, sinks, link, channels_to_test, deep) for link in links]
+            try:
+                loop.run_until_complete(asyncio.gather(*tasks))
+                loop.run_until_complete(checker.close())
+            finally:
+                loop.close()
+                for s in sinks:
+                    s.close()
+            # tamamlandı
+            self.after(0, lambda: self.log_message('Tüm kontroller tamamlandı.'))
+            if proxy_pool is not None:
+                self.after(0, lambda: self.log_proxy_summary(proxy_pool))
+
+        self.loop_thread = threading.Thread(target=run_loop, daemon=True)
+        self.loop_thread.start()
+
+    async def _run_check_one(self, checker, sinks, link, channels_to_test, deep):
+        # wrapper to run checker.check_m3u and push results to GUI
+        # (checker/sinks bu çalıştırmanınkiler; self.* sonraki çalıştırmada değişir)
+        t0 = time.perf_counter()
+        try:
+            res = await checker.check_m3u(link, max_channel_check=channels_to_test, deep=deep)
+        except asyncio.CancelledError:
+            res = {'url': link, 'ok': False, 'error': 'Cancelled'}
+        except Exception as e:
+            res = {'url': link, 'ok': False, 'error': str(e)}
+        res['elapsed'] = time.perf_counter() - t0
+        # Sonucu bekletmeden diske yaz (event loop thread'i tek yazar)
+        for s in sinks:
+            try:
+                s.write(res)
+            except Exception as e:
+                self.after(0, lambda e=e, p=s.path: self.log_message(f'Kayıt hatası ({p}): {e}'))
+        # GUI update
+        def gui_update():
+            url = res.get('url')
+            ok = res.get('ok', False)
+            if res.get('channels'):
+                self.channel_index.add_playlist(url, res['channels'], ok)
+            if ok:
+                self._cache_link_result(url, res)
+                self.scores[url] = res.get('score', 0.0)
+                self.lb_working.insert(tk.END, url)
+                self.log_message(f'OK: {url} (puan {res.get("score", 0.0)})')
+            else:
+                self.lb_failed.insert(tk.END, url)
+                self.log_message(f'FAIL: {url} ({res.get("error")})')
+            # progress
+            current = self.lb_working.size() + self.lb_failed.size()
+            total = self.lb_links.size()
+            if total:
+                self.progress['value'] = (current/total) * 100
+                self.progress_label.config(text=f'{current}/{total}')
+        self.after(0, gui_update)
+
+    def _cache_link_result(self, url, res):
+        # Önbellek sınırlı: taşınca en eskisi düşer, önizleme onu tekrar indirir
+        limit = int(self.prefs.get('preview_cache') or 0)
+        if limit <= 0:
+            return
+        self.link_results[url] = {'channels': res.get('channels') or [], 'tested': res.get('tested') or []}
+        self.link_results.move_to_end(url)
+        while len(self.link_results) > limit:
+            self.link_results.popitem(last=False)
+
+    def log_proxy_summary(self, pool):
+        self.log_message('Proxy özeti:')
+        for row in pool.summary():
+            state = ' (devre dışı)' if row['ejected'] else ''
+            self.log_message(
+                f"  {row['proxy']}{state}: {row['requests']} istek, {row['errors']} hata, "
+                f"{row['ejections']} çıkarılma, gecikme={row['latency_ms']} ms, "
+                f"{row['req_per_s']} istek/s, {row['kb_per_s']} KB/s")
+
+    def stop_check(self):
+        if self.checker:
+            self.checker.stop()
+            self.log_message('Durdurma talimatı gönderildi')
+        self.stop_event.set()
+
+    def sort_working_by_score(self):
+        items = sorted(self.lb_working.get(0, tk.END), key=lambda u: self.scores.get(u, 0.0), reverse=True)
+        self.lb_working.delete(0, tk.END)
+        for u in items:
+            self.lb_working.insert(tk.END, u)
+        self.log_message('Çalışan linkler kalite puanına göre sıralandı')
+
+    def export_working(self):
+        # Liste sırası korunur; 'Puana Göre Sırala' sonrası dışa aktarım da puana göre sıralıdır
+        items = list(self.lb_working.get(0, tk.END))
+        if not items:
+            messagebox.showwarning('Uyarı', 'Çalışan link yok')
+            return
+        p = filedialog.asksaveasfilename(defaultextension='.txt')
+        if not p:
+            return
+        try:
+            with open(p, 'w', encoding='utf-8') as f:
+                for it in items:
+                    f.write(it + '\n')
+            messagebox.showinfo('Başarılı', 'Kaydedildi')
+            self.log_message(f'Çalışan linkler kaydedildi: {p}')
+        except Exception as e:
+            messagebox.showerror('Hata', f'Kaydedilemedi: {e}')
+
+    def open_preferences(self):
+        win = tk.Toplevel(self)
+        win.title('Tercihler')
+        win.geometry('420x940')
+        tk.Label(win, text='Concurrency (eşzamanlı istek):').pack(anchor='w', padx=8, pady=4)
+        e_conc = tk.Entry(win)
+        e_conc.insert(0, str(self.prefs.get('concurrency')))
+        e_conc.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Timeout (s):').pack(anchor='w', padx=8, pady=4)
+        e_timeout = tk.Entry(win)
+        e_timeout.insert(0, str(self.prefs.get('timeout')))
+        e_timeout.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Retries:').pack(anchor='w', padx=8, pady=4)
+        e_retries = tk.Entry(win)
+        e_retries.insert(0, str(self.prefs.get('retries')))
+        e_retries.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Denenecek Kanal Sayısı:').pack(anchor='w', padx=8, pady=4)
+        e_channels = tk.Entry(win)
+        e_channels.insert(0, str(self.prefs.get('channels_to_test')))
+        e_channels.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Önizleme Süre Sınırı (s, kanal başına):').pack(anchor='w', padx=8, pady=4)
+        e_preview = tk.Entry(win)
+        e_preview.insert(0, str(self.prefs.get('preview_timeout')))
+        e_preview.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Önizleme Toplam Süre Sınırı (s):').pack(anchor='w', padx=8, pady=4)
+        e_preview_total = tk.Entry(win)
+        e_preview_total.insert(0, str(self.prefs.get('preview_total_timeout')))
+        e_preview_total.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Önizleme Önbelleği (playlist, 0 = kapalı):').pack(anchor='w', padx=8, pady=4)
+        e_preview_cache = tk.Entry(win)
+        e_preview_cache.insert(0, str(self.prefs.get('preview_cache')))
+        e_preview_cache.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='HTTP Taşıma Katmanı:').pack(anchor='w', padx=8, pady=4)
+        transport_var = tk.StringVar(value=self.prefs.get('transport'))
+        ttk.Combobox(win, textvariable=transport_var, values=list(TRANSPORTS), state='readonly').pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Verim Ölçüm Penceresi (s, 0 = kapalı):').pack(anchor='w', padx=8, pady=4)
+        e_window = tk.Entry(win)
+        e_window.insert(0, str(self.prefs.get('throughput_window')))
+        e_window.pack(fill=tk.X, padx=8)
+
+        test_all_var = tk.BooleanVar(value=self.prefs.get('test_all_channels'))
+        tk.Checkbutton(win, text='Puan için tüm denenecek kanalları test et', variable=test_all_var).pack(anchor='w', padx=8, pady=2)
+
+        deep_var = tk.BooleanVar(value=self.prefs.get('deep_check'))
+        tk.Checkbutton(win, text='Derin Kontrol (ffprobe varsa)', variable=deep_var).pack(anchor='w', padx=8, pady=6)
+
+        tk.Label(win, text='User-Agent:').pack(anchor='w', padx=8, pady=4)
+        e_ua = tk.Entry(win)
+        e_ua.insert(0, self.prefs.get('user_agent'))
+        e_ua.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Proxy Listesi Dosyası (boş = tek proxy/proxysiz):').pack(anchor='w', padx=8, pady=4)
+        e_proxy_file = tk.Entry(win)
+        e_proxy_file.insert(0, self.prefs.get('proxy_file') or '')
+        e_proxy_file.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Proxy Başına Eşzamanlı İstek:').pack(anchor='w', padx=8, pady=4)
+        e_proxy_conc = tk.Entry(win)
+        e_proxy_conc.insert(0, str(self.prefs.get('proxy_max_conc')))
+        e_proxy_conc.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Anlık Dışa Aktarım Klasörü (boş = kapalı):').pack(anchor='w', padx=8, pady=4)
+        e_export_dir = tk.Entry(win)
+        e_export_dir.insert(0, self.prefs.get('export_dir') or '')
+        e_export_dir.pack(fill=tk.X, padx=8)
+
+        tk.Label(win, text='Formatlar (txt,m3u,csv,ndjson):').pack(anchor='w', padx=8, pady=4)
+        e_export_formats = tk.Entry(win)
+        e_export_formats.insert(0, self.prefs.get('export_formats') or '')
+        e_export_formats.pack(fill=tk.X, padx=8)
+
+        def save_prefs():
+            try:
+                self.prefs['concurrency'] = int(e_conc.get())
+                self.prefs['timeout'] = int(e_timeout.get())
+                self.prefs['retries'] = int(e_retries.get())
+                self.prefs['channels_to_test'] = int(e_channels.get())
+                self.prefs['preview_timeout'] = float(e_preview.get())
+                self.prefs['preview_total_timeout'] = float(e_preview_total.get())
+                self.prefs['preview_cache'] = int(e_preview_cache.get())
+                self.prefs['deep_check'] = deep_var.get()
+                self.prefs['throughput_window'] = float(e_window.get())
+                self.prefs['test_all_channels'] = test_all_var.get()
+                self.prefs['transport'] = transport_var.get()
+                self.prefs['user_agent'] = e_ua.get().strip() or self.prefs['user_agent']
+                formats = [f.strip().lower() for f in e_export_formats.get().split(',') if f.strip()]
+                unknown = [f for f in formats if f not in EXPORT_SINKS]
+                if unknown:
+                    raise ValueError(f'Bilinmeyen format: {", ".join(unknown)}')
+                self.prefs['proxy_file'] = e_proxy_file.get().strip()
+                self.prefs['proxy_max_conc'] = int(e_proxy_conc.get())
+                self.prefs['export_dir'] = e_export_dir.get().strip()
+                self.prefs['export_formats'] = ','.join(formats)
+                win.destroy()
+                self.log_message('Tercihler kaydedildi')
+            except Exception as e:
+                messagebox.showerror('Hata', f'Geçersiz değer: {e}')
+
+        tk.Button(win, text='Kaydet', command=save_prefs, bg='#4caf50', fg='white').pack(pady=8)
+
+    # ----------------- Kanal İndeksi -----------------
+    def open_channel_search(self):
+        win = tk.Toplevel(self)
+        win.title('Kanal Ara')
+        win.geometry('640x480')
+
+        row = tk.Frame(win)
+        row.pack(fill=tk.X, padx=8, pady=6)
+        e_query = tk.Entry(row)
+        e_query.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 6))
+        mode_var = tk.StringVar(value='channel')
+        tk.Radiobutton(row, text='Kanal', variable=mode_var, value='channel').pack(side=tk.LEFT)
+        tk.Radiobutton(row, text='Grup', variable=mode_var, value='group').pack(side=tk.LEFT)
+        working_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(row, text='Sadece çalışanlar', variable=working_var).pack(side=tk.LEFT)
+
+        info = tk.Label(win, anchor='w')
+        info.pack(fill=tk.X, padx=8)
+        lb = tk.Listbox(win, bg='#111', fg='white')
+        lb.pack(fill=tk.BOTH, expand=True, padx=8, pady=6)
+
+        def show(lines, elapsed):
+            lb.delete(0, tk.END)
+            for line in lines:
+                lb.insert(tk.END, line)
+            info.config(text=f'{len(lines)} sonuç, {elapsed * 1000:.1f} ms '
+                             f'({len(self.channel_index)} kanal, {len(self.channel_index.playlists)} playlist)')
+
+        def search(event=None):
+            query = e_query.get().strip()
+            if not query:
+                return
+            t0 = time.perf_counter()
+            if mode_var.get() == 'group':
+                lines = self.channel_index.playlists_with_group(query, working_only=working_var.get())
+            else:
+                lines = self.channel_index.playlists_with_channel(query, working_only=working_var.get())
+            show(lines, time.perf_counter() - t0)
+
+        def duplicates():
+            t0 = time.perf_counter()
+            dups = self.channel_index.duplicates(working_only=working_var.get())
+            show([f'{name}  [{len(urls)}]  ' + ' | '.join(urls) for name, urls in dups], time.perf_counter() - t0)
+
+        e_query.bind('<Return>', search)
+        tk.Button(row, text='Ara', command=search, bg='#3f51b5', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(row, text='Kopya Kanallar', command=duplicates, bg='#607d8b', fg='white').pack(side=tk.LEFT)
+
+    # ----------------- Önizleme -----------------
+    def _get_vlc_player(self):
+        # Tek VLC instance/player tüm önizlemelerde yeniden kullanılır
+        with self._vlc_lock:
+            if self._vlc_player is None:
+                self._vlc_instance = load_vlc().Instance('--quiet')
+                self._vlc_player = self._vlc_instance.media_player_new()
+                # platforma göre handle setleme basit
+                if sys.platform.startswith('win'):
+                    self._vlc_player.set_hwnd(0)
+            return self._vlc_instance, self._vlc_player
+
+    def _wait_playing(self, player, deadline, gen):
+        # Oynatıcı durumunu kısa aralıklarla yokla; sabit bekleme yok
+        vlc = load_vlc()
+        while time.monotonic() < deadline:
+            if gen != self._preview_gen:
+                return False
+            state = player.get_state()
+            if state == vlc.State.Playing:
+                return True
+            if state in (vlc.State.Error, vlc.State.Ended):
+                return False
+            time.sleep(0.1)
+        return False
+
+    def preview_selected(self, event):
+        if load_vlc() is None:
+            messagebox.showwarning('VLC yok', 'python-vlc yüklü değil veya VLC bulunamadı. Önizleme devre dışı.')
+            return
+        sel = self.lb_working.curselection()
+        if not sel:
+            return
+        url = self.lb_working.get(sel[0])
+        cached = self.link_results.get(url)
+        timeout = float(self.prefs.get('preview_timeout') or 4)
+        total_timeout = float(self.prefs.get('preview_total_timeout') or 30)
+        # Yeni önizleme öncekini iptal eder
+        self._preview_gen += 1
+        gen = self._preview_gen
+
+        def log(msg):
+            self.after(0, lambda: self.log_message(msg))
+
+        # Kontrol sırasında toplanan kanal listesi ve sonuçlar kullanılır;
+        # sadece önbellekte yoksa M3U tekrar indirilir.
+        def run_preview():
+            try:
+                if cached:
+                    chs, tested = cached['channels'], cached['tested']
+                else:
+                    import requests
+                    r = requests.get(url, timeout=10)
+                    if r.status_code != 200:
+                        log('Önizleme: M3U alınamadı')
+                        return
+                    chs, tested = parse_m3u(r.text), ()
+                inst, player = self._get_vlc_player()
+                # Büyük/ölü listelerde önizleme toplam süreyle sınırlı
+                total_deadline = time.monotonic() + total_timeout
+                for name, s_url in preview_candidates(chs, tested):
+                    if time.monotonic() >= total_deadline:
+                        log(f'Önizleme: {total_timeout:g} sn içinde çalışan kanal bulunamadı')
+                        return
+                    with self._vlc_lock:
+                        if gen != self._preview_gen:
+                            return
+                        player.set_media(inst.media_new(s_url))
+                        player.play()
+                    deadline = min(time.monotonic() + timeout, total_deadline)
+                    if self._wait_playing(player, deadline, gen):
+                        log(f'Önizleme: Çalışan kanal bulundu: {name}')
+                        return
+                    # Yeni önizleme başladıysa oynatıcı artık onun; durdurulmaz
+                    with self._vlc_lock:
+                        if gen != self._preview_gen:
+                            return
+                        player.stop()
+                log('Önizleme: Çalışan kanal bulunamadı')
+            except Exception as e:
+                log(f'Önizleme hata: {e}')
+
+        t = threading.Thread(target=run_preview, daemon=True)
+        t.start()